@@ -0,0 +1,77 @@
+import argparse
+import os
+import sys
+
+from loguru import logger
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.replay_server import FIXTURES_PATH  # noqa: E402
+from utils.utils_find_links import (  # noqa: E402
+    INDIAMART_BASE_URL,
+    rank_indiamart_links,
+)
+from utils.utils_google_page import create_search_query  # noqa: E402
+from utils.utils_http_session import (  # noqa: E402
+    REQUEST_TIMEOUT,
+    create_http_session,
+)
+from utils.utils_input_reader import read_company_rows  # noqa: E402
+from utils.utils_search_backend import SEARCH_HTML_URL  # noqa: E402
+
+
+RECORDED_PAGES = ["", "enquiry.html"]
+
+
+def replayable(page_source: str) -> str:
+    return page_source.replace(INDIAMART_BASE_URL, "{{base_url}}/")
+
+
+def save_fixture(page_source: str, *parts: str):
+    path = os.path.join(FIXTURES_PATH, *parts)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as file:
+        file.write(replayable(page_source))
+    logger.info(f"Recorded '{path}'")
+
+
+def record_company(session, company):
+    response = session.get(
+        SEARCH_HTML_URL,
+        params={"q": create_search_query(company=company)},
+        timeout=REQUEST_TIMEOUT,
+    )
+    save_fixture(response.text, "search", f"{company.GSTIN}.html")
+
+    links = rank_indiamart_links(response.text, company_name=company.COMPANY_NAME)
+    if not links:
+        logger.warning(f"No profile link for '{company.GSTIN}'")
+        return None
+
+    slug = links[0][len(INDIAMART_BASE_URL):].split("/")[0]
+    for page in RECORDED_PAGES:
+        response = session.get(
+            f"{INDIAMART_BASE_URL}{slug}/{page}", timeout=REQUEST_TIMEOUT
+        )
+        if response.status_code == 200:
+            save_fixture(response.text, "site", slug, page or "index.html")
+
+
+def record_manifest(manifest_path: str):
+    session = create_http_session(pool_size=2)
+    for company in read_company_rows(path=manifest_path):
+        try:
+            record_company(session=session, company=company)
+        except Exception as e:
+            logger.error(f"Failed to record '{company.GSTIN}': {e}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Record live search and profile pages as benchmark fixtures"
+    )
+    parser.add_argument(
+        "--manifest", default=os.path.join(FIXTURES_PATH, "manifest.csv")
+    )
+    arguments = parser.parse_args()
+    record_manifest(manifest_path=arguments.manifest)
@@ -0,0 +1,224 @@
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from loguru import logger
+
+
+FIXTURES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+GSTIN_PATTERN = re.compile(r"\b\d{2}[A-Z]{5}\d{4}[A-Z][0-9A-Z]Z[0-9A-Z]\b")
+
+
+class ReplayServer:
+    def __init__(
+        self,
+        fixtures_path: str = FIXTURES_PATH,
+        latency_ms: float = 0,
+        jitter_ms: float = 0,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ) -> None:
+        self.fixtures_path = fixtures_path
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.requests = {}
+        self.lock = threading.Lock()
+        domains_path = os.path.join(fixtures_path, "domains.json")
+        with open(domains_path, encoding="utf-8") as file:
+            self.domains = {
+                normalise_query(name): domain
+                for name, domain in json.load(file).items()
+            }
+        self.server = ThreadingHTTPServer((host, port), build_handler(self))
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> str:
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        logger.info(f"Replay server listening on {self.base_url}")
+        return self.base_url
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def delay(self):
+        latency = self.latency_ms + random.uniform(0, self.jitter_ms)
+        if latency > 0:
+            time.sleep(latency / 1000)
+
+    def count(self, route: str):
+        with self.lock:
+            self.requests[route] = self.requests.get(route, 0) + 1
+
+    def read_fixture(self, *parts: str) -> str | None:
+        path = os.path.normpath(os.path.join(self.fixtures_path, *parts))
+        if not path.startswith(self.fixtures_path) or not os.path.isfile(path):
+            return None
+        with open(path, encoding="utf-8") as file:
+            return file.read().replace("{{base_url}}", self.base_url)
+
+    def search_page(self, query: str) -> str:
+        if match := GSTIN_PATTERN.search(query.upper()):
+            if page := self.read_fixture("search", f"{match.group()}.html"):
+                return page
+        if domain := self.domains.get(normalise_query(query)):
+            return domain_results_page(domain=domain)
+        return self.read_fixture("search", "empty.html")
+
+    def site_page(self, path: str) -> str | None:
+        if path.endswith("/"):
+            path += "index.html"
+        return self.read_fixture("site", *path.strip("/").split("/"))
+
+
+def build_handler(replay: ReplayServer):
+    class ReplayHandler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            return None
+
+        def send_body(
+            self, status: int, body: str, content_type: str, etag: str | None = None
+        ):
+            encoded = body.encode("utf-8")
+            self.send_response(status)
+            if etag:
+                self.send_header("ETag", etag)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(encoded)))
+            self.end_headers()
+            self.wfile.write(encoded)
+
+        def send_html(self, body: str | None):
+            if body is None:
+                return self.send_body(404, "Not found", "text/plain")
+            self.send_body(200, body, "text/html; charset=utf-8")
+
+        def send_json(self, payload: dict):
+            self.send_body(200, json.dumps(payload), "application/json")
+
+        def do_GET(self):
+            replay.delay()
+            url = urlparse(self.path)
+            query = parse_qs(url.query)
+            if url.path == "/search/":
+                replay.count("search_home")
+                return self.send_html(replay.read_fixture("search", "home.html"))
+            if url.path.startswith("/search/html"):
+                replay.count("search_results")
+                return self.send_html(replay.search_page(query.get("q", [""])[0]))
+            if url.path == "/v1/organizations/enrich":
+                replay.count("apollo")
+                return self.send_json(
+                    {"organization": mock_organisation(query.get("domain", [""])[0])}
+                )
+            if (page := replay.site_page(url.path)) is None:
+                replay.count("site")
+                return self.send_html(None)
+
+            etag = f'"{hashlib.sha1(page.encode("utf-8")).hexdigest()}"'
+            if self.headers.get("If-None-Match") == etag:
+                replay.count("site_not_modified")
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                return self.end_headers()
+            replay.count("site")
+            self.send_body(200, page, "text/html; charset=utf-8", etag=etag)
+
+        def do_POST(self):
+            replay.delay()
+            length = int(self.headers.get("Content-Length") or 0)
+            payload = json.loads(self.rfile.read(length) or b"{}")
+            replay.count("apollo")
+            path = urlparse(self.path).path
+            if path == "/v1/people/match":
+                return self.send_json({"person": mock_person(payload)})
+            if path == "/v1/people/bulk_match":
+                details = payload.get("details", [])
+                return self.send_json(
+                    {"matches": [mock_person(item) for item in details]}
+                )
+            if path == "/v1/organizations/bulk_enrich":
+                return self.send_json(
+                    {
+                        "organizations": [
+                            mock_organisation(domain)
+                            for domain in payload.get("domains", [])
+                        ]
+                    }
+                )
+            self.send_body(404, "{}", "application/json")
+
+    return ReplayHandler
+
+
+def normalise_query(query: str) -> str:
+    return " ".join(re.findall(r"[a-z0-9]+", query.lower()))
+
+
+def domain_results_page(domain: str) -> str:
+    return f"""<!DOCTYPE html>
+<html><body>
+<div id="links" class="results">
+<div class="result"><a class="result__a" href="https://{domain}/">{domain}</a>
+<a class="result__url" href="https://{domain}/">{domain}</a>
+<span class="Wo6ZAEmESLNUuWBkbMxx">{domain}</span></div>
+</div>
+</body></html>
+"""
+
+
+def mock_person(details: dict) -> dict:
+    first_name = str(details.get("first_name") or "").lower()
+    last_name = str(details.get("last_name") or "").lower()
+    handle = "-".join(part for part in [first_name, last_name] if part)
+    return {
+        "linkedin_url": f"http://www.linkedin.com/in/{handle}",
+        "personal_emails": [f"{handle.replace('-', '.')}@example.com"],
+        "phone_numbers": [{"raw_number": "+91 98100 00000"}],
+    }
+
+
+def mock_organisation(domain: str) -> dict:
+    return {
+        "primary_domain": domain,
+        "founded_year": 1990 + len(domain) % 30,
+        "estimated_num_employees": 50 * (1 + len(domain) % 10),
+        "industry": "electrical & electronic manufacturing",
+        "website_url": f"http://www.{domain}",
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve recorded pages locally")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--jitter-ms", type=float, default=0)
+    arguments = parser.parse_args()
+    server = ReplayServer(
+        latency_ms=arguments.latency_ms,
+        jitter_ms=arguments.jitter_ms,
+        port=arguments.port,
+    )
+    server.server.serve_forever()
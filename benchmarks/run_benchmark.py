@@ -0,0 +1,241 @@
+import argparse
+import functools
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from loguru import logger
+
+ROOT_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_PATH)
+
+import main  # noqa: E402
+from benchmarks.replay_server import FIXTURES_PATH, ReplayServer  # noqa: E402
+from utils import (  # noqa: E402
+    utils_find_links,
+    utils_google_page,
+    utils_search_backend,
+)
+from utils.utils_metrics import metrics  # noqa: E402
+from utils.utils_search_backend import SEARCH_BACKENDS  # noqa: E402
+
+
+TIMED_STAGES = {
+    "search": "search_company_link",
+    "profile": "scrape_profile",
+    "owner": "get_owner_details",
+    "company": "get_company_details",
+    "total": "scrape_from_web",
+}
+PERCENTILES = [50, 90, 99]
+HOST_LIMITS_PATH = os.path.join(FIXTURES_PATH, "host_limits.json")
+
+
+class StageTimer:
+    def __init__(self) -> None:
+        self.samples = {stage: [] for stage in TIMED_STAGES}
+        self.lock = threading.Lock()
+
+    def wrap(self, stage: str, function):
+        @functools.wraps(function)
+        def timed(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                with self.lock:
+                    self.samples[stage].append(time.perf_counter() - started)
+
+        return timed
+
+    def install(self):
+        originals = {}
+        for stage, name in TIMED_STAGES.items():
+            originals[name] = getattr(main, name)
+            setattr(main, name, self.wrap(stage=stage, function=originals[name]))
+        return originals
+
+    def report(self) -> dict:
+        report = {}
+        for stage, samples in self.samples.items():
+            if not samples:
+                continue
+            report[stage] = {"count": len(samples)}
+            for quantile in PERCENTILES:
+                report[stage][f"p{quantile}_ms"] = round(
+                    percentile(samples, quantile) * 1000, 1
+                )
+        return report
+
+
+def percentile(samples: list[float], quantile: float) -> float:
+    ordered = sorted(samples)
+    position = (len(ordered) - 1) * quantile / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def count_companies(manifest_path: str) -> int:
+    with open(manifest_path, encoding="utf-8") as file:
+        return max(sum(1 for line in file if line.strip()) - 1, 0)
+
+
+def run_once(
+    server: ReplayServer,
+    manifest_path: str,
+    workers: int,
+    backend: str,
+    load_profile: str,
+    search_backend: str = "html",
+    host_limits_path: str | None = None,
+) -> float:
+    with tempfile.TemporaryDirectory() as workdir:
+        started = time.perf_counter()
+        main.main(
+            input_file_name=manifest_path,
+            filename=os.path.join(workdir, "output.csv"),
+            offset=0,
+            journal_path=os.path.join(workdir, "journal.sqlite"),
+            link_cache_path=os.path.join(workdir, "links.sqlite"),
+            apollo_cache_path=os.path.join(workdir, "apollo.sqlite"),
+            domain_cache_path=os.path.join(workdir, "domains.sqlite"),
+            apollo_base_url=f"{server.base_url}/v1",
+            workers=workers,
+            backend=backend,
+            load_profile=load_profile,
+            search_backend=search_backend,
+            host_limits_path=host_limits_path,
+        )
+        return time.perf_counter() - started
+
+
+def run_benchmark(
+    manifest_path: str,
+    workers: int = 1,
+    backend: str = "selenium",
+    load_profile: str = "fast",
+    latency_ms: float = 0,
+    jitter_ms: float = 0,
+    repeat: int = 1,
+    search_backend: str = "html",
+    host_limits_path: str | None = HOST_LIMITS_PATH,
+) -> dict:
+    timer = StageTimer()
+    originals = timer.install()
+    elapsed = []
+    try:
+        with ReplayServer(latency_ms=latency_ms, jitter_ms=jitter_ms) as server:
+            utils_google_page.SEARCH_URL = f"{server.base_url}/search/"
+            utils_search_backend.SEARCH_HTML_URL = f"{server.base_url}/search/html/"
+            utils_find_links.INDIAMART_BASE_URL = f"{server.base_url}/"
+            for _ in range(repeat):
+                elapsed.append(
+                    run_once(
+                        server=server,
+                        manifest_path=manifest_path,
+                        workers=workers,
+                        backend=backend,
+                        load_profile=load_profile,
+                        search_backend=search_backend,
+                        host_limits_path=host_limits_path,
+                    )
+                )
+            requests = dict(server.requests)
+    finally:
+        for name, function in originals.items():
+            setattr(main, name, function)
+
+    companies = count_companies(manifest_path) * repeat
+    return {
+        "backend": backend,
+        "workers": workers,
+        "load_profile": load_profile,
+        "search_backend": search_backend,
+        "host_limits": host_limits_path,
+        "latency_ms": latency_ms,
+        "jitter_ms": jitter_ms,
+        "companies": companies,
+        "seconds": round(sum(elapsed), 2),
+        "companies_per_minute": round(companies / sum(elapsed) * 60, 1),
+        "stages": timer.report(),
+        "instrumented": metrics.snapshot()["stages"],
+        "transfer": transfer_report(counters=metrics.snapshot()["counters"]),
+        "requests": requests,
+    }
+
+
+def transfer_report(counters: dict) -> dict:
+    if not (pages := counters.get("pages_measured", 0)):
+        return {"pages": 0}
+    return {
+        "pages": pages,
+        "requests_per_page": round(counters.get("page_requests", 0) / pages, 1),
+        "kb_per_page": round(counters.get("page_transfer_bytes", 0) / pages / 1024, 1),
+    }
+
+
+def log_report(report: dict):
+    logger.info(
+        f"{report['companies']} companies in {report['seconds']}s "
+        f"({report['companies_per_minute']}/min) with backend '{report['backend']}' "
+        f"and {report['workers']} worker(s)"
+    )
+    for stage, timings in report["stages"].items():
+        logger.info(f"Stage '{stage}': {timings}")
+    logger.info(f"Page transfer: {report['transfer']}")
+    logger.info(f"Replayed requests: {report['requests']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark the scraper against replayed pages"
+    )
+    parser.add_argument(
+        "--manifest", default=os.path.join(FIXTURES_PATH, "manifest.csv")
+    )
+    parser.add_argument(
+        "--backend", choices=["selenium", "script", "http"], default="selenium"
+    )
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--load-profile", choices=["default", "fast"], default="fast")
+    parser.add_argument("--search-backend", choices=SEARCH_BACKENDS, default="html")
+    parser.add_argument("--latency-ms", type=float, default=50)
+    parser.add_argument("--jitter-ms", type=float, default=0)
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument(
+        "--host-limits",
+        default=HOST_LIMITS_PATH,
+        help="JSON file of per-host rate limits, unlimited for the replay server "
+        "by default",
+    )
+    parser.add_argument("--report", help="Write the report as JSON to this path")
+    parser.add_argument("--log-level", default="WARNING")
+    arguments = parser.parse_args()
+    manifest_path = os.path.abspath(arguments.manifest)
+    host_limits_path = os.path.abspath(arguments.host_limits)
+
+    os.chdir(ROOT_PATH)
+    logger.remove()
+    logger.add(sys.stderr, level=arguments.log_level)
+
+    report = run_benchmark(
+        manifest_path=manifest_path,
+        workers=arguments.workers,
+        backend=arguments.backend,
+        load_profile=arguments.load_profile,
+        latency_ms=arguments.latency_ms,
+        jitter_ms=arguments.jitter_ms,
+        repeat=arguments.repeat,
+        search_backend=arguments.search_backend,
+        host_limits_path=host_limits_path,
+    )
+    logger.remove()
+    logger.add(sys.stderr, level="INFO")
+    log_report(report)
+    if arguments.report:
+        with open(arguments.report, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
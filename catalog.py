@@ -0,0 +1,98 @@
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Iterable, Iterator
+
+from loguru import logger
+
+from utils.utils_output_writer import read_output_rows
+from utils.utils_product_catalog import ProductCatalog
+
+
+def read_outputs(paths: Iterable[str]) -> Iterator[dict]:
+    for path in paths:
+        if not os.path.isfile(path):
+            logger.warning(f"Skipping missing output file '{path}'")
+            continue
+        logger.info(f"Indexing '{path}'")
+        yield from read_output_rows(path=path)
+
+
+def build_catalog(catalog_path: str, outputs: list[str], columnar_path: str | None):
+    catalog = ProductCatalog(path=catalog_path)
+    started = time.perf_counter()
+    companies = catalog.build(rows=read_outputs(paths=outputs))
+    logger.info(
+        f"Indexed {companies} companies in {time.perf_counter() - started:.1f}s: "
+        f"{catalog.stats()}"
+    )
+    if columnar_path:
+        catalog.export_columnar(path=columnar_path)
+        logger.info(f"Wrote product table to '{columnar_path}'")
+    catalog.close()
+
+
+def query_catalog(
+    catalog_path: str, product: str, state: str | None, limit: int, as_json: bool
+):
+    catalog = ProductCatalog(path=catalog_path)
+    started = time.perf_counter()
+    matches = catalog.query(product=product, state=state, limit=limit)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    catalog.close()
+
+    for match in matches:
+        if as_json:
+            print(json.dumps(match._asdict(), ensure_ascii=False))
+        else:
+            print(
+                f"{match.gstin}\t{match.company_name}\t{match.state}\t"
+                f"{'; '.join(match.products)}"
+            )
+    logger.info(f"{len(matches)} companies in {elapsed_ms:.1f} ms")
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(
+        description="Index scraped products and look up companies by product"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build = commands.add_parser("build", help="Add output files to the catalog")
+    build.add_argument("catalog", help="Catalog database to create or update")
+    build.add_argument("outputs", nargs="+", help="Output files (.csv or .jsonl)")
+    build.add_argument(
+        "--columnar", default=None, help="Also write the product table as Parquet"
+    )
+
+    query = commands.add_parser("query", help="Find companies selling a product")
+    query.add_argument("catalog")
+    query.add_argument("product")
+    query.add_argument("--state", default=None)
+    query.add_argument("--limit", type=int, default=100)
+    query.add_argument("--json", action="store_true", help="Print JSON lines")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    arguments = parse_arguments()
+    if arguments.command == "build":
+        build_catalog(
+            catalog_path=arguments.catalog,
+            outputs=arguments.outputs,
+            columnar_path=arguments.columnar,
+        )
+        sys.exit()
+
+    if not os.path.isfile(arguments.catalog):
+        logger.error("Catalog not found.")
+        sys.exit()
+    query_catalog(
+        catalog_path=arguments.catalog,
+        product=arguments.product,
+        state=arguments.state,
+        limit=arguments.limit,
+        as_json=arguments.json,
+    )
@@ -0,0 +1,187 @@
+import argparse
+import os
+import sys
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Iterable, Iterator
+
+from loguru import logger
+
+from utils.utils_apollo_client import (
+    API_KEY,
+    APOLLO_BASE_URL,
+    ApolloError,
+    configure_apollo_client,
+)
+from utils.utils_company_details import (
+    empty_company_details,
+    get_company_details_for_domains,
+)
+from utils.utils_domain_resolver import DomainCache, DomainResolver
+from utils.utils_output_writer import OutputWriter, read_output_rows
+from utils.utils_owner_details import (
+    empty_owner_contact_details,
+    get_owner_details_in_bulk,
+)
+
+
+ENRICHMENT_FIELDS = ["owner", "company"]
+OWNER_COLUMNS = list(empty_owner_contact_details())
+COMPANY_COLUMNS = [
+    column for column in empty_company_details() if column != "website_url"
+]
+
+
+def needs_enrichment(row: dict, columns: list[str], refresh: bool) -> bool:
+    return refresh or not any(row.get(column) for column in columns)
+
+
+def enrich_rows(
+    rows: list[dict], fields: list[str], refresh: bool, domain_resolver: DomainResolver
+) -> list[dict]:
+    try:
+        if "owner" in fields:
+            pending = [
+                row
+                for row in rows
+                if needs_enrichment(row, OWNER_COLUMNS, refresh)
+                and row.get("owner name")
+            ]
+            for row, details in zip(pending, get_owner_details_in_bulk(pending)):
+                row.update(
+                    {column: value for column, value in details.items() if value}
+                )
+
+        if "company" in fields:
+            pending = [
+                row for row in rows if needs_enrichment(row, COMPANY_COLUMNS, refresh)
+            ]
+            domains = [
+                domain_resolver.resolve(
+                    company_name=row.get("company name"), scraped_data=row
+                )
+                for row in pending
+            ]
+            for row, details in zip(
+                pending, get_company_details_for_domains(domains=domains)
+            ):
+                row.update(
+                    {column: value for column, value in details.items() if value}
+                )
+    except ApolloError as e:
+        logger.error(f"Enrichment failed for {len(rows)} rows, keeping them: {e}")
+    return rows
+
+
+def chunked(rows: Iterable[dict], size: int) -> Iterator[list[dict]]:
+    rows = iter(rows)
+    while chunk := list(islice(rows, size)):
+        yield chunk
+
+
+def enrich_concurrently(
+    chunks: Iterable[list[dict]],
+    fields: list[str],
+    refresh: bool,
+    concurrency: int,
+    domain_resolver: DomainResolver,
+) -> Iterator[list[dict]]:
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(
+                executor.submit(enrich_rows, chunk, fields, refresh, domain_resolver)
+            )
+            if len(pending) >= concurrency * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def enrich_file(
+    path: str,
+    fields: list[str],
+    refresh: bool = False,
+    concurrency: int = 8,
+    chunk_size: int = 50,
+    domain_resolver: DomainResolver | None = None,
+):
+    domain_resolver = domain_resolver or DomainResolver(use_search=False)
+    output_format = os.path.splitext(path)[1].lstrip(".")
+    temporary_path = f"{path}.enriching"
+    if os.path.exists(temporary_path):
+        os.remove(temporary_path)
+
+    rows_written = 0
+    with OutputWriter(
+        path=temporary_path, output_format=output_format, flush_rows=500
+    ) as writer:
+        for rows in enrich_concurrently(
+            chunks=chunked(read_output_rows(path=path), size=chunk_size),
+            fields=fields,
+            refresh=refresh,
+            concurrency=concurrency,
+            domain_resolver=domain_resolver,
+        ):
+            for row in rows:
+                writer.write(row)
+            rows_written += len(rows)
+
+    os.replace(temporary_path, path)
+    logger.info(f"Enriched {rows_written} rows in '{path}'")
+    logger.info(f"Domain sources: {domain_resolver.stats()}")
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(
+        description="Refresh Apollo enrichment columns in an existing output file"
+    )
+    parser.add_argument("path", help="Output file to enrich (.csv or .jsonl)")
+    parser.add_argument(
+        "--fields", nargs="+", choices=ENRICHMENT_FIELDS, default=ENRICHMENT_FIELDS
+    )
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="Re-enrich rows that already have values instead of only filling gaps",
+    )
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--chunk-size", type=int, default=50)
+    parser.add_argument(
+        "--api-key", default=os.environ.get("APOLLO_API_KEY", API_KEY)
+    )
+    parser.add_argument("--apollo-base-url", default=APOLLO_BASE_URL)
+    parser.add_argument("--cache-dir", default="shared/cache/")
+    parser.add_argument(
+        "--no-cache", action="store_true", help="Ignore cached Apollo responses"
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    arguments = parse_arguments()
+    if not os.path.isfile(arguments.path):
+        logger.error("File not found.")
+        sys.exit()
+
+    cache_path = f"{arguments.cache_dir}apollo.sqlite"
+    configure_apollo_client(
+        cache_path=None if arguments.no_cache else cache_path,
+        api_key=arguments.api_key,
+        base_url=arguments.apollo_base_url,
+        pool_size=arguments.concurrency,
+    )
+    domain_resolver = DomainResolver(
+        cache=DomainCache(path=f"{arguments.cache_dir}domains.sqlite"),
+        use_search=False,
+    )
+    enrich_file(
+        path=arguments.path,
+        fields=arguments.fields,
+        refresh=arguments.refresh,
+        concurrency=arguments.concurrency,
+        chunk_size=arguments.chunk_size,
+        domain_resolver=domain_resolver,
+    )
+    domain_resolver.close()
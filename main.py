@@ -1,69 +1,999 @@
+import argparse
+import os
 import sys
+import threading
+from functools import partial
+from typing import Callable, Iterable
 
-import pandas as pd
+import requests
 from loguru import logger
+from selenium.common.exceptions import WebDriverException
 from selenium.webdriver import Chrome
 
+from utils.utils_apollo_client import APOLLO_BASE_URL, configure_apollo_client
 from utils.utils_company_details import get_company_details
-from utils.utils_find_links import get_first_site_link
+from utils.utils_disk_cache import MISSING
+from utils.utils_domain_resolver import DomainCache, DomainResolver
+from utils.utils_driver_manager import DriverManager, DriverUnavailableError
+from utils.utils_find_links import first_site_link
+from utils.utils_fingerprint_store import (
+    FingerprintStore,
+    fingerprint,
+    prioritised_companies,
+)
+from utils.utils_grouping import CompanyGroup, fan_out, group_companies
+from utils.utils_host_scheduler import (
+    classify_page,
+    configure_scheduler,
+    get_scheduler,
+)
 from utils.utils_global import (
-    get_companies_dataframe,
-    managed_selenium_driver,
     close_current_tab_and_switch_to_new_one,
     get_random_filename,
-    write_dict_to_csv, get_all_states_of_india,
 )
-from utils.utils_google_page import get_google_page
+from utils.utils_http_scraper import HttpCompany
+from utils.utils_http_session import create_http_session
+from utils.utils_init_selenium import initialise_selenium_driver
+from utils.utils_input_reader import CompanyRow, ReaderStats, read_company_chunks
+from utils.utils_load_profile import LOAD_PROFILES, LoadProfile
+from utils.utils_link_cache import LinkCache
+from utils.utils_metrics import MetricsServer, MetricsSnapshotWriter, metrics
+from utils.utils_output_writer import OUTPUT_FORMATS, OutputWriter
 from utils.utils_owner_details import get_owner_details
+from utils.utils_page_archive import PageArchive, archive_page
+from utils.utils_pipeline import StagedPipeline
+from utils.utils_run_journal import RunJournal
+from utils.utils_search_backend import (
+    SEARCH_BACKENDS,
+    configure_search_backend,
+    get_search_backend,
+    search_company,
+)
+from utils.utils_state_resolver import StateResolver, get_state_resolver
+from utils.utils_tab_pool import TabPool
+from utils.utils_tab_scraper import TabCompany
 from utils.utils_website_scraper import Company
+from utils.utils_work_queue import (
+    QueueWriter,
+    WorkQueue,
+    default_worker_id,
+    leased_companies,
+)
+from utils.utils_worker_pool import WorkerPool
+
+
+class RunContext:
+    def __init__(
+        self,
+        state_resolver: StateResolver,
+        journal: RunJournal,
+        link_cache: LinkCache,
+        writer: OutputWriter,
+        create_driver_manager=DriverManager,
+        session: requests.Session | None = None,
+        extraction_mode: str = "webdriver",
+        exporters: list | None = None,
+        domain_resolver: DomainResolver | None = None,
+        archive: PageArchive | None = None,
+        fingerprints: FingerprintStore | None = None,
+        load_profile: LoadProfile | None = None,
+    ) -> None:
+        self.state_resolver = state_resolver
+        self.journal = journal
+        self.link_cache = link_cache
+        self.writer = writer
+        self.create_driver_manager = create_driver_manager
+        self.session = session
+        self.extraction_mode = extraction_mode
+        self.exporters = list(exporters or [])
+        self.domain_resolver = domain_resolver or DomainResolver()
+        self.archive = archive
+        self.fingerprints = fingerprints
+        self.load_profile = load_profile
+
+    def log_summary(self):
+        self.journal.log_summary()
+        logger.info(f"Link cache: {self.link_cache.stats()}")
+        logger.info(f"Domain sources: {self.domain_resolver.stats()}")
+        if self.archive is not None:
+            logger.info(f"Page archive: {self.archive.stats()}")
+        logger.info(f"Host scheduler: {get_scheduler().stats()}")
+        if self.fingerprints is not None:
+            logger.info(f"Refresh outcomes: {self.fingerprints.stats()}")
+        metrics.log_summary()
+
+    def close(self):
+        for exporter in self.exporters:
+            exporter.stop()
+        self.writer.close()
+        self.log_summary()
+        self.journal.close()
+        self.link_cache.close()
+        self.domain_resolver.close()
+        if self.archive is not None:
+            self.archive.close()
+        if self.fingerprints is not None:
+            self.fingerprints.close()
+
+
+def search_company_link(
+    driver: Chrome,
+    company: CompanyRow,
+    link_cache: LinkCache,
+    archive: PageArchive | None = None,
+):
+    if (link := link_cache.get_link(company=company)) is not MISSING:
+        logger.debug(f"Link cache hit for '{company.GSTIN}': {link}")
+        return link
 
+    if (results := search_company(driver=driver, company=company)) is None:
+        raise WebDriverException("Search page could not be loaded")
+    archive_page(
+        archive=archive,
+        url=results.url,
+        content=results.page_source,
+        kind="search",
+        gstin=company.GSTIN,
+    )
 
-def scrape_from_web(driver: Chrome, company: pd.Series, filename: str, states: list):
-    link = get_first_site_link(driver=driver)
+    link = first_site_link(
+        page_source=results.page_source,
+        url=results.url,
+        company_name=company.COMPANY_NAME,
+    )
     if not isinstance(link, str):
-        return None
+        if classify_page(page_source=results.page_source) == "throttled":
+            raise WebDriverException("Search returned a challenge page")
+        link = None
+    link_cache.set_link(company=company, link=link)
+    return link
+
+
+def scrape_profile(
+    driver: Chrome,
+    company: CompanyRow,
+    link: str,
+    state_resolver: StateResolver,
+    session: requests.Session | None = None,
+    extraction_mode: str = "webdriver",
+    archive: PageArchive | None = None,
+):
+    if session is not None:
+        company_instance = HttpCompany(
+            session=session,
+            gstin=company.GSTIN,
+            company_name=company.COMPANY_NAME,
+            page_link=link,
+            state_resolver=state_resolver,
+            archive=archive,
+        )
+        if company_instance.has_data():
+            return company_instance.get_scraped_data()
+        logger.debug("HTTP scraper found nothing, falling back to Selenium")
 
     company_instance = Company(
         driver=driver,
         gstin=company.GSTIN,
         company_name=company.COMPANY_NAME,
         page_link=link,
-        states=states
+        state_resolver=state_resolver,
+        extraction_mode=extraction_mode,
+        archive=archive,
+    )
+    return company_instance.get_scraped_data()
+
+
+def scrape_from_web(driver: Chrome, company: CompanyRow, context: RunContext):
+    scraped_data = browse_company(driver=driver, company=company, context=context)
+    if scraped_data is None:
+        return None
+    return enrich_company(
+        driver=driver, company=company, scraped_data=scraped_data, context=context
+    )
+
+
+def browse_company(driver: Chrome, company: CompanyRow, context: RunContext):
+    gstin = company.GSTIN
+    journal = context.journal
+    if journal.is_finished(gstin):
+        logger.debug(f"Skipping '{gstin}', already finished")
+        return None
+
+    scraped_data = find_page_link(driver=driver, company=company, context=context)
+    if scraped_data is None:
+        return None
+
+    if journal.needs_stage(gstin, "profile"):
+        with journal.stage(gstin, "profile"):
+            scraped_data = scrape_profile(
+                driver=driver,
+                company=company,
+                link=scraped_data["page link"],
+                state_resolver=context.state_resolver,
+                session=context.session,
+                extraction_mode=context.extraction_mode,
+                archive=context.archive,
+            )
+            journal.save_data(gstin, scraped_data)
+    return scraped_data
+
+
+def find_page_link(driver: Chrome, company: CompanyRow, context: RunContext):
+    gstin = company.GSTIN
+    journal = context.journal
+    scraped_data = journal.load_data(gstin)
+    if journal.needs_stage(gstin, "search"):
+        with journal.stage(gstin, "search"):
+            scraped_data["page link"] = search_company_link(
+                driver=driver,
+                company=company,
+                link_cache=context.link_cache,
+                archive=context.archive,
+            )
+            journal.save_data(gstin, scraped_data)
+        if not isinstance(scraped_data["page link"], str):
+            journal.mark(gstin, "search", "not_found")
+            metrics.increment("companies_not_found")
+            return None
+    return scraped_data
+
+
+def enrich_company(
+    driver: Chrome | None,
+    company: CompanyRow,
+    scraped_data: dict,
+    context: RunContext,
+):
+    gstin = company.GSTIN
+    journal = context.journal
+    if journal.needs_stage(gstin, "owner"):
+        with journal.stage(gstin, "owner"):
+            scraped_data.update(get_owner_details(scraped_data))
+            journal.save_data(gstin, scraped_data)
+
+    if journal.needs_stage(gstin, "company"):
+        with journal.stage(gstin, "company"):
+            scraped_data.update(
+                get_company_details(
+                    driver=driver,
+                    company_name=scraped_data.get("company name"),
+                    scraped_data=scraped_data,
+                    domain_resolver=context.domain_resolver,
+                )
+            )
+            journal.save_data(gstin, scraped_data)
+
+    metrics.increment("companies_scraped")
+    logger.info(scraped_data)
+    return scraped_data
+
+
+def process_company(driver: Chrome, company: CompanyRow, context: RunContext):
+    scraped_data = scrape_from_web(driver=driver, company=company, context=context)
+    close_current_tab_and_switch_to_new_one(
+        driver=driver, load_profile=context.load_profile
+    )
+    return scraped_data
+
+
+def refresh_company(driver: Chrome, company: CompanyRow, context: RunContext):
+    scraped_data = refresh_from_web(driver=driver, company=company, context=context)
+    close_current_tab_and_switch_to_new_one(
+        driver=driver, load_profile=context.load_profile
     )
-    scraped_data = company_instance.get_scraped_data()
-    scraped_data.update(get_owner_details(scraped_data))
-    scraped_data.update(
-        get_company_details(
-            driver=driver, company_name=scraped_data.get("company name")
+    return scraped_data
+
+
+def refresh_from_web(driver: Chrome, company: CompanyRow, context: RunContext):
+    store, gstin = context.fingerprints, company.GSTIN
+    record = store.get(gstin)
+    try:
+        link = record.page_link if record is not None else None
+        if not link:
+            link = search_company_link(
+                driver=driver,
+                company=company,
+                link_cache=context.link_cache,
+                archive=context.archive,
+            )
+        if not isinstance(link, str):
+            store.mark(gstin, status="not_found")
+            return None
+
+        scraped_data, validators = refresh_profile(
+            driver=driver,
+            company=company,
+            link=link,
+            validators=record.validators if record is not None else None,
+            context=context,
         )
+        if scraped_data is None:
+            store.touch(gstin, outcome="not_modified", validators=validators)
+            return None
+
+        digest = fingerprint(scraped_data)
+        if record is not None and record.fingerprint == digest:
+            store.touch(gstin, outcome="unchanged", validators=validators)
+            return None
+
+        scraped_data.update(get_owner_details(scraped_data))
+        scraped_data.update(
+            get_company_details(
+                driver=driver,
+                company_name=scraped_data.get("company name"),
+                scraped_data=scraped_data,
+                domain_resolver=context.domain_resolver,
+            )
+        )
+    except Exception as e:
+        store.mark(gstin, status="failed", error=str(e))
+        raise
+
+    store.save(
+        gstin, page_link=link, digest=digest, data=scraped_data, validators=validators
     )
     logger.info(scraped_data)
-    write_dict_to_csv(file_path=filename, data_dict=scraped_data)
+    return scraped_data
+
+
+def refresh_profile(
+    driver: Chrome,
+    company: CompanyRow,
+    link: str,
+    validators: dict | None,
+    context: RunContext,
+) -> tuple[dict | None, dict]:
+    if context.session is not None:
+        company_instance = HttpCompany(
+            session=context.session,
+            gstin=company.GSTIN,
+            company_name=company.COMPANY_NAME,
+            page_link=link,
+            state_resolver=context.state_resolver,
+            archive=context.archive,
+            validators=validators,
+        )
+        if company_instance.not_modified:
+            return None, company_instance.validators
+        if company_instance.has_data():
+            return company_instance.get_scraped_data(), company_instance.validators
+
+    scraped_data = scrape_profile(
+        driver=driver,
+        company=company,
+        link=link,
+        state_resolver=context.state_resolver,
+        extraction_mode=context.extraction_mode,
+        archive=context.archive,
+    )
+    return scraped_data, {}
+
+
+def process_browser_stages(driver: Chrome, company: CompanyRow, context: RunContext):
+    scraped_data = browse_company(driver=driver, company=company, context=context)
+    if scraped_data is not None and context.journal.needs_stage(
+        company.GSTIN, "company"
+    ):
+        context.domain_resolver.prefetch(
+            company_name=scraped_data.get("company name"),
+            scraped_data=scraped_data,
+            driver=driver,
+        )
+    close_current_tab_and_switch_to_new_one(
+        driver=driver, load_profile=context.load_profile
+    )
+    return scraped_data
+
+
+def search_tab_company(company: CompanyRow, context: RunContext):
+    if not context.journal.is_finished(company.GSTIN):
+        find_page_link(driver=None, company=company, context=context)
+
+
+def open_tab_company(driver: Chrome, company: CompanyRow, context: RunContext):
+    gstin = company.GSTIN
+    journal = context.journal
+    if journal.is_finished(gstin):
+        logger.debug(f"Skipping '{gstin}', already finished")
+        return None
+
+    scraped_data = find_page_link(driver=driver, company=company, context=context)
+    if scraped_data is None or not journal.needs_stage(gstin, "profile"):
+        return None
+    return TabCompany(
+        driver=driver,
+        gstin=gstin,
+        company_name=company.COMPANY_NAME,
+        page_link=scraped_data["page link"],
+        state_resolver=context.state_resolver,
+        archive=context.archive,
+    )
+
+
+def finish_tab_company(
+    company: CompanyRow, tab_company: TabCompany | None, context: RunContext
+):
+    gstin = company.GSTIN
+    journal = context.journal
+    if tab_company is not None:
+        scraped_data = tab_company.get_scraped_data()
+        journal.save_data(gstin, scraped_data)
+        journal.mark(gstin, "profile", "done")
+    elif journal.is_finished(gstin) or journal.needs_stage(gstin, "profile"):
+        return None
+    else:
+        scraped_data = journal.load_data(gstin)
+    return enrich_company(
+        driver=None, company=company, scraped_data=scraped_data, context=context
+    )
+
+
+def process_group(driver: Chrome, group: CompanyGroup, context: RunContext):
+    journal = context.journal
+    rows, shared_data = [], None
+    for member in group.members:
+        if shared_data is None:
+            scraped_data = process_company(
+                driver=driver, company=member, context=context
+            )
+            if scraped_data is not None:
+                rows.append(scraped_data)
+                shared_data = scraped_data
+            elif journal.is_complete(member.GSTIN):
+                shared_data = journal.load_data(member.GSTIN)
+            continue
+
+        if journal.is_finished(member.GSTIN):
+            continue
+        data = fan_out(
+            scraped_data=shared_data,
+            member=member,
+            state_resolver=context.state_resolver,
+        )
+        journal.mark_shared(member.GSTIN, data)
+        rows.append(data)
+    return rows
+
+
+def mark_rows_written(journal: RunJournal, rows: list[dict]):
+    for row in rows:
+        journal.mark_written(row["gstin"])
 
 
-def main(input_file_name: str, filename: str, offset: int):
-    companies = get_companies_dataframe(path=input_file_name)
-    if not isinstance(companies, pd.DataFrame):
+def main(
+    input_file_name: str,
+    filename: str,
+    offset: int,
+    journal_path: str,
+    link_cache_path: str,
+    apollo_cache_path: str,
+    domain_cache_path: str | None = None,
+    link_cache_ttl_days: float = 30,
+    apollo_base_url: str = APOLLO_BASE_URL,
+    workers: int = 1,
+    backend: str = "selenium",
+    recycle_after: int | None = 200,
+    max_browser_rss_mb: float | None = 1500,
+    load_profile: str = "fast",
+    shard: int = 0,
+    shards: int = 1,
+    group_by_pan: bool = False,
+    metrics_port: int | None = None,
+    metrics_snapshot_path: str | None = None,
+    metrics_interval_seconds: float = 30,
+    queue_path: str | None = None,
+    worker_id: str | None = None,
+    lease_batch: int = 50,
+    lease_seconds: float = 600,
+    archive_path: str | None = None,
+    host_limits_path: str | None = None,
+    pipeline: bool = False,
+    enrich_workers: int = 4,
+    pipeline_queue_size: int = 16,
+    search_backend: str = "html",
+    refresh_store_path: str | None = None,
+    refresh_ttl_days: float = 30,
+    tabs: int = 1,
+):
+    work_queue = None
+    if queue_path:
+        work_queue = WorkQueue(path=queue_path, lease_seconds=lease_seconds)
+        worker_id = worker_id or default_worker_id()
+    elif not os.path.isfile(input_file_name):
+        logger.error("File not found.")
         sys.exit()
 
-    with managed_selenium_driver() as driver:
-        for index, company in companies.iterrows():
-            if int(index) < offset:
+    reader_stats = ReaderStats()
+    companies = read_companies(
+        path=input_file_name,
+        offset=offset,
+        shard=shard,
+        shards=shards,
+        stats=reader_stats,
+    )
+
+    exporters = []
+    if metrics_port:
+        exporters.append(MetricsServer(port=metrics_port))
+    if metrics_snapshot_path:
+        exporters.append(
+            MetricsSnapshotWriter(
+                path=metrics_snapshot_path, interval_seconds=metrics_interval_seconds
+            )
+        )
+    for exporter in exporters:
+        exporter.start()
+
+    configure_scheduler(path=host_limits_path)
+    configure_search_backend(name=search_backend, pool_size=max(workers, 1))
+    configure_apollo_client(
+        cache_path=apollo_cache_path,
+        base_url=apollo_base_url,
+        pool_size=max(
+            workers,
+            enrich_workers if pipeline else 1,
+            workers * enrich_workers if tabs > 1 else 1,
+        ),
+    )
+    journal = RunJournal(path=journal_path)
+    context = RunContext(
+        state_resolver=get_state_resolver(path="uploads/states.csv"),
+        journal=journal,
+        link_cache=LinkCache(path=link_cache_path, ttl_days=link_cache_ttl_days),
+        writer=QueueWriter(work_queue=work_queue, worker=worker_id)
+        if work_queue is not None
+        else OutputWriter(
+            path=filename,
+            on_flush=lambda rows: mark_rows_written(journal=journal, rows=rows),
+        ),
+        create_driver_manager=partial(
+            DriverManager,
+            recycle_after=recycle_after,
+            max_rss_mb=max_browser_rss_mb,
+            factory=partial(
+                initialise_selenium_driver, load_profile=LOAD_PROFILES[load_profile]
+            ),
+        ),
+        exporters=exporters,
+        domain_resolver=DomainResolver(
+            cache=DomainCache(path=domain_cache_path) if domain_cache_path else None
+        ),
+        archive=PageArchive(path=archive_path) if archive_path else None,
+        fingerprints=(
+            FingerprintStore(path=refresh_store_path, ttl_days=refresh_ttl_days)
+            if refresh_store_path
+            else None
+        ),
+        load_profile=LOAD_PROFILES[load_profile],
+    )
+    if backend == "http":
+        context.session = create_http_session(pool_size=max(workers, 1) * 2)
+    elif backend == "script":
+        context.extraction_mode = "script"
+
+    items, process = companies, process_company
+    if work_queue is not None:
+        if pipeline or group_by_pan or tabs > 1 or context.fingerprints is not None:
+            logger.warning(
+                "Queue workers run neither pipeline, tabs, refresh nor group rows by "
+                "PAN, ignoring them"
+            )
+    elif context.fingerprints is not None:
+        if pipeline or group_by_pan or tabs > 1:
+            logger.warning("Refresh runs neither pipeline, tabs nor group rows by PAN")
+        pipeline, tabs = False, 1
+        passes = iter([companies])
+
+        def read_pass() -> Iterable[CompanyRow]:
+            return next(passes, None) or read_companies(
+                path=input_file_name,
+                offset=offset,
+                shard=shard,
+                shards=shards,
+                stats=ReaderStats(),
+            )
+
+        items = prioritised_companies(read=read_pass, store=context.fingerprints)
+        process = refresh_company
+    elif tabs > 1 and (pipeline or group_by_pan):
+        logger.warning("Tabs neither pipeline nor group rows by PAN, ignoring both")
+        pipeline = False
+    elif pipeline and group_by_pan:
+        logger.warning("The staged pipeline does not group by PAN, ignoring it")
+    elif group_by_pan:
+        items, process = group_companies(companies=companies), process_group
+
+    if work_queue is not None:
+        run_from_queue(
+            work_queue=work_queue,
+            worker_id=worker_id,
+            lease_batch=lease_batch,
+            workers=workers,
+            context=context,
+        )
+        logger.info(f"Queue: {work_queue.counts()}")
+        work_queue.close()
+    elif tabs > 1:
+        run_in_tabs(
+            items=items,
+            browsers=workers,
+            tabs=tabs,
+            finishers=enrich_workers,
+            context=context,
+        )
+    elif pipeline:
+        run_pipeline(
+            items=items,
+            browsers=workers,
+            enrichers=enrich_workers,
+            queue_size=pipeline_queue_size,
+            context=context,
+        )
+    elif workers > 1:
+        run_with_workers(
+            items=items,
+            process=process,
+            workers=workers,
+            context=context,
+            skip_finished=context.fingerprints is None,
+        )
+    else:
+        run_sequentially(items=items, process=process, context=context)
+
+    if work_queue is None:
+        logger.info(f"Input rows: {reader_stats.as_dict()}")
+    context.close()
+
+
+def read_companies(path: str, stats: ReaderStats, **kwargs) -> Iterable[CompanyRow]:
+    return (
+        company
+        for chunk in read_company_chunks(path=path, stats=stats, **kwargs)
+        for company in chunk
+    )
+
+
+def load_queue(input_file_name: str, queue_path: str, **kwargs):
+    if not os.path.isfile(input_file_name):
+        logger.error("File not found.")
+        sys.exit()
+
+    reader_stats = ReaderStats()
+    work_queue = WorkQueue(path=queue_path)
+    work_queue.load(
+        companies=read_companies(path=input_file_name, stats=reader_stats, **kwargs)
+    )
+    logger.info(f"Input rows: {reader_stats.as_dict()}")
+    logger.info(f"Queue: {work_queue.counts()}")
+    work_queue.close()
+
+
+def export_refresh(refresh_store_path: str, filename: str):
+    store = FingerprintStore(path=refresh_store_path)
+    with OutputWriter(path=filename) as writer:
+        for row in store.rows():
+            writer.write(row)
+    logger.info(f"Exported refreshed companies to '{filename}'")
+    store.close()
+
+
+def export_queue(queue_path: str, filename: str):
+    work_queue = WorkQueue(path=queue_path)
+    with OutputWriter(path=filename) as writer:
+        for row in work_queue.results():
+            writer.write(row)
+    logger.info(f"Exported queue results to '{filename}': {work_queue.counts()}")
+    work_queue.close()
+
+
+def is_item_finished(item: CompanyRow | CompanyGroup, journal: RunJournal) -> bool:
+    members = item.members if isinstance(item, CompanyGroup) else [item]
+    return all(journal.is_finished(member.GSTIN) for member in members)
+
+
+def write_results(writer: OutputWriter, results: dict | list[dict] | None):
+    for row in results if isinstance(results, list) else [results]:
+        if row is not None:
+            writer.write(row)
+
+
+def run_sequentially(
+    items: Iterable[CompanyRow | CompanyGroup],
+    process: Callable,
+    context: RunContext,
+):
+    with context.create_driver_manager() as manager:
+        for item in items:
+            try:
+                results = manager.run(
+                    lambda driver: process(driver, item, context=context)
+                )
+            except DriverUnavailableError as e:
+                logger.error(f"Stopping run, no driver available: {e}")
+                return None
+            except Exception as e:
+                logger.error(f"Failed to scrape input row {item.index}: {e}")
                 continue
 
-            if get_google_page(driver=driver, company=company):
-                states = get_all_states_of_india(path="uploads/states.csv")
-                scrape_from_web(driver=driver, company=company, filename=filename, states=states)
-                close_current_tab_and_switch_to_new_one(driver)
-            else:
+            write_results(writer=context.writer, results=results)
+
+        logger.info(f"Driver stats: {manager.stats()}")
+
+
+def run_with_workers(
+    items: Iterable[CompanyRow | CompanyGroup],
+    process: Callable,
+    workers: int,
+    context: RunContext,
+    skip_finished: bool = True,
+):
+    pool = WorkerPool(
+        process_row=lambda driver, item: process(driver, item, context=context),
+        write_row=context.writer.write,
+        workers=workers,
+        create_manager=context.create_driver_manager,
+    )
+    pool.run(
+        (item.index, item)
+        for item in items
+        if not (skip_finished and is_item_finished(item=item, journal=context.journal))
+    )
+
+
+def run_pipeline(
+    items: Iterable[CompanyRow],
+    browsers: int,
+    enrichers: int,
+    queue_size: int,
+    context: RunContext,
+):
+    pipeline = StagedPipeline(
+        browse=lambda driver, company: process_browser_stages(
+            driver=driver, company=company, context=context
+        ),
+        enrich=lambda company, scraped_data: enrich_company(
+            driver=None, company=company, scraped_data=scraped_data, context=context
+        ),
+        write=context.writer.write,
+        create_manager=context.create_driver_manager,
+        browsers=browsers,
+        enrichers=enrichers,
+        queue_size=queue_size,
+    )
+    pipeline.run(
+        item
+        for item in items
+        if not is_item_finished(item=item, journal=context.journal)
+    )
+
+
+def run_in_tabs(
+    items: Iterable[CompanyRow],
+    browsers: int,
+    tabs: int,
+    finishers: int,
+    context: RunContext,
+):
+    rows = (
+        (item.index, item)
+        for item in items
+        if not is_item_finished(item=item, journal=context.journal)
+    )
+    lock = threading.Lock()
+
+    def shared_rows():
+        while True:
+            with lock:
+                row = next(rows, None)
+            if row is None:
                 return None
+            yield row
+
+    def work():
+        pool = TabPool(
+            start=lambda driver, company: open_tab_company(
+                driver=driver, company=company, context=context
+            ),
+            finish=lambda company, tab_company: finish_tab_company(
+                company=company, tab_company=tab_company, context=context
+            ),
+            write=context.writer.write,
+            create_manager=context.create_driver_manager,
+            tabs=tabs,
+            finishers=finishers,
+            prepare_tab=(
+                context.load_profile.apply_to_driver
+                if context.load_profile is not None
+                else None
+            ),
+            prefetch=(
+                partial(search_tab_company, context=context)
+                if get_search_backend().name != "selenium"
+                else None
+            ),
+        )
+        pool.run(shared_rows())
+
+    if browsers <= 1:
+        return work()
+
+    threads = [
+        threading.Thread(target=work, name=f"browser-{number}", daemon=True)
+        for number in range(browsers)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def run_from_queue(
+    work_queue: WorkQueue,
+    worker_id: str,
+    lease_batch: int,
+    workers: int,
+    context: RunContext,
+):
+    def is_not_found(gstin: str) -> bool:
+        return context.journal.stage_status(gstin, "search") == "not_found"
+
+    def work(worker: str):
+        run_sequentially(
+            items=leased_companies(
+                work_queue=work_queue,
+                worker=worker,
+                batch_size=lease_batch,
+                is_not_found=is_not_found,
+            ),
+            process=process_company,
+            context=context,
+        )
+
+    if workers <= 1:
+        return work(worker=worker_id)
+
+    threads = [
+        threading.Thread(target=work, args=(f"{worker_id}-{number}",), daemon=True)
+        for number in range(workers)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Scrape IndiaMart company profiles")
+    parser.add_argument("--job", default=None)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--offset", type=int, default=0)
+    parser.add_argument("--shard", type=int, default=0)
+    parser.add_argument("--shards", type=int, default=1)
+    parser.add_argument("--group-by-pan", action="store_true")
+    parser.add_argument(
+        "--backend", choices=["selenium", "script", "http"], default="selenium"
+    )
+    parser.add_argument("--output-format", choices=OUTPUT_FORMATS, default="csv")
+    parser.add_argument("--load-profile", choices=list(LOAD_PROFILES), default="fast")
+    parser.add_argument("--recycle-after", type=int, default=200)
+    parser.add_argument("--max-browser-rss-mb", type=float, default=1500)
+    parser.add_argument("--cache-dir", default="shared/cache/")
+    parser.add_argument("--link-cache-ttl-days", type=float, default=30)
+    parser.add_argument("--apollo-base-url", default=APOLLO_BASE_URL)
+    parser.add_argument("--metrics-port", type=int, default=None)
+    parser.add_argument("--metrics-interval", type=float, default=30)
+    parser.add_argument("--queue", default=None, help="Shared work queue database")
+    parser.add_argument(
+        "--queue-mode", choices=["load", "work", "export"], default="work"
+    )
+    parser.add_argument("--worker-id", default=None)
+    parser.add_argument("--lease-batch", type=int, default=50)
+    parser.add_argument("--lease-seconds", type=float, default=600)
+    parser.add_argument(
+        "--archive-dir", default=None, help="Save raw pages for offline re-parsing"
+    )
+    parser.add_argument(
+        "--host-limits", default=None, help="JSON file of per-host rate limits"
+    )
+    parser.add_argument(
+        "--pipeline",
+        action="store_true",
+        help="Overlap browsing with Apollo enrichment and output in staged queues",
+    )
+    parser.add_argument("--enrich-workers", type=int, default=4)
+    parser.add_argument(
+        "--tabs",
+        type=int,
+        default=1,
+        help="Scrape this many companies concurrently in tabs of each browser",
+    )
+    parser.add_argument("--pipeline-queue-size", type=int, default=16)
+    parser.add_argument(
+        "--search-backend",
+        choices=SEARCH_BACKENDS,
+        default="html",
+        help="'html' queries the HTML results endpoint and falls back to Selenium",
+    )
+    parser.add_argument(
+        "--refresh-store",
+        default=None,
+        help="Fingerprint database; only new, failed or stale companies are "
+        "scraped and only changed rows are written",
+    )
+    parser.add_argument("--refresh-ttl-days", type=float, default=30)
+    parser.add_argument(
+        "--refresh-export",
+        action="store_true",
+        help="Write the latest row of every company in the refresh store",
+    )
+    return parser.parse_args()
 
 
 if __name__ == "__main__":
+    arguments = parse_arguments()
     input_folder_path = "uploads/"
     output_folder_path = "shared/outgoing/"
     input_file = f"{input_folder_path}companies.csv"
-    output_file = get_random_filename(
-        path=output_folder_path, size=25, extension=".csv"
+    job_path = (
+        f"{output_folder_path}{arguments.job}"
+        if arguments.job
+        else get_random_filename(path=output_folder_path, size=25, extension="")
+    )
+    if arguments.queue and arguments.queue_mode == "load":
+        load_queue(
+            input_file_name=input_file,
+            queue_path=arguments.queue,
+            offset=arguments.offset,
+            shard=arguments.shard,
+            shards=arguments.shards,
+        )
+        sys.exit()
+    if arguments.queue and arguments.queue_mode == "export":
+        export_queue(
+            queue_path=arguments.queue,
+            filename=f"{job_path}.{arguments.output_format}",
+        )
+        sys.exit()
+
+    if arguments.refresh_store and arguments.refresh_export:
+        export_refresh(
+            refresh_store_path=arguments.refresh_store,
+            filename=f"{job_path}.{arguments.output_format}",
+        )
+        sys.exit()
+
+    main(
+        input_file_name=input_file,
+        filename=f"{job_path}.{arguments.output_format}",
+        offset=arguments.offset,
+        journal_path=f"{job_path}.sqlite",
+        link_cache_path=f"{arguments.cache_dir}links.sqlite",
+        apollo_cache_path=f"{arguments.cache_dir}apollo.sqlite",
+        domain_cache_path=f"{arguments.cache_dir}domains.sqlite",
+        link_cache_ttl_days=arguments.link_cache_ttl_days,
+        apollo_base_url=arguments.apollo_base_url,
+        workers=arguments.workers,
+        backend=arguments.backend,
+        recycle_after=arguments.recycle_after,
+        max_browser_rss_mb=arguments.max_browser_rss_mb,
+        load_profile=arguments.load_profile,
+        shard=arguments.shard,
+        shards=arguments.shards,
+        group_by_pan=arguments.group_by_pan,
+        metrics_port=arguments.metrics_port,
+        metrics_snapshot_path=f"{job_path}.metrics.json",
+        metrics_interval_seconds=arguments.metrics_interval,
+        queue_path=arguments.queue,
+        worker_id=arguments.worker_id,
+        lease_batch=arguments.lease_batch,
+        lease_seconds=arguments.lease_seconds,
+        archive_path=arguments.archive_dir,
+        host_limits_path=arguments.host_limits,
+        pipeline=arguments.pipeline,
+        enrich_workers=arguments.enrich_workers,
+        pipeline_queue_size=arguments.pipeline_queue_size,
+        search_backend=arguments.search_backend,
+        refresh_store_path=arguments.refresh_store,
+        refresh_ttl_days=arguments.refresh_ttl_days,
+        tabs=arguments.tabs,
     )
-    main(input_file_name=input_file, filename=output_file, offset=0)
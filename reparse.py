@@ -0,0 +1,183 @@
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from loguru import logger
+
+from utils.utils_find_links import rank_indiamart_links
+from utils.utils_http_scraper import extract_profile_fields, parse_html
+from utils.utils_output_writer import OutputWriter, read_output_rows
+from utils.utils_page_archive import ArchivedPage, PageArchive, read_archived_page
+from utils.utils_state_resolver import (
+    StateResolver,
+    extract_zip_code,
+    get_state_resolver,
+)
+
+
+PAGE_COLUMNS = {
+    "address": "address",
+    "owner": "owner name",
+    "phone": "phone number",
+    "products": "products",
+    "nature_of_business": "nature of business",
+    "annual_turnover": "annual turnover",
+}
+REPARSED_COLUMNS = ["page link", "state", "zip code"] + list(PAGE_COLUMNS.values())
+
+state_resolver: StateResolver | None = None
+
+
+def initialise_worker(states_path: str):
+    global state_resolver
+    state_resolver = get_state_resolver(path=states_path)
+
+
+def reparse_company(
+    task: tuple[str, dict[str, ArchivedPage], str | None], archive_path: str
+) -> dict:
+    gstin, pages, company_name = task
+    sources = {
+        kind: read_archived_page(archive_path=archive_path, page=page)
+        for kind, page in pages.items()
+    }
+    trees = {
+        kind: parse_html(content=source, url=pages[kind].url)
+        for kind, source in sources.items()
+    }
+
+    row = {"gstin": gstin, "page link": None}
+    if "search" in sources and (
+        links := rank_indiamart_links(
+            page_source=sources["search"], company_name=company_name
+        )
+    ):
+        row["page link"] = links[0]
+
+    if (profile_page := trees.get("profile")) is not None:
+        row["page link"] = pages["profile"].url
+        contact_page = trees.get("contact")
+        home_page = trees.get("home")
+        if home_page is None:
+            home_page = profile_page if contact_page is None else contact_page
+        fields = extract_profile_fields(
+            profile_page=profile_page, contact_page=contact_page, home_page=home_page
+        )
+        for name, column in PAGE_COLUMNS.items():
+            row[column] = fields.get(name)
+        row["website links"] = fields.get("website_links", [])
+
+    row["zip code"] = extract_zip_code(row.get("address"))
+    row["state"] = state_resolver.resolve(
+        address=row.get("address"), zip_code=row["zip code"], gstin=gstin
+    )
+    return row
+
+
+def reparse_archive(
+    archive_path: str,
+    workers: int,
+    states_path: str,
+    company_names: dict[str, str] | None = None,
+) -> dict[str, dict]:
+    archive = PageArchive(path=archive_path)
+    company_names = company_names or {}
+    tasks = [
+        (gstin, pages, company_names.get(gstin))
+        for gstin, pages in archive.latest_pages()
+    ]
+    archive.close()
+    logger.info(f"Re-parsing {len(tasks)} archived companies with {workers} workers")
+
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=initialise_worker, initargs=(states_path,)
+    ) as executor:
+        rows = executor.map(
+            partial(reparse_company, archive_path=archive_path),
+            tasks,
+            chunksize=20,
+        )
+        return {row["gstin"]: row for row in rows}
+
+
+def read_company_names(output_path: str) -> dict[str, str]:
+    if not os.path.exists(output_path):
+        return {}
+    return {
+        row["gstin"]: row["company name"]
+        for row in read_output_rows(path=output_path)
+        if row.get("gstin") and row.get("company name")
+    }
+
+
+def merge_rows(existing: dict, reparsed: dict, columns: list[str]) -> dict:
+    merged = dict(existing)
+    for column in columns:
+        if reparsed.get(column) not in (None, "", {}, []):
+            merged[column] = reparsed[column]
+    return merged
+
+
+def write_reparsed(output_path: str, reparsed: dict[str, dict], columns: list[str]):
+    output_format = os.path.splitext(output_path)[1].lstrip(".")
+    if not os.path.exists(output_path):
+        with OutputWriter(path=output_path, output_format=output_format) as writer:
+            for row in reparsed.values():
+                writer.write(row)
+        logger.info(f"Wrote {len(reparsed)} re-parsed rows to '{output_path}'")
+        return None
+
+    temporary_path = f"{output_path}.reparsing"
+    if os.path.exists(temporary_path):
+        os.remove(temporary_path)
+
+    updated = 0
+    with OutputWriter(path=temporary_path, output_format=output_format) as writer:
+        for row in read_output_rows(path=output_path):
+            if (reparsed_row := reparsed.pop(row.get("gstin"), None)) is not None:
+                row = merge_rows(existing=row, reparsed=reparsed_row, columns=columns)
+                updated += 1
+            writer.write(row)
+        for row in reparsed.values():
+            writer.write(row)
+
+    os.replace(temporary_path, output_path)
+    logger.info(
+        f"Updated {updated} rows and added {len(reparsed)} rows in '{output_path}'"
+    )
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(
+        description="Re-run the page extractors over an archive without a network"
+    )
+    parser.add_argument("archive", help="Archive directory written with --archive-dir")
+    parser.add_argument(
+        "output", help="Output file to update in place, or create (.csv or .jsonl)"
+    )
+    parser.add_argument(
+        "--columns", nargs="+", choices=REPARSED_COLUMNS, default=REPARSED_COLUMNS
+    )
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--states", default="uploads/states.csv")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    arguments = parse_arguments()
+    if not os.path.isdir(arguments.archive):
+        logger.error("Archive not found.")
+        sys.exit()
+
+    write_reparsed(
+        output_path=arguments.output,
+        reparsed=reparse_archive(
+            archive_path=arguments.archive,
+            workers=arguments.workers,
+            states_path=arguments.states,
+            company_names=read_company_names(output_path=arguments.output),
+        ),
+        columns=arguments.columns,
+    )
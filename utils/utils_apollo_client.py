@@ -0,0 +1,233 @@
+import email.utils
+import threading
+import time
+
+import requests
+from loguru import logger
+from requests.adapters import HTTPAdapter
+
+from utils.utils_disk_cache import DiskCache, MISSING
+from utils.utils_host_scheduler import classify_response, get_scheduler
+from utils.utils_metrics import metrics
+
+
+API_KEY = "YOUR_APT_KEY"
+APOLLO_BASE_URL = "https://api.apollo.io/v1"
+BULK_SIZE = 10
+REQUEST_TIMEOUT = 30
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+CACHE_TTL_DAYS = 90
+
+
+class ApolloError(Exception):
+    pass
+
+
+class ApolloClient:
+    def __init__(
+        self,
+        api_key: str = API_KEY,
+        base_url: str = APOLLO_BASE_URL,
+        cache: DiskCache | None = None,
+        max_retries: int = 5,
+        backoff_seconds: float = 1,
+        max_backoff_seconds: float = 60,
+        pool_size: int = 10,
+    ) -> None:
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.cache = cache
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update(
+            {"Content-Type": "application/json", "Cache-Control": "no-cache"}
+        )
+
+    def request(self, method: str, path: str, **kwargs) -> dict:
+        url = f"{self.base_url}/{path.lstrip('/')}"
+        for attempt in range(self.max_retries + 1):
+            metrics.increment("apollo_requests")
+            try:
+                with get_scheduler().slot(url=url) as ticket:
+                    response = self.session.request(
+                        method, url, timeout=REQUEST_TIMEOUT, **kwargs
+                    )
+                    ticket.outcome = classify_response(
+                        status_code=response.status_code
+                    )
+            except requests.RequestException as e:
+                if attempt == self.max_retries:
+                    raise ApolloError(f"Apollo request failed: {e}") from e
+                self.sleep_before_retry(attempt=attempt)
+                continue
+
+            if response.status_code == 200:
+                return response.json()
+            if response.status_code not in RETRY_STATUS_CODES:
+                raise ApolloError(
+                    f"Apollo API error {response.status_code}: {response.text}"
+                )
+            if attempt == self.max_retries:
+                break
+
+            logger.warning(f"Apollo returned {response.status_code}, retrying")
+            metrics.increment("apollo_retries")
+            self.sleep_before_retry(
+                attempt=attempt,
+                retry_after=parse_retry_after(response.headers.get("Retry-After")),
+            )
+
+        raise ApolloError(
+            f"Apollo API error {response.status_code} after {self.max_retries} retries"
+        )
+
+    def sleep_before_retry(self, attempt: int, retry_after: float | None = None):
+        delay = min(self.backoff_seconds * 2**attempt, self.max_backoff_seconds)
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        time.sleep(delay)
+
+    def cached(self, keys: list[str], fetch) -> list[dict]:
+        results = [MISSING] * len(keys)
+        if self.cache is not None:
+            results = [self.cache.get(key=key) for key in keys]
+
+        pending = [index for index, result in enumerate(results) if result is MISSING]
+        for start in range(0, len(pending), BULK_SIZE):
+            chunk = pending[start : start + BULK_SIZE]
+            for index, result in zip(chunk, fetch(chunk)):
+                results[index] = result
+                if self.cache is not None:
+                    self.cache.set(key=keys[index], value=result)
+        return results
+
+    def match_person(self, first_name: str, last_name: str, organisation_name: str):
+        return self.match_people(
+            [
+                {
+                    "first_name": first_name,
+                    "last_name": last_name,
+                    "organization_name": organisation_name,
+                }
+            ]
+        )[0]
+
+    def match_people(self, people: list[dict]) -> list[dict]:
+        def fetch(indexes: list[int]) -> list[dict]:
+            details = [people[index] for index in indexes]
+            if len(details) == 1:
+                return [
+                    self.request(
+                        "POST",
+                        "people/match",
+                        json={
+                            "api_key": self.api_key,
+                            "reveal_personal_emails": True,
+                            **details[0],
+                        },
+                    )
+                ]
+
+            response = self.request(
+                "POST",
+                "people/bulk_match",
+                json={
+                    "api_key": self.api_key,
+                    "reveal_personal_emails": True,
+                    "details": details,
+                },
+            )
+            matches = response.get("matches") or []
+            matches += [None] * (len(details) - len(matches))
+            return [{"person": match} for match in matches[: len(details)]]
+
+        keys = [person_cache_key(person) for person in people]
+        return self.cached(keys=keys, fetch=fetch)
+
+    def enrich_organization(self, domain: str) -> dict:
+        return self.enrich_organizations([domain])[0]
+
+    def enrich_organizations(self, domains: list[str]) -> list[dict]:
+        def fetch(indexes: list[int]) -> list[dict]:
+            chunk = [domains[index] for index in indexes]
+            if len(chunk) == 1:
+                return [
+                    self.request(
+                        "GET",
+                        "organizations/enrich",
+                        params={"api_key": self.api_key, "domain": chunk[0]},
+                    )
+                ]
+
+            response = self.request(
+                "POST",
+                "organizations/bulk_enrich",
+                json={"api_key": self.api_key, "domains": chunk},
+            )
+            organisations = response.get("organizations") or []
+            return align_organisations(domains=chunk, organisations=organisations)
+
+        keys = [f"organization|{domain.strip().lower()}" for domain in domains]
+        return self.cached(keys=keys, fetch=fetch)
+
+
+def person_cache_key(person: dict) -> str:
+    return "person|" + "|".join(
+        " ".join(str(person.get(field) or "").lower().split())
+        for field in ["first_name", "last_name", "organization_name"]
+    )
+
+
+def align_organisations(domains: list[str], organisations: list) -> list[dict]:
+    if len(organisations) == len(domains):
+        return [{"organization": organisation} for organisation in organisations]
+
+    by_domain = {
+        str(organisation.get("primary_domain", "")).lower(): organisation
+        for organisation in organisations
+        if isinstance(organisation, dict)
+    }
+    return [
+        {"organization": by_domain.get(domain.strip().lower())} for domain in domains
+    ]
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    if not value:
+        return None
+    try:
+        return max(float(value), 0)
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(retry_at.timestamp() - time.time(), 0)
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def configure_apollo_client(cache_path: str | None = None, **kwargs) -> ApolloClient:
+    global _client
+    cache = None
+    if cache_path is not None:
+        cache = DiskCache(path=cache_path, ttl_seconds=CACHE_TTL_DAYS * 24 * 60 * 60)
+    with _client_lock:
+        _client = ApolloClient(cache=cache, **kwargs)
+    return _client
+
+
+def get_apollo_client() -> ApolloClient:
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = ApolloClient()
+        return _client
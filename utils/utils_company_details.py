@@ -1,41 +1,16 @@
-import json
-import sys
-
-import requests
-from loguru import logger
-from selenium.common.exceptions import NoSuchElementException
 from selenium.webdriver import Chrome
-from selenium.webdriver.common.by import By
-
-from utils.utils_google_page import search_using_query
-
 
-API_KEY = "YOUR_APT_KEY"
-
-
-def get_company_domain(driver: Chrome, company_name: str):
-    driver = search_using_query(driver=driver, query=company_name)
-    try:
-        return driver.find_element(By.CLASS_NAME, "Wo6ZAEmESLNUuWBkbMxx").text
-    except NoSuchElementException:
-        logger.debug("No such company domain found")
-        return None
+from utils.utils_apollo_client import get_apollo_client
+from utils.utils_domain_resolver import DomainResolver
+from utils.utils_metrics import any_value_found, instrument
 
 
 def get_details_using_apollo(domain: str):
-    url = "https://api.apollo.io/v1/organizations/enrich"
-    headers = {"Content-Type": "application/json", "Cache-Control": "no-cache"}
-    params = {"api_key": API_KEY, "domain": domain}
-    response = requests.get(url=url, headers=headers, params=params)
-    if response.status_code != 200:
-        logger.error(f"API error: {response.text}")
-        sys.exit()
-
-    return json.loads(response.text)
+    return get_apollo_client().enrich_organization(domain=domain)
 
 
 def extract_useful_data(details: dict):
-    details = details.get("organization", {})
+    details = details.get("organization") or {}
     return {
         "founded_year": details.get("founded_year", None),
         "estimated_num_employees": details.get("estimated_num_employees", None),
@@ -44,11 +19,38 @@ def extract_useful_data(details: dict):
     }
 
 
-def get_company_details(driver: Chrome, company_name: str):
-    if domain := get_company_domain(driver=driver, company_name=company_name):
+@instrument(stage="company_details", found=any_value_found)
+def get_company_details(
+    driver: Chrome,
+    company_name: str,
+    scraped_data: dict | None = None,
+    domain_resolver: DomainResolver | None = None,
+):
+    domain_resolver = domain_resolver or DomainResolver()
+    if domain := domain_resolver.resolve(
+        company_name=company_name, scraped_data=scraped_data or {}, driver=driver
+    ):
         full_details = get_details_using_apollo(domain=domain)
         details = extract_useful_data(details=full_details)
         return details
+    return empty_company_details()
+
+
+def get_company_details_for_domains(domains: list[str | None]) -> list[dict]:
+    results = [empty_company_details() for _ in domains]
+    indexes = [index for index, domain in enumerate(domains) if domain]
+    if not indexes:
+        return results
+
+    organisations = get_apollo_client().enrich_organizations(
+        [domains[index] for index in indexes]
+    )
+    for index, details in zip(indexes, organisations):
+        results[index] = extract_useful_data(details=details or {})
+    return results
+
+
+def empty_company_details() -> dict:
     return {
         "founded_year": None,
         "estimated_num_employees": None,
@@ -0,0 +1,95 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+MISSING = object()
+
+
+class DiskCache:
+    def __init__(
+        self,
+        path: str,
+        ttl_seconds: float | None = None,
+        max_entries: int | None = None,
+    ) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(
+            path, check_same_thread=False, isolation_level=None
+        )
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute(
+            """CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                value TEXT,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )"""
+        )
+        self.connection.execute(
+            "CREATE INDEX IF NOT EXISTS entries_accessed_at ON entries (accessed_at)"
+        )
+        self.connection.execute(
+            "CREATE INDEX IF NOT EXISTS entries_created_at ON entries (created_at)"
+        )
+
+    def get(self, key: str):
+        now = time.time()
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT value, created_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or self.is_expired(created_at=row[1], now=now):
+                self.misses += 1
+                return MISSING
+
+            self.connection.execute(
+                "UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            self.hits += 1
+            return json.loads(row[0])
+
+    def set(self, key: str, value):
+        now = time.time()
+        with self.lock:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), now, now),
+            )
+            self.evict()
+
+    def is_expired(self, created_at: float, now: float) -> bool:
+        return self.ttl_seconds is not None and now - created_at > self.ttl_seconds
+
+    def evict(self):
+        if self.ttl_seconds is not None:
+            self.connection.execute(
+                "DELETE FROM entries WHERE created_at < ?",
+                (time.time() - self.ttl_seconds,),
+            )
+        if self.max_entries is None:
+            return None
+
+        (count,) = self.connection.execute("SELECT COUNT(*) FROM entries").fetchone()
+        if count > self.max_entries:
+            self.connection.execute(
+                """DELETE FROM entries WHERE key IN (
+                    SELECT key FROM entries ORDER BY accessed_at LIMIT ?
+                )""",
+                (count - self.max_entries,),
+            )
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses}
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
@@ -0,0 +1,127 @@
+from loguru import logger
+from selenium.common.exceptions import JavascriptException
+from selenium.webdriver import Chrome
+from selenium.webdriver.common.by import By
+
+from utils.utils_global import wait_for_element_to_load
+from utils.utils_host_scheduler import get_scheduler
+
+
+EXTRACTION_SCRIPT = """
+const first = (xpath, context) => document.evaluate(
+    xpath, context || document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null
+).singleNodeValue;
+const all = (xpath, context) => {
+    const result = document.evaluate(
+        xpath, context || document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null
+    );
+    const nodes = [];
+    for (let index = 0; index < result.snapshotLength; index++) {
+        nodes.push(result.snapshotItem(index));
+    }
+    return nodes;
+};
+const inner = (node) => node ? node.innerHTML : null;
+const spanAfter = (label) => inner(
+    first(`//p[contains(text(), '${label}')]/following-sibling::span[1]`)
+);
+
+const contactUs = first("//a[contains(text(), 'Contact Us')]");
+const home = first(
+    "//a[contains(text(), 'Home') and (@href='./' or @href='javascript:void(0);')]"
+);
+const phone = document.getElementById("footerPNS");
+const productsAndRange = document.querySelector(
+    "div.ddnav.FM_pa.zx1.FM_ps_l.FM_ds6.FM_bs.FM_ds5"
+);
+let products = null;
+if (productsAndRange) {
+    products = {};
+    for (const product of all(".//li[@class='FM_f16 FM_bo']", productsAndRange)) {
+        const productLink = product.querySelector("a");
+        if (!productLink) {
+            break;
+        }
+        products[productLink.innerHTML] = all(
+            ".//a[@class='Fm_lh17 FM_Db']", product
+        ).map((subProduct) => subProduct.innerHTML);
+    }
+}
+
+return {
+    ready: !!document.querySelector("ul[class='FM_ds5 FM_f16 FM_w1']"),
+    contact_us_href: contactUs ? contactUs.getAttribute("href") : null,
+    contact_us_url: contactUs ? contactUs.href : null,
+    home_href: home ? home.getAttribute("href") : null,
+    home_url: home ? home.href : null,
+    address: inner(first("//p[@class='FM_Lsp4 FM_C0 Fm_lh22']")),
+    owner: inner(first("//p[@class='FM_Lsp4 FM_f15 FM_c7 FM_p29']")),
+    phone: phone ? phone.getAttribute("data-pnsno") : null,
+    products: products,
+    nature_of_business: spanAfter("Nature of Business"),
+    annual_turnover: spanAfter("Annual Turnover"),
+};
+"""
+
+CLICK_SCRIPT = """
+const link = document.evaluate(
+    arguments[0], document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null
+).singleNodeValue;
+if (link) {
+    link.click();
+}
+return !!link;
+"""
+
+NAVIGATION_MARKER = "data-pending-navigation"
+NAVIGATE_SCRIPT = f"""
+document.documentElement.setAttribute("{NAVIGATION_MARKER}", "");
+window.location.assign(arguments[0]);
+"""
+PAGE_LOADED_SCRIPT = f"""
+return document.readyState !== "loading"
+    && !document.documentElement.hasAttribute("{NAVIGATION_MARKER}");
+"""
+
+
+def extract_page_data(driver: Chrome) -> dict:
+    try:
+        page_data = driver.execute_script(EXTRACTION_SCRIPT)
+    except JavascriptException as e:
+        logger.debug(f"Extraction script failed: {e}")
+        return {}
+    return page_data if isinstance(page_data, dict) else {}
+
+
+def follow_link(
+    driver: Chrome,
+    url: str | None,
+    href: str | None,
+    xpath: str,
+    wait_xpath: str | None = None,
+) -> bool:
+    if not href:
+        return False
+    if href.startswith("javascript:") or not url:
+        if not driver.execute_script(CLICK_SCRIPT, xpath):
+            return False
+        if wait_xpath is not None:
+            wait_for_element_to_load(
+                driver=driver, by_attr=By.XPATH, attr_value=wait_xpath
+            )
+        return True
+    with get_scheduler().slot(url=url):
+        driver.get(url)
+    return True
+
+
+def start_navigation(driver: Chrome, url: str):
+    driver.execute_script(NAVIGATE_SCRIPT, url)
+
+
+def page_loaded(driver: Chrome) -> bool:
+    try:
+        return bool(driver.execute_script(PAGE_LOADED_SCRIPT))
+    except JavascriptException as e:
+        logger.debug(f"Page state unavailable: {e}")
+        return False
@@ -0,0 +1,209 @@
+import threading
+from typing import Iterable
+from urllib.parse import urlparse
+
+from loguru import logger
+from selenium.webdriver import Chrome
+
+from utils.utils_disk_cache import DiskCache, MISSING
+from utils.utils_grouping import normalise_company_name
+from utils.utils_metrics import metrics
+from utils.utils_search_backend import get_search_backend, result_domains
+
+
+DOMAIN_SOURCES = ["website_link", "email", "cache", "search"]
+DEFAULT_TTL_DAYS = 180
+DEFAULT_MAX_ENTRIES = 200_000
+FREE_EMAIL_DOMAINS = {
+    "aol.com",
+    "gmail.com",
+    "googlemail.com",
+    "hotmail.com",
+    "icloud.com",
+    "live.com",
+    "mail.com",
+    "outlook.com",
+    "protonmail.com",
+    "rediffmail.com",
+    "yahoo.co.in",
+    "yahoo.com",
+    "yahoo.in",
+    "ymail.com",
+    "zoho.com",
+}
+IGNORED_LINK_DOMAINS = {
+    "apple.com",
+    "facebook.com",
+    "google.com",
+    "indiamart.com",
+    "instagram.com",
+    "justdial.com",
+    "linkedin.com",
+    "tradeindia.com",
+    "twitter.com",
+    "wa.me",
+    "whatsapp.com",
+    "x.com",
+    "youtube.com",
+}
+
+
+class DomainCache(DiskCache):
+    def __init__(
+        self,
+        path: str,
+        ttl_days: float = DEFAULT_TTL_DAYS,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ) -> None:
+        super().__init__(
+            path=path, ttl_seconds=ttl_days * 24 * 60 * 60, max_entries=max_entries
+        )
+
+    def get_domain(self, company_name: str):
+        return self.get(key=normalise_company_name(company_name))
+
+    def set_domain(self, company_name: str, domain: str | None):
+        self.set(key=normalise_company_name(company_name), value=domain)
+
+
+class DomainResolver:
+    def __init__(self, cache: DomainCache | None = None, use_search: bool = True):
+        self.cache = cache
+        self.use_search = use_search
+        self.counts = {source: 0 for source in DOMAIN_SOURCES + ["unresolved"]}
+        self.lock = threading.Lock()
+
+    def resolve(
+        self, company_name: str, scraped_data: dict, driver: Chrome | None = None
+    ) -> str | None:
+        if domain := domain_from_links(links=website_links(scraped_data)):
+            return self.resolved(company_name, domain, source="website_link")
+        if domain := domain_from_emails(emails=email_addresses(scraped_data)):
+            return self.resolved(company_name, domain, source="email")
+
+        if self.cache is not None and company_name:
+            if (domain := self.cache.get_domain(company_name)) is not MISSING:
+                self.count(source="cache" if domain else "unresolved")
+                return domain
+
+        if self.use_search and company_name:
+            domain = get_company_domain(driver=driver, company_name=company_name)
+            if domain is not MISSING and domain:
+                return self.resolved(company_name, domain, source="search")
+            if domain is not MISSING and self.cache is not None:
+                self.cache.set_domain(company_name, None)
+
+        self.count(source="unresolved")
+        return None
+
+    def prefetch(
+        self, company_name: str, scraped_data: dict, driver: Chrome | None = None
+    ):
+        if not (self.use_search and self.cache is not None and company_name):
+            return None
+        if domain_from_links(links=website_links(scraped_data)):
+            return None
+        if domain_from_emails(emails=email_addresses(scraped_data)):
+            return None
+        if self.cache.get_domain(company_name) is not MISSING:
+            return None
+
+        domain = get_company_domain(driver=driver, company_name=company_name)
+        if domain is not MISSING:
+            self.cache.set_domain(company_name, domain or None)
+
+    def resolved(self, company_name: str, domain: str, source: str) -> str:
+        self.count(source=source)
+        if self.cache is not None and company_name:
+            self.cache.set_domain(company_name, domain)
+        logger.debug(f"Resolved domain '{domain}' for '{company_name}' from {source}")
+        return domain
+
+    def count(self, source: str):
+        metrics.increment(f"domain_{source}")
+        with self.lock:
+            self.counts[source] += 1
+
+    def stats(self) -> dict:
+        with self.lock:
+            return dict(self.counts)
+
+    def close(self):
+        if self.cache is not None:
+            self.cache.close()
+
+
+def get_company_domain(driver: Chrome | None, company_name: str):
+    results = get_search_backend().search(query=company_name, driver=driver)
+    if results is None:
+        logger.debug(f"Domain search failed for '{company_name}'")
+        return MISSING
+    for result in result_domains(page_source=results.page_source):
+        if not is_ignored_domain(domain := domain_from_url(result)):
+            return domain
+    logger.debug("No such company domain found")
+    return None
+
+
+def website_links(scraped_data: dict) -> list[str]:
+    links = list(scraped_data.get("website links") or [])
+    if website_url := scraped_data.get("website_url"):
+        links.insert(0, website_url)
+    return links
+
+
+def email_addresses(scraped_data: dict) -> list[str]:
+    emails = [
+        link.removeprefix("mailto:").split("?")[0]
+        for link in scraped_data.get("website links") or []
+        if link.startswith("mailto:")
+    ]
+    if personal_email := scraped_data.get("personal_email"):
+        emails.append(personal_email)
+    return emails
+
+
+def contact_links(hrefs: Iterable[str]) -> list[str]:
+    links = []
+    for href in hrefs:
+        href = str(href).strip()
+        if href.startswith("mailto:") or (
+            href.startswith("http") and not is_ignored_domain(domain_from_url(href))
+        ):
+            if href not in links:
+                links.append(href)
+    return links
+
+
+def domain_from_links(links: list[str]) -> str | None:
+    for link in links:
+        if link.startswith("mailto:"):
+            continue
+        domain = domain_from_url(link)
+        if domain and not is_ignored_domain(domain):
+            return domain
+    return None
+
+
+def domain_from_emails(emails: list[str]) -> str | None:
+    for email in emails:
+        domain = str(email).rpartition("@")[2].strip().lower()
+        if "." in domain and domain not in FREE_EMAIL_DOMAINS:
+            return domain
+    return None
+
+
+def domain_from_url(url: str | None) -> str | None:
+    if not url:
+        return None
+    netloc = urlparse(url if "//" in url else f"//{url}").netloc.lower()
+    return netloc.split(":")[0].removeprefix("www.") or None
+
+
+def is_ignored_domain(domain: str | None) -> bool:
+    if not domain:
+        return True
+    return any(
+        domain == ignored or domain.endswith(f".{ignored}")
+        for ignored in IGNORED_LINK_DOMAINS
+    )
@@ -0,0 +1,178 @@
+import os
+import time
+from typing import Callable
+
+from loguru import logger
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver import Chrome
+
+from utils.utils_init_selenium import initialise_selenium_driver
+from utils.utils_metrics import metrics
+
+
+class DriverUnavailableError(Exception):
+    pass
+
+
+class DriverManager:
+    def __init__(
+        self,
+        recycle_after: int | None = 200,
+        max_rss_mb: float | None = 1500,
+        start_attempts: int = 3,
+        retry_delay_seconds: float = 5,
+        factory: Callable[[], Chrome | None] = initialise_selenium_driver,
+    ) -> None:
+        self.recycle_after = recycle_after
+        self.max_rss_mb = max_rss_mb
+        self.start_attempts = start_attempts
+        self.retry_delay_seconds = retry_delay_seconds
+        self.factory = factory
+        self.driver = None
+        self.pages_since_start = 0
+        self.pages = 0
+        self.restarts = 0
+        self.last_rss_mb = None
+        self.peak_rss_mb = 0.0
+
+    def start(self) -> Chrome:
+        for attempt in range(1, self.start_attempts + 1):
+            if driver := self.factory():
+                self.driver = driver
+                self.pages_since_start = 0
+                return driver
+            logger.warning(f"Driver start attempt {attempt} failed")
+            time.sleep(self.retry_delay_seconds * attempt)
+        raise DriverUnavailableError("Driver cannot be initialised")
+
+    def get_driver(self) -> Chrome:
+        if self.driver is None:
+            return self.start()
+        return self.driver
+
+    def is_healthy(self) -> bool:
+        if self.driver is None:
+            return False
+        try:
+            return self.driver.execute_script("return 1") == 1 and bool(
+                self.driver.window_handles
+            )
+        except Exception as e:
+            logger.debug(f"Driver health check failed: {e}")
+            return False
+
+    def ensure_healthy(self) -> Chrome:
+        if self.driver is not None and not self.is_healthy():
+            return self.restart(reason="failed health check")
+        return self.get_driver()
+
+    def restart(self, reason: str) -> Chrome:
+        logger.warning(f"Restarting driver: {reason}")
+        self.quit()
+        self.restarts += 1
+        metrics.increment("driver_restarts")
+        return self.start()
+
+    def record_page(self):
+        self.pages += 1
+        self.pages_since_start += 1
+        rss_mb = self.read_rss_mb()
+        if self.recycle_after and self.pages_since_start >= self.recycle_after:
+            self.restart(reason=f"recycling after {self.pages_since_start} pages")
+        elif self.max_rss_mb and rss_mb and rss_mb > self.max_rss_mb:
+            self.restart(reason=f"browser RSS {rss_mb:.0f} MB over limit")
+
+    def run(self, function: Callable[[Chrome], object], attempts: int = 2):
+        for attempt in range(1, attempts + 1):
+            driver = self.ensure_healthy()
+            try:
+                result = function(driver)
+            except WebDriverException as e:
+                if attempt == attempts:
+                    raise
+                self.restart(reason=f"{type(e).__name__}: {e.msg}")
+                continue
+
+            self.record_page()
+            return result
+
+    def read_rss_mb(self) -> float | None:
+        try:
+            root_pid = self.driver.service.process.pid
+        except AttributeError:
+            return None
+
+        rss_bytes = process_tree_rss(root_pid=root_pid)
+        if rss_bytes is None:
+            return None
+
+        self.last_rss_mb = rss_bytes / (1024 * 1024)
+        self.peak_rss_mb = max(self.peak_rss_mb, self.last_rss_mb)
+        return self.last_rss_mb
+
+    def stats(self) -> dict:
+        return {
+            "pages": self.pages,
+            "restarts": self.restarts,
+            "rss_mb": round(self.last_rss_mb, 1) if self.last_rss_mb else None,
+            "peak_rss_mb": round(self.peak_rss_mb, 1),
+        }
+
+    def quit(self):
+        if self.driver is None:
+            return None
+        try:
+            self.driver.quit()
+        except Exception as e:
+            logger.debug(f"Driver quit failed: {e}")
+        self.driver = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.quit()
+
+
+def process_tree_rss(root_pid: int) -> int | None:
+    try:
+        import psutil
+    except ImportError:
+        return proc_tree_rss(root_pid=root_pid)
+
+    try:
+        root = psutil.Process(root_pid)
+        processes = [root] + root.children(recursive=True)
+        return sum(process.memory_info().rss for process in processes)
+    except psutil.Error:
+        return None
+
+
+def proc_tree_rss(root_pid: int) -> int | None:
+    if not os.path.isdir("/proc"):
+        return None
+
+    children = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as file:
+                parent_pid = int(file.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(parent_pid, []).append(int(entry))
+
+    total, pending = 0, [root_pid]
+    while pending:
+        pid = pending.pop()
+        pending.extend(children.get(pid, []))
+        try:
+            with open(f"/proc/{pid}/status") as file:
+                for line in file:
+                    if line.startswith("VmRSS:"):
+                        total += int(line.split()[1]) * 1024
+                        break
+        except OSError:
+            continue
+    return total
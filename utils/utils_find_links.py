@@ -1,32 +1,126 @@
+import argparse
+import re
+import time
+from urllib.parse import parse_qs, urlparse
+
 from loguru import logger
-from selenium.webdriver import Chrome
-from selenium.webdriver.common.by import By
+from lxml import html
 
+from utils.utils_host_scheduler import classify_page, get_scheduler
+from utils.utils_metrics import instrument
 
-def get_first_site_link(driver: Chrome):
-    refresh_driver_page_source(driver=driver)
 
-    try:
-        links = driver.find_elements(By.TAG_NAME, "a")
-    except Exception as e:
-        logger.warning(e)
+INDIAMART_BASE_URL = "https://www.indiamart.com/"
+NON_PROFILE_SEGMENTS = {
+    "proddetail",
+    "impcat",
+    "city",
+    "catalog",
+    "search",
+    "suppliers",
+    "products",
+    "company",
+}
+COMPANY_NAME_STOPWORDS = {
+    "and",
+    "co",
+    "company",
+    "corporation",
+    "enterprises",
+    "india",
+    "llp",
+    "ltd",
+    "limited",
+    "private",
+    "pvt",
+    "the",
+}
+
+
+@instrument(stage="search_link")
+def first_site_link(page_source: str, url: str, company_name: str | None = None):
+    links = rank_indiamart_links(page_source=page_source, company_name=company_name)
+    if not links:
+        logger.warning("No india mart link found")
+        get_scheduler().report(url=url, outcome=classify_page(page_source=page_source))
         return None
 
-    page_link = "https://www.indiamart.com/"
+    return links[0]
 
+
+def extract_links(page_source: str) -> list[str]:
     try:
-        links = [
-            link.get_attribute("href")
-            for link in links
-            if (link.get_attribute("href") and page_link in link.get_attribute("href"))
-        ]
-        found = links[0]
-    except Exception:
-        logger.warning("No india mart link found")
+        page = html.fromstring(page_source)
+    except Exception as e:
+        logger.warning(f"Unable to parse search results: {e}")
+        return []
+
+    links = []
+    for href in page.xpath("//a/@href"):
+        href = unwrap_redirect(href=str(href).strip())
+        if href and href not in links:
+            links.append(href)
+    return links
+
+
+def unwrap_redirect(href: str) -> str:
+    parsed = urlparse(href)
+    if parsed.path.rstrip("/").endswith("/l") and "uddg" in parsed.query:
+        return parse_qs(parsed.query)["uddg"][0]
+    return href
+
+
+def rank_indiamart_links(
+    page_source: str,
+    company_name: str | None = None,
+    base_url: str | None = None,
+) -> list[str]:
+    base_url = base_url or INDIAMART_BASE_URL
+    name_tokens = tokenise(company_name) - COMPANY_NAME_STOPWORDS
+    scored = []
+    for position, link in enumerate(extract_links(page_source=page_source)):
+        score = score_link(link=link, name_tokens=name_tokens, base_url=base_url)
+        if score is not None:
+            scored.append((-score, position, link))
+    return [link for _, _, link in sorted(scored)]
+
+
+def score_link(link: str, name_tokens: set[str], base_url: str) -> float | None:
+    parsed, base = urlparse(link), urlparse(base_url)
+    if parsed.netloc != base.netloc or parsed.scheme not in ("http", "https"):
         return None
 
-    return found
+    segments = [segment for segment in parsed.path.split("/") if segment]
+    if not segments:
+        return None
+
+    slug = segments[0]
+    if slug in NON_PROFILE_SEGMENTS or "." in slug:
+        return 0
+
+    score = 3 if len(segments) == 1 else 2
+    if name_tokens:
+        score += 2 * len(name_tokens & tokenise(slug)) / len(name_tokens)
+    return score
+
+
+def tokenise(text: str | None) -> set[str]:
+    return set(re.findall(r"[a-z0-9]+", str(text or "").lower()))
 
 
-def refresh_driver_page_source(driver: Chrome):
-    return driver.page_source
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rank IndiaMart links in saved pages")
+    parser.add_argument("pages", nargs="+")
+    parser.add_argument("--company-name", default=None)
+    parser.add_argument("--repeat", type=int, default=100)
+    arguments = parser.parse_args()
+    for path in arguments.pages:
+        with open(path, encoding="utf-8") as file:
+            source = file.read()
+        started = time.perf_counter()
+        for _ in range(arguments.repeat):
+            ranked = rank_indiamart_links(
+                page_source=source, company_name=arguments.company_name
+            )
+        elapsed = (time.perf_counter() - started) / arguments.repeat
+        logger.info(f"{path}: {elapsed * 1000:.2f} ms, best={ranked[:1]}")
@@ -0,0 +1,180 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, Iterable, Iterator, NamedTuple
+
+from utils.utils_input_reader import CompanyRow
+from utils.utils_metrics import metrics
+
+
+REFRESH_PRIORITIES = ["new", "failed", "stale"]
+REFRESH_OUTCOMES = ["not_modified", "unchanged", "changed", "not_found", "failed"]
+DEFAULT_TTL_DAYS = 30
+
+
+class FingerprintRecord(NamedTuple):
+    gstin: str
+    page_link: str | None
+    fingerprint: str | None
+    status: str
+    fetched_at: float
+    etag: str | None
+    last_modified: str | None
+
+    @property
+    def validators(self) -> dict:
+        return {"etag": self.etag, "last_modified": self.last_modified}
+
+
+class FingerprintStore:
+    def __init__(self, path: str, ttl_days: float = DEFAULT_TTL_DAYS) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.ttl_seconds = ttl_days * 24 * 60 * 60
+        self.outcomes = {outcome: 0 for outcome in REFRESH_OUTCOMES}
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(
+            path, check_same_thread=False, isolation_level=None
+        )
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute(
+            """CREATE TABLE IF NOT EXISTS companies (
+                gstin TEXT PRIMARY KEY,
+                page_link TEXT,
+                fingerprint TEXT,
+                status TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                data TEXT,
+                error TEXT
+            )"""
+        )
+
+    def get(self, gstin: str) -> FingerprintRecord | None:
+        with self.lock:
+            row = self.connection.execute(
+                """SELECT gstin, page_link, fingerprint, status, fetched_at, etag,
+                last_modified FROM companies WHERE gstin = ?""",
+                (gstin,),
+            ).fetchone()
+        return FingerprintRecord(*row) if row else None
+
+    def priority(self, gstin: str, now: float | None = None) -> str | None:
+        if (record := self.get(gstin)) is None:
+            return "new"
+        if record.status == "failed":
+            return "failed"
+        if (now or time.time()) - record.fetched_at > self.ttl_seconds:
+            return "stale"
+        return None
+
+    def save(
+        self,
+        gstin: str,
+        page_link: str,
+        digest: str,
+        data: dict,
+        validators: dict | None = None,
+    ):
+        validators = validators or {}
+        with self.lock:
+            self.connection.execute(
+                """INSERT OR REPLACE INTO companies
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, NULL)""",
+                (
+                    gstin,
+                    page_link,
+                    digest,
+                    "done",
+                    time.time(),
+                    validators.get("etag"),
+                    validators.get("last_modified"),
+                    json.dumps(data),
+                ),
+            )
+        self.count(outcome="changed")
+
+    def touch(self, gstin: str, outcome: str, validators: dict | None = None):
+        validators = validators or {}
+        with self.lock:
+            self.connection.execute(
+                """UPDATE companies SET status = 'done', fetched_at = ?, error = NULL,
+                etag = COALESCE(?, etag),
+                last_modified = COALESCE(?, last_modified)
+                WHERE gstin = ?""",
+                (
+                    time.time(),
+                    validators.get("etag"),
+                    validators.get("last_modified"),
+                    gstin,
+                ),
+            )
+        self.count(outcome=outcome)
+
+    def mark(self, gstin: str, status: str, error: str | None = None):
+        with self.lock:
+            self.connection.execute(
+                """INSERT INTO companies (gstin, status, fetched_at, error)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT (gstin) DO UPDATE SET
+                page_link = CASE excluded.status
+                    WHEN 'not_found' THEN NULL ELSE page_link END,
+                status = excluded.status,
+                fetched_at = excluded.fetched_at,
+                error = excluded.error""",
+                (gstin, status, time.time(), error),
+            )
+        self.count(outcome=status)
+
+    def count(self, outcome: str):
+        metrics.increment(f"refresh_{outcome}")
+        with self.lock:
+            self.outcomes[outcome] += 1
+
+    def rows(self) -> Iterator[dict]:
+        with self.lock:
+            rows = self.connection.execute(
+                "SELECT data FROM companies WHERE data IS NOT NULL ORDER BY gstin"
+            ).fetchall()
+        for (data,) in rows:
+            yield json.loads(data)
+
+    def stats(self) -> dict:
+        with self.lock:
+            return dict(self.outcomes)
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
+
+
+def fingerprint(data: dict) -> str:
+    encoded = json.dumps(data, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def conditional_headers(validators: dict | None) -> dict:
+    validators = validators or {}
+    headers = {}
+    if etag := validators.get("etag"):
+        headers["If-None-Match"] = etag
+    if last_modified := validators.get("last_modified"):
+        headers["If-Modified-Since"] = last_modified
+    return headers
+
+
+def prioritised_companies(
+    read: Callable[[], Iterable[CompanyRow]], store: FingerprintStore
+) -> Iterator[CompanyRow]:
+    now = time.time()
+    priorities = {}
+    for priority in REFRESH_PRIORITIES:
+        for company in read():
+            if company.GSTIN not in priorities:
+                priorities[company.GSTIN] = store.priority(company.GSTIN, now=now)
+            if priorities[company.GSTIN] == priority:
+                yield company
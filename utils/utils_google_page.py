@@ -4,18 +4,10 @@ from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 
+from utils.utils_host_scheduler import classify_title, get_scheduler
 
-def get_google_page(driver: webdriver.Chrome, company: pd.Series):
-    search_query = create_search_query(company=company)
-    if not isinstance(search_query, str):
-        return None
-
-    logger.info(f"Search query: '{search_query}'.")
-    driver = search_using_query(driver=driver, query=search_query)
-    if not isinstance(driver, webdriver.Chrome):
-        return None
 
-    return driver
+SEARCH_URL = "https://duckduckgo.com/"
 
 
 def create_search_query(company: pd.Series):
@@ -31,10 +23,12 @@ def create_search_query(company: pd.Series):
 
 def search_using_query(driver: webdriver.Chrome, query: str):
     try:
-        driver.get("https://duckduckgo.com/")
-        element = driver.find_element(By.NAME, "q")
-        element.send_keys(query)
-        element.send_keys(Keys.ENTER)
+        with get_scheduler().slot(url=SEARCH_URL) as ticket:
+            driver.get(SEARCH_URL)
+            element = driver.find_element(By.NAME, "q")
+            element.send_keys(query)
+            element.send_keys(Keys.ENTER)
+            ticket.outcome = classify_title(title=driver.title)
     except Exception:
         logger.error("Driver failed to search the query")
         return None
@@ -0,0 +1,70 @@
+import re
+from typing import Iterable, NamedTuple
+
+from loguru import logger
+
+from utils.utils_input_reader import CompanyRow
+from utils.utils_state_resolver import StateResolver
+
+
+LEGAL_NAME_TOKENS = {
+    "co",
+    "company",
+    "corp",
+    "corporation",
+    "limited",
+    "llp",
+    "ltd",
+    "m",
+    "ms",
+    "pvt",
+    "private",
+    "the",
+}
+REGISTRATION_COLUMNS = ["address", "state", "zip code", "phone number"]
+
+
+class CompanyGroup(NamedTuple):
+    pan: str
+    name_key: str
+    members: list[CompanyRow]
+
+    @property
+    def index(self) -> int:
+        return self.members[0].index
+
+
+def pan_of(gstin: str) -> str:
+    return gstin[2:12]
+
+
+def normalise_company_name(company_name: str) -> str:
+    tokens = re.findall(r"[a-z0-9]+", str(company_name).lower())
+    return " ".join(token for token in tokens if token not in LEGAL_NAME_TOKENS)
+
+
+def group_companies(companies: Iterable[CompanyRow]) -> list[CompanyGroup]:
+    groups = {}
+    for company in companies:
+        key = (pan_of(company.GSTIN), normalise_company_name(company.COMPANY_NAME))
+        if key not in groups:
+            groups[key] = CompanyGroup(pan=key[0], name_key=key[1], members=[])
+        groups[key].members.append(company)
+
+    grouped = list(groups.values())
+    rows = sum(len(group.members) for group in grouped)
+    logger.info(f"Grouped {rows} rows into {len(grouped)} PAN groups")
+    return grouped
+
+
+def fan_out(
+    scraped_data: dict, member: CompanyRow, state_resolver: StateResolver
+) -> dict:
+    data = dict(scraped_data)
+    data["gstin"] = member.GSTIN
+    data["company name"] = member.COMPANY_NAME
+    for column in REGISTRATION_COLUMNS:
+        data[column] = None
+    if state := state_resolver.state_from_gstin(gstin=member.GSTIN):
+        data["state"] = state.lower()
+    return data
@@ -0,0 +1,247 @@
+import json
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import NamedTuple
+from urllib.parse import urlparse
+
+from loguru import logger
+
+from utils.utils_metrics import metrics
+
+
+BLOCKED_TITLE_MARKERS = [
+    "captcha",
+    "access denied",
+    "attention required",
+    "just a moment",
+    "too many requests",
+]
+BLOCKED_PAGE_MARKERS = ["bots use duckduckgo too", "unusual traffic from your"]
+EMPTY_RESULT_MARKERS = ["no results found", "class=\"no-results\""]
+TITLE_PATTERN = re.compile(r"<title[^>]*>(.*?)</title>", re.IGNORECASE | re.DOTALL)
+THROTTLE_STATUS_CODES = {403, 429, 503}
+EMPTY_STREAK_LIMIT = 3
+MAX_COOLDOWN_SECONDS = 300
+
+
+class HostLimit(NamedTuple):
+    rate: float
+    burst: int
+    max_concurrency: int
+    cooldown_seconds: float = 30
+
+
+DEFAULT_HOST_LIMITS = {
+    "duckduckgo.com": HostLimit(rate=0.5, burst=2, max_concurrency=2),
+    "indiamart.com": HostLimit(rate=3, burst=6, max_concurrency=6),
+    "api.apollo.io": HostLimit(
+        rate=2, burst=5, max_concurrency=4, cooldown_seconds=60
+    ),
+    "default": HostLimit(rate=5, burst=10, max_concurrency=8),
+}
+
+
+class Ticket:
+    def __init__(self, host: str) -> None:
+        self.host = host
+        self.outcome = "ok"
+
+
+class HostState:
+    def __init__(self, limit: HostLimit) -> None:
+        self.limit = limit
+        self.rate = limit.rate
+        self.concurrency = float(limit.max_concurrency)
+        self.tokens = float(limit.burst)
+        self.refilled_at = time.monotonic()
+        self.blocked_until = 0.0
+        self.in_flight = 0
+        self.throttles = 0
+        self.consecutive_throttles = 0
+        self.empty_streak = 0
+        self.condition = threading.Condition()
+
+    def refill(self, now: float):
+        self.tokens = min(
+            self.limit.burst, self.tokens + (now - self.refilled_at) * self.rate
+        )
+        self.refilled_at = now
+
+    def acquire(self):
+        with self.condition:
+            while wait := self.try_acquire():
+                self.condition.wait(timeout=wait)
+
+    def try_acquire(self) -> float:
+        with self.condition:
+            now = time.monotonic()
+            self.refill(now=now)
+            wait = max(self.blocked_until - now, 0)
+            if not wait and self.in_flight >= int(self.concurrency):
+                wait = 1
+            elif not wait and self.tokens < 1:
+                wait = (1 - self.tokens) / self.rate
+            if not wait:
+                self.tokens -= 1
+                self.in_flight += 1
+            return wait
+
+    def release(self, outcome: str):
+        with self.condition:
+            self.in_flight -= 1
+            self.adjust(outcome=outcome)
+
+    def adjust(self, outcome: str):
+        with self.condition:
+            if outcome == "empty":
+                self.empty_streak += 1
+                if self.empty_streak >= EMPTY_STREAK_LIMIT:
+                    self.empty_streak = 0
+                    self.back_off()
+            elif outcome == "throttled":
+                self.back_off()
+            elif outcome == "ok":
+                self.empty_streak = 0
+                self.consecutive_throttles = 0
+                self.ramp_up()
+            self.condition.notify_all()
+
+    def back_off(self):
+        self.throttles += 1
+        self.consecutive_throttles += 1
+        self.concurrency = max(1.0, self.concurrency / 2)
+        self.rate = max(self.limit.rate / 10, self.rate / 2)
+        self.tokens = 0
+        cooldown = min(
+            self.limit.cooldown_seconds * self.consecutive_throttles,
+            MAX_COOLDOWN_SECONDS,
+        )
+        self.blocked_until = time.monotonic() + cooldown
+
+    def ramp_up(self):
+        self.concurrency = min(
+            float(self.limit.max_concurrency), self.concurrency + 1 / self.concurrency
+        )
+        self.rate = min(self.limit.rate, self.rate + self.limit.rate / 20)
+
+    def stats(self) -> dict:
+        with self.condition:
+            return {
+                "rate": round(self.rate, 3),
+                "concurrency": int(self.concurrency),
+                "in_flight": self.in_flight,
+                "throttles": self.throttles,
+            }
+
+
+class HostScheduler:
+    def __init__(self, limits: dict[str, HostLimit] | None = None) -> None:
+        self.limits = dict(DEFAULT_HOST_LIMITS if limits is None else limits)
+        self.limits.setdefault("default", DEFAULT_HOST_LIMITS["default"])
+        self.states = {}
+        self.lock = threading.Lock()
+
+    def host_key(self, url: str) -> str:
+        host = urlparse(url).netloc.lower().split(":")[0]
+        for key in self.limits:
+            if host == key or host.endswith(f".{key}"):
+                return key
+        return host or "default"
+
+    def state_for(self, key: str) -> HostState:
+        with self.lock:
+            if key not in self.states:
+                self.states[key] = HostState(
+                    limit=self.limits.get(key, self.limits["default"])
+                )
+            return self.states[key]
+
+    @contextmanager
+    def slot(self, url: str):
+        key = self.host_key(url=url)
+        state = self.state_for(key=key)
+        state.acquire()
+        ticket = Ticket(host=key)
+        try:
+            yield ticket
+        except Exception:
+            ticket.outcome = "error"
+            raise
+        finally:
+            self.release(ticket=ticket)
+
+    def try_acquire(self, url: str) -> Ticket | None:
+        key = self.host_key(url=url)
+        if self.state_for(key=key).try_acquire():
+            return None
+        return Ticket(host=key)
+
+    def release(self, ticket: Ticket):
+        self.record(key=ticket.host, outcome=ticket.outcome)
+        self.state_for(key=ticket.host).release(outcome=ticket.outcome)
+
+    def report(self, url: str, outcome: str):
+        key = self.host_key(url=url)
+        self.record(key=key, outcome=outcome)
+        self.state_for(key=key).adjust(outcome=outcome)
+
+    def record(self, key: str, outcome: str):
+        if outcome == "throttled":
+            logger.warning(f"Host '{key}' is throttling, backing off")
+        metrics.increment(f"host_{outcome}")
+
+    def stats(self) -> dict:
+        with self.lock:
+            states = dict(self.states)
+        return {key: state.stats() for key, state in states.items()}
+
+
+def read_host_limits(path: str) -> dict[str, HostLimit]:
+    with open(path, encoding="utf-8") as file:
+        config = json.load(file)
+    limits = dict(DEFAULT_HOST_LIMITS)
+    for host, values in config.items():
+        limits[host.lower()] = HostLimit(**values)
+    return limits
+
+
+def configure_scheduler(path: str | None = None) -> HostScheduler:
+    global scheduler
+    scheduler = HostScheduler(limits=read_host_limits(path) if path else None)
+    return scheduler
+
+
+def get_scheduler() -> HostScheduler:
+    return scheduler
+
+
+def classify_page(page_source: str | None) -> str:
+    text = (page_source or "").lower()
+    title = match.group(1) if (match := TITLE_PATTERN.search(text)) else ""
+    if classify_title(title=title) == "throttled":
+        return "throttled"
+    if any(marker in text for marker in BLOCKED_PAGE_MARKERS):
+        return "throttled"
+    if any(marker in text for marker in EMPTY_RESULT_MARKERS):
+        return "empty"
+    return "ok"
+
+
+def classify_title(title: str | None) -> str:
+    title = (title or "").lower()
+    if any(marker in title for marker in BLOCKED_TITLE_MARKERS):
+        return "throttled"
+    return "ok"
+
+
+def classify_response(status_code: int, text: str = "") -> str:
+    if status_code in THROTTLE_STATUS_CODES:
+        return "throttled"
+    if status_code >= 500:
+        return "error"
+    return classify_page(page_source=text[:20_000])
+
+
+scheduler = HostScheduler()
@@ -0,0 +1,234 @@
+from urllib.parse import urljoin
+
+import requests
+from loguru import logger
+from lxml import html
+
+from utils.utils_domain_resolver import contact_links
+from utils.utils_fingerprint_store import conditional_headers
+from utils.utils_http_session import fetch_response
+from utils.utils_metrics import instrument
+from utils.utils_page_archive import PageArchive, archive_page
+from utils.utils_state_resolver import StateResolver
+from utils.utils_website_scraper import (
+    ADDRESS_XPATH,
+    CONTACT_US_XPATH,
+    HOME_XPATH,
+    Company,
+    clean_address,
+)
+
+
+OWNER_NAME_XPATH = "//p[@class='FM_Lsp4 FM_f15 FM_c7 FM_p29']"
+MOBILE_NUMBER_XPATH = "//*[@id='footerPNS']"
+PRODUCT_XPATH = ".//li[@class='FM_f16 FM_bo']"
+SUB_PRODUCT_XPATH = ".//a[@class='Fm_lh17 FM_Db']"
+NATURE_OF_BUSINESS_XPATH = (
+    "//p[contains(text(), 'Nature of Business')]/following-sibling::span[1]"
+)
+ANNUAL_TURNOVER_XPATH = (
+    "//p[contains(text(), 'Annual Turnover')]/following-sibling::span[1]"
+)
+PRODUCTS_AND_RANGE_CLASSES = [
+    "ddnav", "FM_pa", "zx1", "FM_ps_l", "FM_ds6", "FM_bs", "FM_ds5"
+]
+
+
+class HttpCompany(Company):
+    def __init__(
+        self,
+        session: requests.Session,
+        gstin: str,
+        company_name: str,
+        page_link: str,
+        state_resolver: StateResolver,
+        archive: PageArchive | None = None,
+        validators: dict | None = None,
+    ) -> None:
+        self.session = session
+        self.validators = validators or {}
+        self.not_modified = False
+        super().__init__(
+            driver=None,
+            gstin=gstin,
+            company_name=company_name,
+            page_link=page_link,
+            state_resolver=state_resolver,
+            archive=archive,
+        )
+
+    @instrument(
+        stage="profile_http", found=lambda result, instance: instance.has_data()
+    )
+    def start_scraping(self):
+        profile_page = self.fetch(
+            url=self.page_link,
+            kind="profile",
+            headers=conditional_headers(validators=self.validators),
+        )
+        if profile_page is None:
+            return None
+
+        contact_page = self.follow_link(
+            page=profile_page, xpath=CONTACT_US_XPATH, kind="contact"
+        )
+        home_page = self.follow_link(
+            page=profile_page if contact_page is None else contact_page,
+            xpath=HOME_XPATH,
+            kind="home",
+        )
+        fields = extract_profile_fields(
+            profile_page=profile_page, contact_page=contact_page, home_page=home_page
+        )
+        for name, value in fields.items():
+            setattr(self, name, value)
+
+        self.get_zip_code()
+        self.get_state_name()
+
+    def fetch(
+        self, url: str, kind: str, headers: dict | None = None
+    ) -> html.HtmlElement | None:
+        response = fetch_response(session=self.session, url=url, headers=headers)
+        if response is None:
+            return None
+        if response.status_code == 304:
+            self.not_modified = True
+            return None
+        if kind == "profile":
+            self.validators = {
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+            }
+        archive_page(
+            archive=self.archive,
+            url=response.url,
+            content=response.text,
+            kind=kind,
+            gstin=self.gstin,
+        )
+        return parse_html(content=response.content, url=response.url)
+
+    def follow_link(self, page: html.HtmlElement, xpath: str, kind: str):
+        links = page.xpath(xpath)
+        if not links:
+            logger.debug(f"Link not found: '{xpath}'")
+            return None
+
+        href = links[0].get("href", "")
+        if href.startswith("javascript:"):
+            return page
+        return self.fetch(url=urljoin(page.base_url, href), kind=kind)
+
+    def has_data(self) -> bool:
+        return any(
+            [
+                self.address,
+                self.owner,
+                self.phone,
+                self.products,
+                self.nature_of_business,
+                self.annual_turnover,
+            ]
+        )
+
+
+def extract_profile_fields(
+    profile_page: html.HtmlElement,
+    contact_page: html.HtmlElement | None = None,
+    home_page: html.HtmlElement | None = None,
+) -> dict:
+    fields = {}
+    if contact_page is not None:
+        fields["address"] = parse_address(page=contact_page)
+        fields["website_links"] = contact_links(hrefs=contact_page.xpath("//a/@href"))
+    else:
+        contact_page = profile_page
+
+    fields["owner"] = parse_owner_name(page=contact_page)
+    fields["phone"] = parse_mobile_number(page=contact_page)
+    fields["products"] = parse_products_data(page=contact_page)
+
+    if home_page is not None:
+        fields["nature_of_business"] = parse_span_after(
+            page=home_page, xpath=NATURE_OF_BUSINESS_XPATH
+        )
+        fields["annual_turnover"] = parse_span_after(
+            page=home_page, xpath=ANNUAL_TURNOVER_XPATH
+        )
+    return fields
+
+
+def parse_html(content: bytes | str, url: str) -> html.HtmlElement | None:
+    try:
+        return html.fromstring(content, base_url=url)
+    except Exception as e:
+        logger.debug(f"Unable to parse '{url}': {e}")
+        return None
+
+
+def inner_html(element: html.HtmlElement) -> str:
+    children = "".join(
+        html.tostring(child, encoding="unicode", with_tail=True) for child in element
+    )
+    return (element.text or "") + children
+
+
+def first_match(page: html.HtmlElement, xpath: str):
+    elements = page.xpath(xpath)
+    return elements[0] if elements else None
+
+
+def parse_address(page: html.HtmlElement):
+    if (element := first_match(page=page, xpath=ADDRESS_XPATH)) is None:
+        logger.debug("'Address' element not found")
+        return None
+
+    return clean_address(address=inner_html(element))
+
+
+def parse_owner_name(page: html.HtmlElement):
+    if (element := first_match(page=page, xpath=OWNER_NAME_XPATH)) is None:
+        logger.debug("'Owner Name' element not found")
+        return None
+    return inner_html(element).strip()
+
+
+def parse_mobile_number(page: html.HtmlElement):
+    if (element := first_match(page=page, xpath=MOBILE_NUMBER_XPATH)) is None:
+        logger.debug("'Mobile Number' element not found")
+        return None
+    return element.get("data-pnsno")
+
+
+def parse_products_data(page: html.HtmlElement) -> dict:
+    products_and_range = first_match(
+        page=page, xpath=class_xpath(classes=PRODUCTS_AND_RANGE_CLASSES)
+    )
+    if products_and_range is None:
+        logger.debug("'Products and Range' element not found")
+        return {}
+
+    products = {}
+    for product in products_and_range.xpath(PRODUCT_XPATH):
+        if (product_link := first_match(page=product, xpath=".//a")) is None:
+            break
+        products[inner_html(product_link)] = [
+            inner_html(sub_product) for sub_product in product.xpath(SUB_PRODUCT_XPATH)
+        ]
+    return products
+
+
+def parse_span_after(page: html.HtmlElement, xpath: str):
+    if (element := first_match(page=page, xpath=xpath)) is None:
+        logger.debug(f"Element not found: '{xpath}'")
+        return None
+    return inner_html(element)
+
+
+def class_xpath(classes: list[str]) -> str:
+    conditions = " and ".join(
+        f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+        for name in classes
+    )
+    return f"//div[{conditions}]"
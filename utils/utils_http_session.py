@@ -0,0 +1,44 @@
+import requests
+from loguru import logger
+from requests.adapters import HTTPAdapter
+
+from utils.utils_host_scheduler import classify_response, get_scheduler
+
+
+USER_AGENT = (
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/116.0.0.0 Safari/537.36"
+)
+REQUEST_TIMEOUT = 10
+
+
+def create_http_session(pool_size: int = 10) -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update({"User-Agent": USER_AGENT})
+    return session
+
+
+def fetch_response(
+    session: requests.Session, url: str, headers: dict | None = None
+) -> requests.Response | None:
+    with get_scheduler().slot(url=url) as ticket:
+        try:
+            response = session.get(url, headers=headers, timeout=REQUEST_TIMEOUT)
+        except requests.RequestException as e:
+            logger.debug(f"Request to '{url}' failed: {e}")
+            ticket.outcome = "error"
+            return None
+        ticket.outcome = classify_response(
+            status_code=response.status_code, text=response.text
+        )
+
+    if response.status_code == 304 and headers:
+        return response
+    if response.status_code != 200:
+        logger.debug(f"Request to '{url}' returned {response.status_code}")
+        return None
+
+    return response
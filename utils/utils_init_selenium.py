@@ -2,14 +2,24 @@ from loguru import logger
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 
+from utils.utils_load_profile import LoadProfile
 
-def initialise_selenium_driver() -> webdriver.Chrome | None:
+
+def initialise_selenium_driver(
+    load_profile: LoadProfile | None = None,
+) -> webdriver.Chrome | None:
     chrome_options = Options()
     chrome_options.add_argument("--incognito")
     chrome_options.add_argument("--headless=new")
     chrome_options.add_argument("--blink-settings=imagesEnabled=false")
+    if load_profile is not None:
+        load_profile.apply_to_options(chrome_options)
     try:
-        return webdriver.Chrome(options=chrome_options)
+        driver = webdriver.Chrome(options=chrome_options)
     except Exception:
         logger.error("Driver cannot be initialised")
         return None
+
+    if load_profile is not None:
+        load_profile.apply_to_driver(driver)
+    return driver
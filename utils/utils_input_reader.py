@@ -0,0 +1,106 @@
+import csv
+import re
+import zlib
+from itertools import islice
+from typing import Iterator, NamedTuple
+
+from loguru import logger
+
+
+GSTIN_PATTERN = re.compile(r"^\d{2}[A-Z]{5}\d{4}[A-Z][1-9A-Z]Z[0-9A-Z]$")
+GSTIN_CHARACTERS = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+
+class CompanyRow(NamedTuple):
+    index: int
+    GSTIN: str
+    COMPANY_NAME: str
+
+
+class ReaderStats:
+    def __init__(self) -> None:
+        self.read = 0
+        self.yielded = 0
+        self.duplicates = 0
+        self.invalid = 0
+        self.other_shards = 0
+
+    def as_dict(self) -> dict:
+        return {
+            "read": self.read,
+            "yielded": self.yielded,
+            "duplicates": self.duplicates,
+            "invalid": self.invalid,
+            "other_shards": self.other_shards,
+        }
+
+
+def gstin_checksum(gstin: str) -> str:
+    total = 0
+    for position, character in enumerate(gstin[:14]):
+        product = GSTIN_CHARACTERS.index(character) * (1 if position % 2 == 0 else 2)
+        total += product // 36 + product % 36
+    return GSTIN_CHARACTERS[(36 - total % 36) % 36]
+
+
+def is_valid_gstin(gstin: str) -> bool:
+    return bool(GSTIN_PATTERN.match(gstin)) and gstin_checksum(gstin) == gstin[14]
+
+
+def clean_cell(value: str | None) -> str:
+    return " ".join(str(value or "").replace("\xa0", " ").split())
+
+
+def shard_of(gstin: str, shards: int) -> int:
+    return zlib.crc32(gstin.encode()) % shards
+
+
+def read_company_rows(
+    path: str,
+    offset: int = 0,
+    shard: int = 0,
+    shards: int = 1,
+    stats: ReaderStats | None = None,
+) -> Iterator[CompanyRow]:
+    stats = stats if stats is not None else ReaderStats()
+    seen = set()
+    with open(path, newline="", encoding="utf-8-sig") as file:
+        header = next(csv.reader([file.readline()]), [])
+        try:
+            gstin_column = header.index("GSTIN")
+            name_column = header.index("COMPANY_NAME")
+        except ValueError as e:
+            logger.error(f"Missing column name in '{path}': {e}")
+            return None
+
+        rows = csv.reader(islice(file, offset, None))
+        for index, row in enumerate(rows, start=offset):
+            stats.read += 1
+            if len(row) <= max(gstin_column, name_column):
+                stats.invalid += 1
+                continue
+
+            gstin = clean_cell(row[gstin_column]).upper()
+            company_name = clean_cell(row[name_column])
+            if not is_valid_gstin(gstin):
+                stats.invalid += 1
+                continue
+            if (gstin, company_name) in seen:
+                stats.duplicates += 1
+                continue
+            seen.add((gstin, company_name))
+
+            if shards > 1 and shard_of(gstin, shards) != shard:
+                stats.other_shards += 1
+                continue
+
+            stats.yielded += 1
+            yield CompanyRow(index=index, GSTIN=gstin, COMPANY_NAME=company_name)
+
+
+def read_company_chunks(
+    path: str, chunk_size: int = 500, **kwargs
+) -> Iterator[list[CompanyRow]]:
+    rows = read_company_rows(path=path, **kwargs)
+    while chunk := list(islice(rows, chunk_size)):
+        yield chunk
@@ -0,0 +1,34 @@
+import re
+
+from utils.utils_disk_cache import DiskCache
+from utils.utils_input_reader import CompanyRow
+
+
+DEFAULT_TTL_DAYS = 30
+DEFAULT_MAX_ENTRIES = 200_000
+
+
+class LinkCache(DiskCache):
+    def __init__(
+        self,
+        path: str,
+        ttl_days: float = DEFAULT_TTL_DAYS,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ) -> None:
+        super().__init__(
+            path=path, ttl_seconds=ttl_days * 24 * 60 * 60, max_entries=max_entries
+        )
+
+    def get_link(self, company: CompanyRow):
+        return self.get(key=link_cache_key(company=company))
+
+    def set_link(self, company: CompanyRow, link: str | None):
+        self.set(key=link_cache_key(company=company), value=link)
+
+
+def link_cache_key(company: CompanyRow) -> str:
+    company_name = " ".join(
+        re.sub(r"[^\w\s]", "", str(company.COMPANY_NAME)).lower().split()
+    )
+    return f"{str(company.GSTIN).strip().upper()}|{company_name}"
+
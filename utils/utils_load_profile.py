@@ -0,0 +1,165 @@
+import threading
+from collections import deque
+
+from loguru import logger
+from selenium.webdriver import Chrome
+from selenium.webdriver.chrome.options import Options
+
+from utils.utils_metrics import metrics
+
+
+BLOCKED_URL_PATTERNS = [
+    "*.css",
+    "*.woff",
+    "*.woff2",
+    "*.ttf",
+    "*.otf",
+    "*.png",
+    "*.jpg",
+    "*.jpeg",
+    "*.gif",
+    "*.svg",
+    "*.webp",
+    "*.ico",
+    "*.mp4",
+    "*.webm",
+]
+BLOCKED_DOMAINS = [
+    "google-analytics.com",
+    "googletagmanager.com",
+    "googleadservices.com",
+    "googlesyndication.com",
+    "doubleclick.net",
+    "facebook.net",
+    "connect.facebook.com",
+    "hotjar.com",
+    "clarity.ms",
+    "scorecardresearch.com",
+    "adservice.google.com",
+]
+
+
+class LoadProfile:
+    def __init__(
+        self,
+        page_load_strategy: str = "eager",
+        blocked_url_patterns: list[str] | None = None,
+        blocked_domains: list[str] | None = None,
+    ) -> None:
+        self.page_load_strategy = page_load_strategy
+        self.blocked_url_patterns = list(blocked_url_patterns or [])
+        self.blocked_domains = list(blocked_domains or [])
+
+    def apply_to_options(self, chrome_options: Options):
+        chrome_options.page_load_strategy = self.page_load_strategy
+
+    def apply_to_driver(self, driver: Chrome):
+        blocked_urls = self.blocked_url_patterns + [
+            f"*{domain}*" for domain in self.blocked_domains
+        ]
+        if not blocked_urls:
+            return None
+        try:
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": blocked_urls})
+        except Exception as e:
+            logger.warning(f"Unable to block resources: {e}")
+
+
+LOAD_PROFILES = {
+    "default": LoadProfile(page_load_strategy="normal"),
+    "fast": LoadProfile(
+        page_load_strategy="eager",
+        blocked_url_patterns=BLOCKED_URL_PATTERNS,
+        blocked_domains=BLOCKED_DOMAINS,
+    ),
+}
+
+
+class LatencyTracker:
+    def __init__(
+        self,
+        default_timeout: float = 2,
+        min_timeout: float = 1,
+        max_timeout: float = 15,
+        quantile: float = 0.95,
+        factor: float = 1.5,
+        window: int = 200,
+        min_samples: int = 10,
+    ) -> None:
+        self.default_timeout = default_timeout
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.quantile = quantile
+        self.factor = factor
+        self.window = window
+        self.min_samples = min_samples
+        self.samples = {}
+        self.outcomes = {}
+        self.lock = threading.Lock()
+
+    def record(self, host: str, seconds: float):
+        with self.lock:
+            self.samples.setdefault(host, deque(maxlen=self.window)).append(seconds)
+            self.outcomes.setdefault(host, deque(maxlen=self.window)).append(True)
+
+    def record_miss(self, host: str):
+        with self.lock:
+            self.outcomes.setdefault(host, deque(maxlen=self.window)).append(False)
+
+    def miss_rate(self, host: str) -> float:
+        with self.lock:
+            outcomes = list(self.outcomes.get(host, []))
+        if len(outcomes) < self.min_samples:
+            return 0
+        return outcomes.count(False) / len(outcomes)
+
+    def percentile(self, host: str) -> float | None:
+        with self.lock:
+            samples = sorted(self.samples.get(host, []))
+        if len(samples) < self.min_samples:
+            return None
+        return samples[min(int(len(samples) * self.quantile), len(samples) - 1)]
+
+    def timeout_for(self, host: str) -> float:
+        timeout = self.default_timeout
+        if (percentile := self.percentile(host=host)) is not None:
+            timeout = percentile * self.factor
+        if self.miss_rate(host=host) > 0.5:
+            timeout *= 2
+        return min(max(timeout, self.min_timeout), self.max_timeout)
+
+
+latency_tracker = LatencyTracker()
+
+
+TRANSFER_STATS_SCRIPT = """
+const entries = performance.getEntriesByType("navigation").concat(
+    performance.getEntriesByType("resource")
+);
+const navigation = performance.getEntriesByType("navigation")[0];
+return {
+    requests: entries.length,
+    transfer_bytes: entries.reduce(
+        (total, entry) => total + (entry.transferSize || 0), 0
+    ),
+    dom_content_loaded_ms: navigation ? navigation.domContentLoadedEventEnd : null,
+};
+"""
+
+
+def get_page_transfer_stats(driver: Chrome) -> dict:
+    try:
+        return driver.execute_script(TRANSFER_STATS_SCRIPT) or {}
+    except Exception as e:
+        logger.debug(f"Unable to read transfer stats: {e}")
+        return {}
+
+
+def record_transfer_stats(driver: Chrome):
+    stats = get_page_transfer_stats(driver=driver)
+    if not stats:
+        return None
+    metrics.increment("pages_measured")
+    metrics.increment("page_requests", int(stats.get("requests") or 0))
+    metrics.increment("page_transfer_bytes", int(stats.get("transfer_bytes") or 0))
@@ -0,0 +1,236 @@
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable
+
+import requests
+from loguru import logger
+from selenium.common.exceptions import TimeoutException
+
+
+DURATION_BUCKETS = [0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60]
+OUTCOMES = ["found", "not_found", "timeout", "error"]
+TIMEOUT_EXCEPTIONS = (TimeoutException, requests.Timeout)
+TIMED_OUT = object()
+
+
+class StageMetrics:
+    def __init__(self, window: int = 1000) -> None:
+        self.count = 0
+        self.total_seconds = 0.0
+        self.outcomes = {outcome: 0 for outcome in OUTCOMES}
+        self.buckets = [0] * len(DURATION_BUCKETS)
+        self.samples = deque(maxlen=window)
+
+    def observe(self, seconds: float, outcome: str):
+        self.count += 1
+        self.total_seconds += seconds
+        self.outcomes[outcome] = self.outcomes.get(outcome, 0) + 1
+        for position, bound in enumerate(DURATION_BUCKETS):
+            if seconds <= bound:
+                self.buckets[position] += 1
+        self.samples.append(seconds)
+
+    def percentile(self, quantile: float) -> float | None:
+        samples = sorted(self.samples)
+        if not samples:
+            return None
+        return samples[min(int(len(samples) * quantile), len(samples) - 1)]
+
+    def as_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "total_seconds": round(self.total_seconds, 3),
+            "mean_seconds": round(self.total_seconds / self.count, 3)
+            if self.count
+            else None,
+            "p50_seconds": round_or_none(self.percentile(0.5)),
+            "p95_seconds": round_or_none(self.percentile(0.95)),
+            "outcomes": dict(self.outcomes),
+        }
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self.stages = {}
+        self.counters = {}
+        self.started_at = time.time()
+        self.lock = threading.Lock()
+
+    def observe(self, stage: str, seconds: float, outcome: str):
+        with self.lock:
+            self.stages.setdefault(stage, StageMetrics()).observe(seconds, outcome)
+
+    def increment(self, name: str, value: int = 1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            return {
+                "uptime_seconds": round(time.time() - self.started_at, 1),
+                "stages": {
+                    stage: metrics.as_dict() for stage, metrics in self.stages.items()
+                },
+                "counters": dict(self.counters),
+            }
+
+    def prometheus_text(self) -> str:
+        lines = ["# TYPE scraper_stage_duration_seconds histogram"]
+        with self.lock:
+            stages = list(self.stages.items())
+            counters = list(self.counters.items())
+            for stage, metrics in stages:
+                for bound, count in zip(DURATION_BUCKETS, metrics.buckets):
+                    lines.append(
+                        "scraper_stage_duration_seconds_bucket"
+                        f'{{stage="{stage}",le="{bound}"}} {count}'
+                    )
+                lines.append(
+                    "scraper_stage_duration_seconds_bucket"
+                    f'{{stage="{stage}",le="+Inf"}} {metrics.count}'
+                )
+                lines.append(
+                    f'scraper_stage_duration_seconds_sum{{stage="{stage}"}} '
+                    f"{metrics.total_seconds}"
+                )
+                lines.append(
+                    f'scraper_stage_duration_seconds_count{{stage="{stage}"}} '
+                    f"{metrics.count}"
+                )
+
+            lines.append("# TYPE scraper_stage_outcomes_total counter")
+            for stage, metrics in stages:
+                for outcome, count in metrics.outcomes.items():
+                    lines.append(
+                        "scraper_stage_outcomes_total"
+                        f'{{stage="{stage}",outcome="{outcome}"}} {count}'
+                    )
+
+        lines.append("# TYPE scraper_events_total counter")
+        for name, count in counters:
+            lines.append(f'scraper_events_total{{event="{name}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+    def log_summary(self):
+        snapshot = self.snapshot()
+        for stage, summary in sorted(snapshot["stages"].items()):
+            logger.info(f"Stage timing '{stage}': {summary}")
+        if snapshot["counters"]:
+            logger.info(f"Counters: {snapshot['counters']}")
+
+
+metrics = MetricsRegistry()
+
+
+def round_or_none(value: float | None) -> float | None:
+    return round(value, 3) if value is not None else None
+
+
+def instrument(stage: str, found: Callable[..., bool] | None = None):
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            outcome = "error"
+            try:
+                result = function(*args, **kwargs)
+                if result is TIMED_OUT:
+                    outcome = "timeout"
+                    return None
+                is_found = found(result, *args, **kwargs) if found else bool(result)
+                outcome = "found" if is_found else "not_found"
+                return result
+            except TIMEOUT_EXCEPTIONS:
+                outcome = "timeout"
+                raise
+            finally:
+                metrics.observe(
+                    stage=stage, seconds=time.perf_counter() - started, outcome=outcome
+                )
+
+        return wrapper
+
+    return decorator
+
+
+def attribute_found(*names: str) -> Callable[..., bool]:
+    return lambda result, instance, *args, **kwargs: any(
+        getattr(instance, name) for name in names
+    )
+
+
+def any_value_found(result, *args, **kwargs) -> bool:
+    return isinstance(result, dict) and any(result.values())
+
+
+class MetricsServer:
+    def __init__(self, port: int, host: str = "0.0.0.0") -> None:
+        self.server = ThreadingHTTPServer((host, port), MetricsHandler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def start(self):
+        self.thread.start()
+        host, port = self.server.server_address[:2]
+        logger.info(f"Serving metrics on http://{host}:{port}/metrics")
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        return None
+
+    def do_GET(self):
+        if self.path == "/metrics":
+            body, content_type = metrics.prometheus_text(), "text/plain; version=0.0.4"
+        elif self.path == "/metrics.json":
+            body, content_type = json.dumps(metrics.snapshot()), "application/json"
+        else:
+            self.send_response(404)
+            self.end_headers()
+            return None
+
+        encoded = body.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(encoded)))
+        self.end_headers()
+        self.wfile.write(encoded)
+
+
+class MetricsSnapshotWriter:
+    def __init__(self, path: str, interval_seconds: float = 30) -> None:
+        self.path = path
+        self.interval_seconds = interval_seconds
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def start(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self.thread.start()
+
+    def run(self):
+        while not self.stopped.wait(self.interval_seconds):
+            self.write()
+
+    def write(self):
+        temporary_path = f"{self.path}.tmp"
+        try:
+            with open(temporary_path, "w", encoding="utf-8") as file:
+                json.dump(metrics.snapshot(), file, indent=2)
+            os.replace(temporary_path, self.path)
+        except OSError as e:
+            logger.warning(f"Unable to write metrics snapshot: {e}")
+
+    def stop(self):
+        self.stopped.set()
+        self.thread.join()
+        self.write()
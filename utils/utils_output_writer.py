@@ -0,0 +1,221 @@
+import csv
+import json
+import os
+import threading
+import time
+from typing import Callable, Iterator
+
+from loguru import logger
+
+
+OUTPUT_COLUMNS = [
+    "gstin",
+    "company name",
+    "page link",
+    "address",
+    "state",
+    "zip code",
+    "owner name",
+    "phone number",
+    "products",
+    "nature of business",
+    "annual turnover",
+    "linkedin_url",
+    "personal_email",
+    "phone_number",
+    "founded_year",
+    "estimated_num_employees",
+    "industry",
+    "website_url",
+]
+JSON_COLUMNS = {"products"}
+OUTPUT_FORMATS = ["csv", "jsonl", "parquet"]
+
+
+class CsvSink:
+    def __init__(self, path: str) -> None:
+        self.file = open(path, "a", newline="", encoding="utf-8")
+        self.writer = csv.DictWriter(self.file, fieldnames=OUTPUT_COLUMNS)
+        if self.file.tell() == 0:
+            self.writer.writeheader()
+
+    def write_rows(self, rows: list[dict]):
+        self.writer.writerows(
+            {column: serialise_cell(column, row[column]) for column in OUTPUT_COLUMNS}
+            for row in rows
+        )
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class JsonlSink:
+    def __init__(self, path: str) -> None:
+        self.file = open(path, "a", encoding="utf-8")
+
+    def write_rows(self, rows: list[dict]):
+        self.file.writelines(
+            json.dumps(row, ensure_ascii=False, default=str) + "\n" for row in rows
+        )
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class ParquetSink:
+    def __init__(self, path: str) -> None:
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise RuntimeError("Parquet output requires the 'pyarrow' package") from e
+
+        self.pa = pa
+        self.schema = pa.schema([(column, pa.string()) for column in OUTPUT_COLUMNS])
+        self.writer = pq.ParquetWriter(next_free_path(path=path), self.schema)
+
+    def write_rows(self, rows: list[dict]):
+        columns = {
+            column: [serialise_cell(column, row[column]) for row in rows]
+            for column in OUTPUT_COLUMNS
+        }
+        self.writer.write_table(self.pa.table(columns, schema=self.schema))
+
+    def close(self):
+        self.writer.close()
+
+
+SINKS = {"csv": CsvSink, "jsonl": JsonlSink, "parquet": ParquetSink}
+
+
+class OutputWriter:
+    def __init__(
+        self,
+        path: str,
+        output_format: str | None = None,
+        flush_rows: int = 50,
+        flush_seconds: float = 30,
+        on_flush: Callable[[list[dict]], None] | None = None,
+    ) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        output_format = output_format or os.path.splitext(path)[1].lstrip(".")
+        if output_format not in SINKS:
+            raise ValueError(f"Unsupported output format '{output_format}'")
+
+        self.path = path
+        self.sink = SINKS[output_format](path)
+        self.flush_rows = flush_rows
+        self.flush_seconds = flush_seconds
+        self.on_flush = on_flush
+        self.buffer = []
+        self.last_flush = time.monotonic()
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        if flush_seconds:
+            self.thread.start()
+
+    def run(self):
+        while not self.stopped.wait(self.flush_seconds):
+            with self.lock:
+                if time.monotonic() - self.last_flush < self.flush_seconds:
+                    continue
+                try:
+                    self.flush_buffer()
+                except Exception as e:
+                    logger.error(f"Unable to flush rows to '{self.path}': {e}")
+
+    def write(self, data_dict: dict):
+        row = conform_to_schema(data_dict=data_dict)
+        with self.lock:
+            self.buffer.append(row)
+            if (
+                len(self.buffer) >= self.flush_rows
+                or time.monotonic() - self.last_flush >= self.flush_seconds
+            ):
+                self.flush_buffer()
+
+    def flush(self):
+        with self.lock:
+            self.flush_buffer()
+
+    def flush_buffer(self):
+        self.last_flush = time.monotonic()
+        if not self.buffer:
+            return None
+
+        rows, self.buffer = self.buffer, []
+        self.sink.write_rows(rows)
+        logger.debug(f"Flushed {len(rows)} rows to '{self.path}'")
+        if self.on_flush is not None:
+            self.on_flush(rows)
+
+    def close(self):
+        self.stopped.set()
+        if self.thread.is_alive():
+            self.thread.join()
+        with self.lock:
+            self.flush_buffer()
+            self.sink.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def read_output_rows(path: str, output_format: str | None = None) -> Iterator[dict]:
+    output_format = output_format or os.path.splitext(path)[1].lstrip(".")
+    with open(path, newline="", encoding="utf-8") as file:
+        if output_format == "jsonl":
+            for line in file:
+                if line.strip():
+                    yield json.loads(line)
+        elif output_format == "csv":
+            for row in csv.DictReader(file):
+                yield {
+                    column: deserialise_cell(column, value)
+                    for column, value in row.items()
+                }
+        else:
+            raise ValueError(f"Cannot read '{output_format}' output files")
+
+
+def conform_to_schema(data_dict: dict) -> dict:
+    if unknown := set(data_dict) - set(OUTPUT_COLUMNS):
+        logger.debug(f"Dropping columns outside the output schema: {sorted(unknown)}")
+    return {column: data_dict.get(column) for column in OUTPUT_COLUMNS}
+
+
+def serialise_cell(column: str, value):
+    if value is None:
+        return None
+    if column in JSON_COLUMNS or isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    return str(value)
+
+
+def deserialise_cell(column: str, value: str | None):
+    if value in (None, ""):
+        return None
+    if column in JSON_COLUMNS:
+        try:
+            return json.loads(value)
+        except ValueError:
+            return value
+    return value
+
+
+def next_free_path(path: str) -> str:
+    if not os.path.exists(path):
+        return path
+
+    root, extension = os.path.splitext(path)
+    part = 1
+    while os.path.exists(f"{root}.part{part}{extension}"):
+        part += 1
+    logger.info(f"'{path}' exists, writing to part {part}")
+    return f"{root}.part{part}{extension}"
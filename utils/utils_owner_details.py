@@ -1,55 +1,50 @@
-import json
-import sys
-
-import requests
 from loguru import logger
 
-API_KEY = "YOUR_APT_KEY"
-
-
-def fetch_owner_details_with_apollo(
-    first_name: str, last_name: str, organisation_name: str
-) -> dict:
-    url = "https://api.apollo.io/v1/people/match"
-    headers = {"Content-Type": "application/json", "Cache-Control": "no-cache"}
-    payload = json.dumps(
-        {
-            "api_key": API_KEY,
-            "first_name": first_name,
-            "last_name": last_name,
-            "organization_name": organisation_name,
-            "reveal_personal_emails": True,
-        }
-    )
-
-    response = requests.request("POST", url, headers=headers, data=payload)
-    if response.status_code != 200:
-        logger.error("Apollo API error: " + response.text)
-        sys.exit()
-
-    return json.loads(response.text)
+from utils.utils_apollo_client import get_apollo_client
+from utils.utils_metrics import any_value_found, instrument
 
 
-def get_owner_details(company_data: dict) -> dict:
-    owner_contact_details = {
+def empty_owner_contact_details() -> dict:
+    return {
         "linkedin_url": None,
         "personal_email": None,
         "phone_number": None,
     }
-    owner_name = data_from_dict(source=company_data, key_name="owner name")
-    organisation_name = data_from_dict(source=company_data, key_name="company name")
-    if not (owner_name and organisation_name):
-        logger.warning("Cannot find owner details with missing owner basic details")
-        return owner_contact_details
 
-    first_name, last_name = get_owner_name_corrected(owner_name=owner_name)
-    owner_details_as_dict = fetch_owner_details_with_apollo(
-        first_name=first_name, last_name=last_name, organisation_name=organisation_name
-    )
-    return extract_owner_details(
-        details_as_dict=owner_details_as_dict,
-        owner_contact_details=owner_contact_details,
-    )
+
+@instrument(stage="owner_details", found=any_value_found)
+def get_owner_details(company_data: dict) -> dict:
+    return get_owner_details_in_bulk(companies_data=[company_data])[0]
+
+
+def get_owner_details_in_bulk(companies_data: list[dict]) -> list[dict]:
+    results = [empty_owner_contact_details() for _ in companies_data]
+    people, indexes = [], []
+    for index, company_data in enumerate(companies_data):
+        owner_name = data_from_dict(source=company_data, key_name="owner name")
+        organisation_name = data_from_dict(source=company_data, key_name="company name")
+        if not (owner_name and organisation_name):
+            logger.warning("Cannot find owner details with missing owner basic details")
+            continue
+
+        first_name, last_name = get_owner_name_corrected(owner_name=owner_name)
+        people.append(
+            {
+                "first_name": first_name,
+                "last_name": last_name,
+                "organization_name": organisation_name,
+            }
+        )
+        indexes.append(index)
+
+    if not people:
+        return results
+
+    for index, details in zip(indexes, get_apollo_client().match_people(people)):
+        results[index] = extract_owner_details(
+            details_as_dict=details, owner_contact_details=results[index]
+        )
+    return results
 
 
 def extract_owner_details(details_as_dict: dict, owner_contact_details: dict) -> dict:
@@ -72,7 +67,7 @@ def extract_owner_details(details_as_dict: dict, owner_contact_details: dict) ->
     owner_phone_numbers = data_from_dict(
         source=person_details, key_name="phone_numbers"
     )
-    if isinstance(owner_phone_numbers, list):
+    if isinstance(owner_phone_numbers, list) and owner_phone_numbers:
         owner_contact_details["phone_number"] = data_from_dict(
             source=owner_phone_numbers[0], key_name="raw_number"
         )
@@ -92,5 +87,5 @@ def get_owner_name_corrected(owner_name: str):
 def data_from_dict(source: dict, key_name: str):
     try:
         return source[str(key_name)]
-    except KeyError:
+    except (KeyError, TypeError):
         return None
@@ -0,0 +1,162 @@
+import gzip
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Iterator, NamedTuple
+
+from loguru import logger
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+COMPRESSIONS = {"zstd": ".html.zst", "gzip": ".html.gz"}
+
+
+class ArchivedPage(NamedTuple):
+    url: str
+    kind: str
+    gstin: str | None
+    fetched_at: float
+    digest: str
+    compression: str
+
+
+class PageArchive:
+    def __init__(self, path: str, compression: str | None = None) -> None:
+        compression = compression or ("zstd" if zstandard is not None else "gzip")
+        if compression == "zstd" and zstandard is None:
+            raise RuntimeError("zstd compression requires the 'zstandard' package")
+        if compression not in COMPRESSIONS:
+            raise ValueError(f"Unsupported compression '{compression}'")
+
+        os.makedirs(os.path.join(path, "blobs"), exist_ok=True)
+        self.path = path
+        self.compression = compression
+        self.saved = 0
+        self.deduplicated = 0
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(
+            os.path.join(path, "index.sqlite"),
+            check_same_thread=False,
+            isolation_level=None,
+        )
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute(
+            """CREATE TABLE IF NOT EXISTS pages (
+                url TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                gstin TEXT,
+                fetched_at REAL NOT NULL,
+                digest TEXT NOT NULL,
+                compression TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                PRIMARY KEY (url, fetched_at)
+            )"""
+        )
+        self.connection.execute(
+            "CREATE INDEX IF NOT EXISTS pages_gstin ON pages (gstin, kind, fetched_at)"
+        )
+
+    def blob_path(self, digest: str, compression: str) -> str:
+        return blob_path(archive_path=self.path, digest=digest, compression=compression)
+
+    def save(self, url: str, content: str, kind: str, gstin: str | None = None):
+        raw = content.encode("utf-8")
+        digest = hashlib.sha256(raw).hexdigest()
+        path = self.blob_path(digest=digest, compression=self.compression)
+        if os.path.exists(path):
+            self.deduplicated += 1
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temporary_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(temporary_path, "wb") as file:
+                file.write(compress(raw, compression=self.compression))
+            os.replace(temporary_path, path)
+            self.saved += 1
+
+        with self.lock:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, kind, gstin, time.time(), digest, self.compression, len(raw)),
+            )
+        return digest
+
+    def load(self, page: ArchivedPage) -> str:
+        return read_archived_page(archive_path=self.path, page=page)
+
+    def latest_pages(self) -> Iterator[tuple[str, dict[str, ArchivedPage]]]:
+        with self.lock:
+            rows = self.connection.execute(
+                """SELECT url, kind, gstin, fetched_at, digest, compression FROM pages
+                WHERE gstin IS NOT NULL ORDER BY gstin, fetched_at"""
+            ).fetchall()
+
+        gstin, pages = None, {}
+        for row in rows:
+            page = ArchivedPage(*row)
+            if page.gstin != gstin and pages:
+                yield gstin, pages
+                pages = {}
+            gstin = page.gstin
+            pages[page.kind] = page
+        if pages:
+            yield gstin, pages
+
+    def stats(self) -> dict:
+        return {
+            "compression": self.compression,
+            "saved": self.saved,
+            "deduplicated": self.deduplicated,
+        }
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
+
+
+def blob_path(archive_path: str, digest: str, compression: str) -> str:
+    return os.path.join(
+        archive_path, "blobs", digest[:2], f"{digest}{COMPRESSIONS[compression]}"
+    )
+
+
+def read_archived_page(archive_path: str, page: ArchivedPage) -> str:
+    path = blob_path(
+        archive_path=archive_path, digest=page.digest, compression=page.compression
+    )
+    with open(path, "rb") as file:
+        return decompress(file.read(), compression=page.compression).decode("utf-8")
+
+
+def compress(raw: bytes, compression: str) -> bytes:
+    if compression == "zstd":
+        return zstandard.ZstdCompressor(level=10).compress(raw)
+    return gzip.compress(raw, compresslevel=6)
+
+
+def decompress(data: bytes, compression: str) -> bytes:
+    if compression == "zstd":
+        if zstandard is None:
+            raise RuntimeError("zstd archives require the 'zstandard' package")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+def archive_page(
+    archive: PageArchive | None,
+    url: str,
+    content: str | None,
+    kind: str,
+    gstin: str | None = None,
+):
+    if archive is None or not content:
+        return None
+    try:
+        archive.save(url=url, content=content, kind=kind, gstin=gstin)
+    except (OSError, sqlite3.Error) as e:
+        logger.warning(f"Unable to archive '{url}': {e}")
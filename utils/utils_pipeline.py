@@ -0,0 +1,170 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable
+
+from loguru import logger
+from selenium.webdriver import Chrome
+
+from utils.utils_driver_manager import DriverManager, DriverUnavailableError
+
+
+DONE = object()
+
+
+class StagedPipeline:
+    def __init__(
+        self,
+        browse: Callable[[Chrome, object], dict | None],
+        enrich: Callable[[object, dict], dict | None],
+        write: Callable[[dict], None],
+        create_manager: Callable[[], DriverManager] = DriverManager,
+        browsers: int = 1,
+        enrichers: int = 4,
+        queue_size: int = 16,
+    ) -> None:
+        self.browse = browse
+        self.enrich = enrich
+        self.write = write
+        self.create_manager = create_manager
+        self.browsers = max(browsers, 1)
+        self.enrichers = max(enrichers, 1)
+        self.queue_size = max(queue_size, 1)
+        self.counts = {"browsed": 0, "enriched": 0, "written": 0, "failed": 0}
+        self.peak_depths = {"browse": 0, "enrich": 0, "write": 0}
+        self.browsers_alive = 0
+
+    def run(self, items: Iterable):
+        asyncio.run(self.run_stages(items=items))
+        logger.info(f"Pipeline finished: {self.counts}, peak queues {self.peak_depths}")
+
+    async def run_stages(self, items: Iterable):
+        browse_queue = asyncio.Queue(maxsize=self.queue_size)
+        enrich_queue = asyncio.Queue(maxsize=self.queue_size)
+        write_queue = asyncio.Queue(maxsize=self.queue_size)
+
+        enrich_executor = ThreadPoolExecutor(
+            max_workers=self.enrichers, thread_name_prefix="enrich"
+        )
+        write_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="write")
+        self.browsers_alive = self.browsers
+        try:
+            browsers = [
+                asyncio.create_task(
+                    self.browse_stage(
+                        number=number, inbox=browse_queue, outbox=enrich_queue
+                    )
+                )
+                for number in range(self.browsers)
+            ]
+            enrichers = [
+                asyncio.create_task(
+                    self.enrich_stage(
+                        executor=enrich_executor, inbox=enrich_queue, outbox=write_queue
+                    )
+                )
+                for _ in range(self.enrichers)
+            ]
+            writer = asyncio.create_task(
+                self.write_stage(executor=write_executor, inbox=write_queue)
+            )
+
+            await self.feed(items=items, outbox=browse_queue)
+            await finish_stage(tasks=browsers, inbox=browse_queue)
+            await finish_stage(tasks=enrichers, inbox=enrich_queue)
+            await finish_stage(tasks=[writer], inbox=write_queue)
+        finally:
+            enrich_executor.shutdown(wait=True)
+            write_executor.shutdown(wait=True)
+
+    async def feed(self, items: Iterable, outbox: asyncio.Queue):
+        loop = asyncio.get_running_loop()
+        iterator = iter(items)
+        while self.browsers_alive:
+            item = await loop.run_in_executor(None, next, iterator, DONE)
+            if item is DONE:
+                return None
+            await self.put(outbox, item, stage="browse")
+        logger.error("No browser left, stopping the pipeline feed")
+
+    async def browse_stage(self, number: int, inbox: asyncio.Queue, outbox):
+        loop = asyncio.get_running_loop()
+        executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix=f"browser-{number}"
+        )
+        manager = self.create_manager()
+        try:
+            await loop.run_in_executor(executor, manager.get_driver)
+        except DriverUnavailableError as e:
+            logger.error(f"Browser {number} could not start a driver: {e}")
+            return await self.drain(inbox=inbox)
+
+        try:
+            while (item := await inbox.get()) is not DONE:
+                try:
+                    scraped_data = await loop.run_in_executor(
+                        executor,
+                        manager.run,
+                        lambda driver, item=item: self.browse(driver, item),
+                    )
+                except DriverUnavailableError as e:
+                    logger.error(f"Browser {number} lost its driver: {e}")
+                    self.counts["failed"] += 1
+                    return await self.drain(inbox=inbox)
+                except Exception as e:
+                    logger.error(f"Failed to scrape input row {item.index}: {e}")
+                    self.counts["failed"] += 1
+                    continue
+
+                if scraped_data is not None:
+                    self.counts["browsed"] += 1
+                    await self.put(outbox, (item, scraped_data), stage="enrich")
+            logger.info(f"Driver stats: {manager.stats()}")
+        finally:
+            await loop.run_in_executor(executor, manager.quit)
+            executor.shutdown(wait=False)
+
+    async def enrich_stage(self, executor, inbox: asyncio.Queue, outbox):
+        loop = asyncio.get_running_loop()
+        while (entry := await inbox.get()) is not DONE:
+            item, scraped_data = entry
+            try:
+                scraped_data = await loop.run_in_executor(
+                    executor, self.enrich, item, scraped_data
+                )
+            except Exception as e:
+                logger.error(f"Failed to enrich input row {item.index}: {e}")
+                self.counts["failed"] += 1
+                continue
+
+            if scraped_data is not None:
+                self.counts["enriched"] += 1
+                await self.put(outbox, scraped_data, stage="write")
+
+    async def write_stage(self, executor, inbox: asyncio.Queue):
+        loop = asyncio.get_running_loop()
+        while (scraped_data := await inbox.get()) is not DONE:
+            try:
+                await loop.run_in_executor(executor, self.write, scraped_data)
+            except Exception as e:
+                logger.error(f"Failed to write row '{scraped_data.get('gstin')}': {e}")
+                self.counts["failed"] += 1
+                continue
+            self.counts["written"] += 1
+
+    async def drain(self, inbox: asyncio.Queue):
+        self.browsers_alive -= 1
+        if self.browsers_alive:
+            return None
+        while await inbox.get() is not DONE:
+            self.counts["failed"] += 1
+
+    async def put(self, queue: asyncio.Queue, entry, stage: str):
+        await queue.put(entry)
+        self.peak_depths[stage] = max(self.peak_depths[stage], queue.qsize())
+
+
+async def finish_stage(tasks: list[asyncio.Task], inbox: asyncio.Queue):
+    for task in tasks:
+        if not task.done():
+            await inbox.put(DONE)
+    await asyncio.gather(*tasks)
@@ -0,0 +1,315 @@
+import ast
+import html
+import json
+import os
+import re
+import sqlite3
+import threading
+from itertools import islice
+from typing import Iterable, Iterator, NamedTuple
+
+
+PRODUCT_STOPWORDS = {"and", "for", "in", "of", "the", "to", "with"}
+STATE_TOKEN_PREFIX = "state:"
+BUILD_BATCH_SIZE = 1_000
+DOCUMENT_FREQUENCY_CAP = 10_000
+
+
+class ProductRow(NamedTuple):
+    company_id: int
+    category: str
+    sub_product: str | None
+    tokens: str
+
+
+class CatalogMatch(NamedTuple):
+    gstin: str
+    company_name: str | None
+    state: str | None
+    products: list[str]
+
+
+class ProductCatalog:
+    def __init__(self, path: str) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(
+            path, check_same_thread=False, isolation_level=None
+        )
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute(
+            """CREATE TABLE IF NOT EXISTS companies (
+                company_id INTEGER PRIMARY KEY,
+                gstin TEXT NOT NULL UNIQUE,
+                company_name TEXT,
+                state TEXT
+            )"""
+        )
+        self.connection.execute(
+            """CREATE TABLE IF NOT EXISTS products (
+                company_id INTEGER NOT NULL,
+                category TEXT NOT NULL,
+                sub_product TEXT,
+                tokens TEXT NOT NULL
+            )"""
+        )
+        self.connection.execute(
+            "CREATE INDEX IF NOT EXISTS products_company ON products (company_id)"
+        )
+        self.connection.execute(
+            """CREATE TABLE IF NOT EXISTS postings (
+                token TEXT NOT NULL,
+                company_id INTEGER NOT NULL,
+                PRIMARY KEY (token, company_id)
+            ) WITHOUT ROWID"""
+        )
+
+    def build(self, rows: Iterable[dict]) -> int:
+        companies = 0
+        rows = iter(rows)
+        while batch := list(islice(rows, BUILD_BATCH_SIZE)):
+            with self.lock:
+                self.connection.execute("BEGIN")
+                try:
+                    for row in batch:
+                        companies += self.add_company(row=row)
+                    self.connection.execute("COMMIT")
+                except Exception:
+                    self.connection.execute("ROLLBACK")
+                    raise
+        return companies
+
+    def add_company(self, row: dict) -> bool:
+        if not (gstin := row.get("gstin")):
+            return False
+
+        state = row.get("state") or None
+        existing = self.connection.execute(
+            "SELECT company_id, state FROM companies WHERE gstin = ?", (gstin,)
+        ).fetchone()
+        if existing is None:
+            company_id = self.connection.execute(
+                "INSERT INTO companies (gstin, company_name, state) VALUES (?, ?, ?)",
+                (gstin, row.get("company name"), state),
+            ).lastrowid
+        else:
+            company_id = existing[0]
+            self.remove_products(company_id=company_id, state=existing[1])
+            self.connection.execute(
+                "UPDATE companies SET company_name = ?, state = ? WHERE company_id = ?",
+                (row.get("company name"), state, company_id),
+            )
+
+        product_rows = list(
+            product_rows_for(company_id=company_id, products=row.get("products"))
+        )
+        self.connection.executemany(
+            "INSERT INTO products VALUES (?, ?, ?, ?)", product_rows
+        )
+
+        tokens = {token for product in product_rows for token in product.tokens.split()}
+        if state:
+            tokens.add(state_token(state=state))
+        self.connection.executemany(
+            "INSERT OR IGNORE INTO postings VALUES (?, ?)",
+            [(token, company_id) for token in tokens],
+        )
+        return True
+
+    def remove_products(self, company_id: int, state: str | None):
+        tokens = {
+            token
+            for (token_text,) in self.connection.execute(
+                "SELECT tokens FROM products WHERE company_id = ?", (company_id,)
+            )
+            for token in token_text.split()
+        }
+        if state:
+            tokens.add(state_token(state=state))
+        self.connection.executemany(
+            "DELETE FROM postings WHERE token = ? AND company_id = ?",
+            [(token, company_id) for token in tokens],
+        )
+        self.connection.execute(
+            "DELETE FROM products WHERE company_id = ?", (company_id,)
+        )
+
+    def query(
+        self, product: str, state: str | None = None, limit: int | None = 100
+    ) -> list[CatalogMatch]:
+        query_tokens = sorted(product_tokens(product))
+        if not query_tokens:
+            return []
+        tokens = query_tokens + ([state_token(state=state)] if state else [])
+
+        with self.lock:
+            rarest, *others = sorted(tokens, key=self.document_frequency)
+            conditions = "".join(
+                """ AND EXISTS (SELECT 1 FROM postings AS other
+                WHERE other.token = ? AND other.company_id = first.company_id)"""
+                for _ in others
+            )
+            product_conditions = " AND ".join(
+                "' ' || products.tokens || ' ' LIKE ?" for _ in query_tokens
+            )
+            rows = self.connection.execute(
+                f"""SELECT companies.company_id, gstin, company_name, state
+                FROM postings AS first JOIN companies USING (company_id)
+                WHERE first.token = ?{conditions}
+                AND EXISTS (SELECT 1 FROM products
+                    WHERE products.company_id = first.company_id
+                    AND {product_conditions})
+                ORDER BY first.company_id
+                LIMIT ?""",
+                (
+                    rarest,
+                    *others,
+                    *[f"% {token} %" for token in query_tokens],
+                    -1 if limit is None else limit,
+                ),
+            ).fetchall()
+            products = self.matching_products(
+                company_ids=[row[0] for row in rows], tokens=set(query_tokens)
+            )
+        return [
+            CatalogMatch(
+                gstin=gstin,
+                company_name=company_name,
+                state=state,
+                products=products.get(company_id, []),
+            )
+            for company_id, gstin, company_name, state in rows
+        ]
+
+    def document_frequency(self, token: str) -> int:
+        return self.connection.execute(
+            """SELECT COUNT(*) FROM (
+                SELECT 1 FROM postings WHERE token = ? LIMIT ?
+            )""",
+            (token, DOCUMENT_FREQUENCY_CAP),
+        ).fetchone()[0]
+
+    def matching_products(
+        self, company_ids: list[int], tokens: set[str]
+    ) -> dict[int, list[str]]:
+        matches = {}
+        for start in range(0, len(company_ids), 500):
+            chunk = company_ids[start : start + 500]
+            placeholders = ", ".join("?" for _ in chunk)
+            rows = self.connection.execute(
+                f"""SELECT company_id, category, sub_product, tokens FROM products
+                WHERE company_id IN ({placeholders})""",
+                chunk,
+            )
+            for company_id, category, sub_product, product_token_text in rows:
+                name = f"{category} / {sub_product}" if sub_product else category
+                if tokens <= set(product_token_text.split()):
+                    matches.setdefault(company_id, []).append(name)
+        return matches
+
+    def product_rows(self) -> Iterator[ProductRow]:
+        with self.lock:
+            rows = self.connection.execute(
+                "SELECT * FROM products ORDER BY company_id"
+            ).fetchall()
+        for row in rows:
+            yield ProductRow(*row)
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                table: self.connection.execute(
+                    f"SELECT COUNT(*) FROM {table}"
+                ).fetchone()[0]
+                for table in ["companies", "products", "postings"]
+            }
+
+    def export_columnar(self, path: str):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise RuntimeError("Columnar export requires the 'pyarrow' package") from e
+
+        with self.lock:
+            companies = dict(
+                self.connection.execute("SELECT company_id, gstin FROM companies")
+            )
+        rows = list(self.product_rows())
+        table = pa.table(
+            {
+                "company_id": pa.array([row.company_id for row in rows], pa.int64()),
+                "gstin": pa.array(
+                    [companies[row.company_id] for row in rows], pa.string()
+                ).dictionary_encode(),
+                "category": pa.array(
+                    [row.category for row in rows], pa.string()
+                ).dictionary_encode(),
+                "sub_product": pa.array([row.sub_product for row in rows], pa.string()),
+                "tokens": pa.array(
+                    [row.tokens.split() for row in rows], pa.list_(pa.string())
+                ),
+            }
+        )
+        pq.write_table(table, path, compression="zstd")
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
+
+
+def parse_products(products) -> dict:
+    if isinstance(products, dict):
+        return products
+    if not isinstance(products, str) or not products.strip():
+        return {}
+    for parse in (json.loads, ast.literal_eval):
+        try:
+            parsed = parse(products)
+        except (ValueError, SyntaxError):
+            continue
+        return parsed if isinstance(parsed, dict) else {}
+    return {}
+
+
+def product_rows_for(company_id: int, products) -> Iterator[ProductRow]:
+    for category, sub_products in parse_products(products).items():
+        category = clean_product_name(category)
+        if not category:
+            continue
+        if isinstance(sub_products, str):
+            sub_products = [sub_products]
+        sub_products = [clean_product_name(name) for name in sub_products or []]
+        for sub_product in [name for name in sub_products if name] or [None]:
+            tokens = product_tokens(f"{category} {sub_product or ''}")
+            yield ProductRow(
+                company_id=company_id,
+                category=category,
+                sub_product=sub_product,
+                tokens=" ".join(sorted(tokens)),
+            )
+
+
+def clean_product_name(name) -> str:
+    return " ".join(html.unescape(str(name or "")).split())
+
+
+def product_tokens(text: str | None) -> set[str]:
+    return {
+        stem(token)
+        for token in re.findall(r"[a-z0-9]+", str(text or "").lower())
+        if token not in PRODUCT_STOPWORDS
+    }
+
+
+def stem(token: str) -> str:
+    if len(token) > 4 and token.endswith("ies"):
+        return f"{token[:-3]}y"
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+def state_token(state: str) -> str:
+    return f"{STATE_TOKEN_PREFIX}{' '.join(str(state).lower().split())}"
@@ -0,0 +1,120 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from loguru import logger
+
+
+STAGES = ["search", "profile", "owner", "company"]
+FINISHED_STATUSES = {"done", "not_found", "shared"}
+
+
+class RunJournal:
+    def __init__(self, path: str) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(
+            path, check_same_thread=False, isolation_level=None
+        )
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute(
+            """CREATE TABLE IF NOT EXISTS stages (
+                gstin TEXT NOT NULL,
+                stage TEXT NOT NULL,
+                status TEXT NOT NULL,
+                error TEXT,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (gstin, stage)
+            )"""
+        )
+        self.connection.execute(
+            """CREATE TABLE IF NOT EXISTS results (
+                gstin TEXT PRIMARY KEY,
+                data TEXT NOT NULL,
+                written INTEGER NOT NULL DEFAULT 0,
+                updated_at REAL NOT NULL
+            )"""
+        )
+
+    def execute(self, query: str, parameters: tuple = ()):
+        with self.lock:
+            return self.connection.execute(query, parameters).fetchall()
+
+    def stage_status(self, gstin: str, stage: str) -> str | None:
+        rows = self.execute(
+            "SELECT status FROM stages WHERE gstin = ? AND stage = ?", (gstin, stage)
+        )
+        return rows[0][0] if rows else None
+
+    def needs_stage(self, gstin: str, stage: str) -> bool:
+        return self.stage_status(gstin=gstin, stage=stage) not in FINISHED_STATUSES
+
+    def mark(self, gstin: str, stage: str, status: str, error: str | None = None):
+        self.execute(
+            "INSERT OR REPLACE INTO stages VALUES (?, ?, ?, ?, ?)",
+            (gstin, stage, status, error, time.time()),
+        )
+
+    @contextmanager
+    def stage(self, gstin: str, stage: str):
+        try:
+            yield
+        except Exception as e:
+            self.mark(gstin=gstin, stage=stage, status="failed", error=str(e))
+            raise
+        self.mark(gstin=gstin, stage=stage, status="done")
+
+    def load_data(self, gstin: str) -> dict:
+        rows = self.execute("SELECT data FROM results WHERE gstin = ?", (gstin,))
+        return json.loads(rows[0][0]) if rows else {}
+
+    def save_data(self, gstin: str, data: dict):
+        self.execute(
+            """INSERT INTO results (gstin, data, updated_at) VALUES (?, ?, ?)
+            ON CONFLICT (gstin) DO UPDATE SET data = excluded.data,
+            updated_at = excluded.updated_at""",
+            (gstin, json.dumps(data), time.time()),
+        )
+
+    def mark_written(self, gstin: str):
+        self.execute("UPDATE results SET written = 1 WHERE gstin = ?", (gstin,))
+
+    def is_finished(self, gstin: str) -> bool:
+        if self.stage_status(gstin=gstin, stage="search") == "not_found":
+            return True
+        rows = self.execute("SELECT written FROM results WHERE gstin = ?", (gstin,))
+        return bool(rows and rows[0][0])
+
+    def is_complete(self, gstin: str) -> bool:
+        rows = self.execute(
+            """SELECT COUNT(*) FROM stages
+            WHERE gstin = ? AND status IN ('done', 'shared')""",
+            (gstin,),
+        )
+        return rows[0][0] == len(STAGES)
+
+    def mark_shared(self, gstin: str, data: dict):
+        self.save_data(gstin, data)
+        for stage in STAGES:
+            self.mark(gstin=gstin, stage=stage, status="shared")
+
+    def summary(self) -> dict:
+        rows = self.execute(
+            "SELECT stage, status, COUNT(*) FROM stages GROUP BY stage, status"
+        )
+        summary = {stage: {} for stage in STAGES}
+        for stage, status, count in rows:
+            summary.setdefault(stage, {})[status] = count
+        return summary
+
+    def log_summary(self):
+        for stage, counts in self.summary().items():
+            logger.info(f"Stage '{stage}': {counts}")
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
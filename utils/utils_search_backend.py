@@ -0,0 +1,139 @@
+from typing import NamedTuple
+from urllib.parse import urlencode
+
+import requests
+from loguru import logger
+from lxml import html
+from selenium.webdriver import Chrome
+
+from utils.utils_google_page import create_search_query, search_using_query
+from utils.utils_host_scheduler import classify_page
+from utils.utils_http_session import create_http_session, fetch_response
+from utils.utils_input_reader import CompanyRow
+from utils.utils_metrics import instrument, metrics
+
+
+SEARCH_HTML_URL = "https://html.duckduckgo.com/html/"
+SEARCH_BACKENDS = ["html", "selenium"]
+RESULT_DOMAIN_XPATHS = [
+    "//*[contains(concat(' ', normalize-space(@class), ' '), ' result__url ')]",
+    "//*[contains(concat(' ', normalize-space(@class), ' '), "
+    "' Wo6ZAEmESLNUuWBkbMxx ')]",
+]
+
+
+class SearchResults(NamedTuple):
+    url: str
+    page_source: str
+    backend: str
+
+
+class HtmlSearchBackend:
+    name = "html"
+
+    def __init__(
+        self, session: requests.Session | None = None, url: str | None = None
+    ) -> None:
+        self.session = session or create_http_session()
+        self.url = url or SEARCH_HTML_URL
+
+    def search(self, query: str, driver: Chrome | None = None) -> SearchResults | None:
+        url = f"{self.url}?{urlencode({'q': query})}"
+        if (response := fetch_response(session=self.session, url=url)) is None:
+            return None
+        if classify_page(page_source=response.text) == "throttled":
+            logger.warning("HTML search endpoint returned a challenge page")
+            return None
+        return SearchResults(
+            url=response.url, page_source=response.text, backend=self.name
+        )
+
+
+class SeleniumSearchBackend:
+    name = "selenium"
+
+    def search(self, query: str, driver: Chrome | None = None) -> SearchResults | None:
+        if driver is None:
+            return None
+        if search_using_query(driver=driver, query=query) is None:
+            return None
+        try:
+            url, page_source = driver.current_url, driver.page_source
+        except Exception as e:
+            logger.warning(f"Unable to read search results: {e}")
+            return None
+        if classify_page(page_source=page_source) == "throttled":
+            logger.warning("Browser search returned a challenge page")
+            return None
+        return SearchResults(url=url, page_source=page_source, backend=self.name)
+
+
+class FallbackSearchBackend:
+    def __init__(self, backends: list) -> None:
+        self.backends = backends
+        self.name = "+".join(backend.name for backend in backends)
+
+    def search(self, query: str, driver: Chrome | None = None) -> SearchResults | None:
+        for backend in self.backends:
+            if (results := backend.search(query=query, driver=driver)) is not None:
+                metrics.increment(f"search_{backend.name}")
+                return results
+            logger.debug(f"Search backend '{backend.name}' failed for '{query}'")
+        return None
+
+
+def create_search_backend(name: str = "html", pool_size: int = 10):
+    if name == "selenium":
+        return FallbackSearchBackend(backends=[SeleniumSearchBackend()])
+    if name == "html":
+        return FallbackSearchBackend(
+            backends=[
+                HtmlSearchBackend(session=create_http_session(pool_size=pool_size)),
+                SeleniumSearchBackend(),
+            ]
+        )
+    raise ValueError(f"Unknown search backend '{name}'")
+
+
+def configure_search_backend(name: str = "html", pool_size: int = 10):
+    global search_backend
+    search_backend = create_search_backend(name=name, pool_size=pool_size)
+    return search_backend
+
+
+def get_search_backend():
+    global search_backend
+    if search_backend is None:
+        search_backend = create_search_backend()
+    return search_backend
+
+
+@instrument(stage="search_page")
+def search_company(driver: Chrome | None, company: CompanyRow) -> SearchResults | None:
+    search_query = create_search_query(company=company)
+    if not isinstance(search_query, str):
+        return None
+
+    logger.info(f"Search query: '{search_query}'.")
+    return get_search_backend().search(query=search_query, driver=driver)
+
+
+def result_domains(page_source: str) -> list[str]:
+    try:
+        page = html.fromstring(page_source)
+    except Exception as e:
+        logger.warning(f"Unable to parse search results: {e}")
+        return []
+
+    for xpath in RESULT_DOMAIN_XPATHS:
+        domains = [
+            text
+            for element in page.xpath(xpath)
+            if (text := element.text_content().strip())
+        ]
+        if domains:
+            return domains
+    return []
+
+
+search_backend = None
@@ -0,0 +1,247 @@
+import argparse
+import csv
+import json
+import re
+from functools import lru_cache
+
+from loguru import logger
+
+
+STATES_PATH = "uploads/states.csv"
+
+STATE_ALIASES = {
+    "Andaman and Nicobar Islands": ["andaman", "nicobar", "port blair"],
+    "Andhra Pradesh": ["andhra"],
+    "Arunachal Pradesh": ["arunachal"],
+    "Chhattisgarh": ["chattisgarh", "chhatisgarh"],
+    "Dadra and Nagar Haveli and Daman and Diu": [
+        "dadra",
+        "nagar haveli",
+        "daman",
+        "diu",
+        "silvassa",
+        "dnh",
+    ],
+    "Delhi": ["new delhi", "nct of delhi"],
+    "Himachal Pradesh": ["himachal"],
+    "Jammu and Kashmir": ["jammu", "kashmir", "jk"],
+    "Maharashtra": ["maharastra"],
+    "Odisha": ["orissa"],
+    "Puducherry": ["pondicherry", "pondichery"],
+    "Tamil Nadu": ["tamilnadu"],
+    "Telangana": ["telengana"],
+    "Uttarakhand": ["uttaranchal"],
+}
+
+GSTIN_STATE_CODES = {
+    "01": "Jammu and Kashmir",
+    "02": "Himachal Pradesh",
+    "03": "Punjab",
+    "04": "Chandigarh",
+    "05": "Uttarakhand",
+    "06": "Haryana",
+    "07": "Delhi",
+    "08": "Rajasthan",
+    "09": "Uttar Pradesh",
+    "10": "Bihar",
+    "11": "Sikkim",
+    "12": "Arunachal Pradesh",
+    "13": "Nagaland",
+    "14": "Manipur",
+    "15": "Mizoram",
+    "16": "Tripura",
+    "17": "Meghalaya",
+    "18": "Assam",
+    "19": "West Bengal",
+    "20": "Jharkhand",
+    "21": "Odisha",
+    "22": "Chhattisgarh",
+    "23": "Madhya Pradesh",
+    "24": "Gujarat",
+    "25": "Dadra and Nagar Haveli and Daman and Diu",
+    "26": "Dadra and Nagar Haveli and Daman and Diu",
+    "27": "Maharashtra",
+    "28": "Andhra Pradesh",
+    "29": "Karnataka",
+    "30": "Goa",
+    "31": "Lakshadweep",
+    "32": "Kerala",
+    "33": "Tamil Nadu",
+    "34": "Puducherry",
+    "35": "Andaman and Nicobar Islands",
+    "36": "Telangana",
+    "37": "Andhra Pradesh",
+    "38": "Ladakh",
+}
+
+PIN_PREFIX_RANGES = [
+    (110, 110, "Delhi"),
+    (121, 136, "Haryana"),
+    (140, 159, "Punjab"),
+    (160, 160, "Chandigarh"),
+    (171, 177, "Himachal Pradesh"),
+    (180, 193, "Jammu and Kashmir"),
+    (194, 194, "Ladakh"),
+    (201, 285, "Uttar Pradesh"),
+    (246, 246, "Uttarakhand"),
+    (248, 249, "Uttarakhand"),
+    (262, 263, "Uttarakhand"),
+    (301, 345, "Rajasthan"),
+    (360, 396, "Gujarat"),
+    (400, 445, "Maharashtra"),
+    (403, 403, "Goa"),
+    (450, 488, "Madhya Pradesh"),
+    (490, 497, "Chhattisgarh"),
+    (500, 509, "Telangana"),
+    (510, 535, "Andhra Pradesh"),
+    (560, 591, "Karnataka"),
+    (600, 643, "Tamil Nadu"),
+    (605, 605, "Puducherry"),
+    (670, 695, "Kerala"),
+    (700, 743, "West Bengal"),
+    (737, 737, "Sikkim"),
+    (744, 744, "Andaman and Nicobar Islands"),
+    (751, 770, "Odisha"),
+    (781, 788, "Assam"),
+    (790, 792, "Arunachal Pradesh"),
+    (793, 794, "Meghalaya"),
+    (795, 795, "Manipur"),
+    (796, 796, "Mizoram"),
+    (797, 798, "Nagaland"),
+    (799, 799, "Tripura"),
+    (800, 813, "Bihar"),
+    (814, 835, "Jharkhand"),
+    (841, 855, "Bihar"),
+]
+
+
+class StateResolver:
+    def __init__(self, states: list[str]) -> None:
+        self.states = list(states)
+        self.phrases = {}
+        for state in self.states:
+            self.phrases[normalise(state)] = state
+            for alias in STATE_ALIASES.get(state, []):
+                self.phrases[normalise(alias)] = state
+        self.max_phrase_length = max(len(phrase.split()) for phrase in self.phrases)
+
+        known_states = set(self.states)
+        self.pin_prefixes = {}
+        for first, last, state in PIN_PREFIX_RANGES:
+            if state in known_states:
+                for prefix in range(first, last + 1):
+                    self.pin_prefixes[str(prefix)] = state
+        self.gstin_codes = {
+            code: state
+            for code, state in GSTIN_STATE_CODES.items()
+            if state in known_states
+        }
+
+    def state_from_address(self, address: str | None) -> str | None:
+        if not address:
+            return None
+
+        for segment in reversed(str(address).split(",")):
+            tokens = normalise(segment).split()
+            for length in range(min(self.max_phrase_length, len(tokens)), 0, -1):
+                for start in range(len(tokens) - length, -1, -1):
+                    phrase = " ".join(tokens[start : start + length])
+                    if phrase in self.phrases:
+                        return self.phrases[phrase]
+        return None
+
+    def state_from_pin(self, zip_code: str | None) -> str | None:
+        if not zip_code or not re.fullmatch(r"\d{6}", str(zip_code)):
+            return None
+        return self.pin_prefixes.get(str(zip_code)[:3])
+
+    def state_from_gstin(self, gstin: str | None) -> str | None:
+        if not gstin:
+            return None
+        return self.gstin_codes.get(str(gstin).strip()[:2])
+
+    def resolve(
+        self,
+        address: str | None,
+        zip_code: str | None = None,
+        gstin: str | None = None,
+    ) -> str | None:
+        state = self.state_from_address(address=address)
+        pin_state = self.state_from_pin(zip_code=zip_code)
+        if state is None:
+            state = pin_state
+        elif pin_state is not None and pin_state != state:
+            logger.debug(f"Address state '{state}' disagrees with PIN '{pin_state}'")
+
+        gstin_state = self.state_from_gstin(gstin=gstin)
+        if state is not None and gstin_state is not None and gstin_state != state:
+            logger.debug(f"Resolved state '{state}' differs from GSTIN '{gstin_state}'")
+
+        return state.lower() if state is not None else None
+
+
+def normalise(text: str) -> str:
+    return " ".join(re.sub(r"[^a-z0-9\s]", " ", str(text).lower()).split())
+
+
+def read_states(path: str) -> list[str]:
+    with open(path, newline="", encoding="utf-8") as file:
+        return [
+            row["State"].strip() for row in csv.DictReader(file) if row.get("State")
+        ]
+
+
+@lru_cache(maxsize=None)
+def get_state_resolver(path: str = STATES_PATH) -> StateResolver:
+    return StateResolver(states=read_states(path=path))
+
+
+def extract_zip_code(address: str | None) -> str | None:
+    if address and (match := re.search(r"\b\d{6}\b", str(address))):
+        return match.group()
+    return None
+
+
+def resolve_states_in_file(
+    input_path: str, output_path: str, states_path: str = STATES_PATH
+):
+    resolver = get_state_resolver(path=states_path)
+    is_jsonl = input_path.endswith(".jsonl")
+    with open(input_path, newline="", encoding="utf-8") as source, open(
+        output_path, "w", newline="", encoding="utf-8"
+    ) as target:
+        if is_jsonl:
+            rows = (json.loads(line) for line in source if line.strip())
+        else:
+            rows = csv.DictReader(source)
+
+        writer, count = None, 0
+        for count, row in enumerate(rows, start=1):
+            zip_code = row.get("zip code") or extract_zip_code(row.get("address"))
+            row["state"] = resolver.resolve(
+                address=row.get("address"), zip_code=zip_code, gstin=row.get("gstin")
+            )
+            if is_jsonl:
+                target.write(json.dumps(row, ensure_ascii=False) + "\n")
+                continue
+            if writer is None:
+                writer = csv.DictWriter(target, fieldnames=list(row.keys()))
+                writer.writeheader()
+            writer.writerow(row)
+
+    logger.info(f"Resolved states for {count} rows")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Re-resolve the state column of an output file"
+    )
+    parser.add_argument("input_path")
+    parser.add_argument("output_path")
+    parser.add_argument("--states", default=STATES_PATH)
+    arguments = parser.parse_args()
+    resolve_states_in_file(
+        input_path=arguments.input_path,
+        output_path=arguments.output_path,
+        states_path=arguments.states,
+    )
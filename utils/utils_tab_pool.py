@@ -0,0 +1,279 @@
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable
+
+from loguru import logger
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver import Chrome
+
+from utils.utils_driver_manager import DriverManager, DriverUnavailableError
+from utils.utils_metrics import metrics
+
+
+DONE = object()
+
+
+class Tab:
+    def __init__(self, handle: str, context_id: str | None = None) -> None:
+        self.handle = handle
+        self.context_id = context_id
+        self.index = None
+        self.item = None
+        self.task = None
+        self.attempt = 0
+
+    def clear(self):
+        self.index = None
+        self.item = None
+        self.task = None
+        self.attempt = 0
+
+
+class TabPool:
+    def __init__(
+        self,
+        start: Callable[[Chrome, object], object | None],
+        finish: Callable[[object, object | None], dict | None],
+        write: Callable[[dict], None],
+        create_manager: Callable[[], DriverManager] = DriverManager,
+        tabs: int = 4,
+        finishers: int = 4,
+        max_attempts: int = 2,
+        page_timeout_seconds: float = 30,
+        script_timeout_seconds: float = 10,
+        poll_interval_seconds: float = 0.05,
+        isolate: bool = True,
+        prepare_tab: Callable[[Chrome], None] | None = None,
+        prefetch: Callable[[object], None] | None = None,
+    ) -> None:
+        self.start = start
+        self.finish = finish
+        self.write = write
+        self.create_manager = create_manager
+        self.tab_count = max(tabs, 1)
+        self.finishers = max(finishers, 1)
+        self.max_attempts = max_attempts
+        self.page_timeout_seconds = page_timeout_seconds
+        self.script_timeout_seconds = script_timeout_seconds
+        self.poll_interval_seconds = poll_interval_seconds
+        self.isolate = isolate
+        self.prepare_tab = prepare_tab
+        self.prefetch = prefetch
+        self.driver = None
+        self.home_handle = None
+        self.tabs = []
+        self.items = iter([])
+        self.retries = deque()
+        self.prefetching = []
+        self.finishing = []
+        self.counts = {"finished": 0, "failed": 0, "replaced": 0, "restarts": 0}
+
+    def run(self, rows: Iterable[tuple[int, object]]):
+        self.items = iter(rows)
+        with self.create_manager() as manager, ThreadPoolExecutor(
+            max_workers=self.finishers, thread_name_prefix="tab-finish"
+        ) as executor:
+            try:
+                self.open_browser(driver=manager.get_driver())
+                while self.step(manager=manager, executor=executor):
+                    self.write_finished()
+            except DriverUnavailableError as e:
+                logger.error(f"Tab pool lost its driver: {e}")
+            self.write_finished(wait=True)
+            logger.info(f"Driver stats: {manager.stats()}")
+        logger.info(f"Tab pool finished: {self.counts}")
+
+    def open_browser(self, driver: Chrome):
+        self.driver = driver
+        self.driver.set_page_load_timeout(self.page_timeout_seconds)
+        self.driver.set_script_timeout(self.script_timeout_seconds)
+        self.home_handle = self.driver.current_window_handle
+        self.tabs = [self.open_tab() for _ in range(self.tab_count)]
+
+    def step(self, manager: DriverManager, executor: ThreadPoolExecutor) -> bool:
+        busy, progressed = False, False
+        for index, tab in enumerate(self.tabs):
+            try:
+                self.driver.switch_to.window(tab.handle)
+                if tab.task is None:
+                    progressed |= self.assign(tab=tab, executor=executor)
+                elif tab.task.advance():
+                    self.complete(tab=tab, executor=executor)
+                    self.tabs[index] = self.recycle(tab=tab)
+                    manager.record_page()
+                    progressed = True
+                elif self.timed_out(tab=tab):
+                    self.tabs[index] = self.replace(tab=tab, reason="timed out")
+                    progressed = True
+            except WebDriverException as e:
+                self.tabs[index] = self.replace_or_restart(
+                    manager=manager, tab=tab, reason=f"{type(e).__name__}: {e.msg}"
+                )
+                progressed = True
+            busy |= self.tabs[index].task is not None
+
+            if manager.driver is not self.driver:
+                self.reopen(driver=manager.get_driver())
+                return True
+
+        if not progressed:
+            time.sleep(self.poll_interval_seconds)
+        return busy or bool(self.retries) or bool(self.prefetching) or progressed
+
+    def assign(self, tab: Tab, executor: ThreadPoolExecutor) -> bool:
+        if self.retries:
+            index, item, attempt = self.retries.popleft()
+        elif (row := self.next_row(executor=executor)) is not None:
+            (index, item), attempt = row, 1
+        else:
+            return False
+
+        tab.index, tab.item, tab.attempt = index, item, attempt
+        try:
+            tab.task = self.start(self.driver, item)
+        except WebDriverException:
+            raise
+        except Exception as e:
+            logger.warning(f"Row {index} failed on attempt {attempt}: {e}")
+            self.retry_or_fail(index=index, item=item, attempt=attempt)
+            tab.clear()
+            return True
+
+        if tab.task is None:
+            self.finishing.append(executor.submit(self.finish, item, None))
+            tab.clear()
+        return True
+
+    def next_row(self, executor: ThreadPoolExecutor) -> tuple[int, object] | None:
+        if self.prefetch is None:
+            return None if (row := next(self.items, DONE)) is DONE else row
+
+        while len(self.prefetching) < self.tab_count:
+            if (row := next(self.items, DONE)) is DONE:
+                break
+            self.prefetching.append((row, executor.submit(self.prefetch, row[1])))
+
+        for entry in self.prefetching:
+            row, future = entry
+            if future.done():
+                self.prefetching.remove(entry)
+                if (error := future.exception()) is not None:
+                    logger.debug(f"Row {row[0]} was not prefetched: {error}")
+                return row
+        return None
+
+    def timed_out(self, tab: Tab) -> bool:
+        if (loading_since := tab.task.loading_since) is None:
+            return False
+        return time.monotonic() - loading_since > self.page_timeout_seconds
+
+    def complete(self, tab: Tab, executor: ThreadPoolExecutor):
+        self.finishing.append(executor.submit(self.finish, tab.item, tab.task))
+        self.counts["finished"] += 1
+        tab.clear()
+
+    def write_finished(self, wait: bool = False):
+        pending = []
+        for future in self.finishing:
+            if not wait and not future.done():
+                pending.append(future)
+                continue
+            try:
+                result = future.result()
+            except Exception as e:
+                logger.warning(f"Row failed after browsing: {e}")
+                self.counts["failed"] += 1
+                continue
+            for row in result if isinstance(result, list) else [result]:
+                if row is not None:
+                    self.write(row)
+        self.finishing = pending
+
+    def open_tab(self) -> Tab:
+        self.driver.switch_to.window(self.home_handle)
+        tab = self.open_isolated_tab() if self.isolate else None
+        if tab is None:
+            self.driver.switch_to.new_window("tab")
+            tab = Tab(handle=self.driver.current_window_handle)
+        self.driver.switch_to.window(tab.handle)
+        if self.prepare_tab is not None:
+            self.prepare_tab(self.driver)
+        return tab
+
+    def open_isolated_tab(self) -> Tab | None:
+        try:
+            context_id = self.driver.execute_cdp_cmd(
+                "Target.createBrowserContext", {}
+            )["browserContextId"]
+            target_id = self.driver.execute_cdp_cmd(
+                "Target.createTarget",
+                {"url": "about:blank", "browserContextId": context_id},
+            )["targetId"]
+        except (WebDriverException, KeyError) as e:
+            logger.warning(f"Isolated tabs unavailable, tabs will share cookies: {e}")
+            self.isolate = False
+            return None
+
+        if target_id not in self.driver.window_handles:
+            logger.warning("Isolated tab is not visible to the driver, not isolating")
+            self.dispose(context_id=context_id)
+            self.isolate = False
+            return None
+        return Tab(handle=target_id, context_id=context_id)
+
+    def close_tab(self, tab: Tab):
+        self.driver.switch_to.window(self.home_handle)
+        try:
+            self.driver.execute_cdp_cmd("Target.closeTarget", {"targetId": tab.handle})
+        except WebDriverException as e:
+            logger.debug(f"Unable to close tab: {e}")
+        if tab.context_id is not None:
+            self.dispose(context_id=tab.context_id)
+
+    def dispose(self, context_id: str):
+        try:
+            self.driver.execute_cdp_cmd(
+                "Target.disposeBrowserContext", {"browserContextId": context_id}
+            )
+        except WebDriverException as e:
+            logger.debug(f"Unable to dispose browser context: {e}")
+
+    def recycle(self, tab: Tab) -> Tab:
+        self.close_tab(tab=tab)
+        return self.open_tab()
+
+    def replace(self, tab: Tab, reason: str) -> Tab:
+        logger.warning(f"Replacing tab: {reason}")
+        metrics.increment("tab_replacements")
+        self.counts["replaced"] += 1
+        if tab.task is not None:
+            tab.task.abandon()
+        if tab.item is not None:
+            self.retry_or_fail(index=tab.index, item=tab.item, attempt=tab.attempt)
+        tab.clear()
+        return self.recycle(tab=tab)
+
+    def replace_or_restart(self, manager: DriverManager, tab: Tab, reason: str) -> Tab:
+        try:
+            return self.replace(tab=tab, reason=reason)
+        except WebDriverException as e:
+            manager.restart(reason=f"unable to replace tab: {type(e).__name__}")
+            return tab
+
+    def retry_or_fail(self, index: int, item, attempt: int):
+        if attempt < self.max_attempts:
+            self.retries.append((index, item, attempt + 1))
+            return None
+
+        logger.error(f"Row {index} dropped after {attempt} attempts")
+        self.counts["failed"] += 1
+
+    def reopen(self, driver: Chrome):
+        self.counts["restarts"] += 1
+        for tab in self.tabs:
+            if tab.task is not None:
+                tab.task.abandon()
+            if tab.item is not None:
+                self.retries.append((tab.index, tab.item, tab.attempt))
+        self.open_browser(driver=driver)
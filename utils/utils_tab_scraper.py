@@ -0,0 +1,188 @@
+import time
+from urllib.parse import urlparse
+
+from loguru import logger
+from selenium.webdriver import Chrome
+
+from utils.utils_dom_extraction import (
+    CLICK_SCRIPT,
+    extract_page_data,
+    page_loaded,
+    start_navigation,
+)
+from utils.utils_host_scheduler import Ticket, classify_title, get_scheduler
+from utils.utils_load_profile import latency_tracker
+from utils.utils_metrics import metrics
+from utils.utils_page_archive import PageArchive
+from utils.utils_state_resolver import StateResolver
+from utils.utils_website_scraper import (
+    CONTACT_US_XPATH,
+    HOME_XPATH,
+    Company,
+    clean_address,
+)
+
+
+class TabCompany(Company):
+    def __init__(
+        self,
+        driver: Chrome,
+        gstin: str,
+        company_name: str,
+        page_link: str,
+        state_resolver: StateResolver,
+        archive: PageArchive | None = None,
+    ) -> None:
+        self.step = None
+        self.queued_url = None
+        self.ticket = None
+        self.loaded_at = None
+        self.loading_since = None
+        self.clicked_at = None
+        self.timed_out = False
+        self.started = time.perf_counter()
+        super().__init__(
+            driver=driver,
+            gstin=gstin,
+            company_name=company_name,
+            page_link=page_link,
+            state_resolver=state_resolver,
+            extraction_mode="script",
+            archive=archive,
+        )
+
+    def start_scraping(self):
+        self.navigate(url=self.page_link, step="profile")
+
+    def navigate(self, url: str, step: str):
+        self.step = step
+        self.queued_url = url
+        self.loaded_at = None
+        self.loading_since = None
+        if (ticket := get_scheduler().try_acquire(url=url)) is None:
+            return None
+
+        self.ticket = ticket
+        self.queued_url = None
+        self.loading_since = time.monotonic()
+        start_navigation(driver=self.driver, url=url)
+
+    def advance(self) -> bool:
+        if self.step == "done":
+            return True
+        if self.queued_url is not None:
+            self.navigate(url=self.queued_url, step=self.step)
+            return False
+        if not page_loaded(driver=self.driver):
+            return False
+
+        if self.loaded_at is None:
+            self.loaded_at = time.monotonic()
+        if self.ticket is not None:
+            self.ticket.outcome = classify_title(title=self.driver.title)
+            self.release_ticket(ticket=self.ticket)
+
+        if self.step == "profile":
+            self.read_profile_page()
+        elif self.step == "contact":
+            self.read_contact_page()
+        elif self.step == "home":
+            self.read_home_page()
+        return self.step == "done"
+
+    def abandon(self):
+        if self.ticket is not None:
+            self.ticket.outcome = "error"
+            self.release_ticket(ticket=self.ticket)
+
+    def release_ticket(self, ticket: Ticket):
+        self.ticket = None
+        get_scheduler().release(ticket=ticket)
+
+    def read_profile_page(self):
+        page_data = extract_page_data(driver=self.driver)
+        host = urlparse(self.page_link).netloc
+        waited = time.monotonic() - self.loaded_at
+        if page_data.get("ready"):
+            latency_tracker.record(host=host, seconds=waited)
+        elif waited < latency_tracker.timeout_for(host=host):
+            return None
+        else:
+            latency_tracker.record_miss(host=host)
+            metrics.increment("element_wait_timeouts")
+            self.timed_out = True
+            logger.debug("Company data not found")
+            return self.read_profile_data(page_data=page_data)
+
+        if self.archive is not None:
+            self.read_page_source(kind="profile")
+        contact_us_href = page_data.get("contact_us_href")
+        if not contact_us_href:
+            logger.debug("'Contact us' element not found")
+            return self.read_profile_data(page_data=page_data)
+
+        contact_us_url = page_data.get("contact_us_url")
+        if contact_us_url and not contact_us_href.startswith("javascript:"):
+            return self.navigate(url=contact_us_url, step="contact")
+        if self.driver.execute_script(CLICK_SCRIPT, CONTACT_US_XPATH):
+            self.step = "contact"
+            self.clicked_at = time.monotonic()
+            return None
+        self.read_profile_data(page_data=page_data)
+
+    def read_contact_page(self):
+        page_data = extract_page_data(driver=self.driver)
+        if self.clicked_at is not None and not page_data.get("address"):
+            host = urlparse(self.page_link).netloc
+            waited = time.monotonic() - self.clicked_at
+            if waited < latency_tracker.timeout_for(host=host):
+                return None
+            metrics.increment("element_wait_timeouts")
+        self.clicked_at = None
+        self.address = clean_address(address=page_data.get("address"))
+        self.scrape_website_links()
+        self.read_profile_data(page_data=page_data)
+
+    def read_profile_data(self, page_data: dict):
+        if owner := page_data.get("owner"):
+            self.owner = owner.strip()
+        self.phone = page_data.get("phone")
+        self.products = page_data.get("products") or {}
+
+        home_href = page_data.get("home_href")
+        if not home_href:
+            logger.debug("'Home' element not found")
+            return self.finish()
+        if home_href.startswith("javascript:"):
+            return self.read_basic_data(page_data=page_data)
+
+        if home_url := page_data.get("home_url"):
+            return self.navigate(url=home_url, step="home")
+        self.driver.execute_script(CLICK_SCRIPT, HOME_XPATH)
+        self.read_home_page()
+
+    def read_home_page(self):
+        if self.archive is not None:
+            self.read_page_source(kind="home")
+        self.read_basic_data(page_data=extract_page_data(driver=self.driver))
+
+    def read_basic_data(self, page_data: dict):
+        self.nature_of_business = page_data.get("nature_of_business")
+        self.annual_turnover = page_data.get("annual_turnover")
+        self.finish()
+
+    def finish(self):
+        self.get_zip_code()
+        self.get_state_name()
+        self.step = "done"
+        self.loading_since = None
+        found = any([self.address, self.owner, self.phone, self.products])
+        if self.timed_out:
+            outcome = "timeout"
+        else:
+            outcome = "found" if found else "not_found"
+        metrics.observe(
+            stage="profile_tab",
+            seconds=time.perf_counter() - self.started,
+            outcome=outcome,
+        )
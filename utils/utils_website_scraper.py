@@ -7,12 +7,34 @@ from selenium.webdriver import Chrome
 from selenium.webdriver.common.by import By
 from selenium.webdriver.remote.webelement import WebElement
 
+from utils.utils_dom_extraction import extract_page_data, follow_link
+from utils.utils_domain_resolver import contact_links
+from utils.utils_find_links import extract_links
 from utils.utils_global import wait_for_element_to_load
+from utils.utils_host_scheduler import classify_title, get_scheduler
+from utils.utils_load_profile import record_transfer_stats
+from utils.utils_metrics import attribute_found, instrument
+from utils.utils_page_archive import PageArchive, archive_page
+from utils.utils_state_resolver import StateResolver
+
+
+CONTACT_US_XPATH = "//a[contains(text(), 'Contact Us')]"
+ADDRESS_XPATH = "//p[@class='FM_Lsp4 FM_C0 Fm_lh22']"
+HOME_XPATH = (
+    "//a[contains(text(), 'Home') and (@href='./' or @href='javascript:void(0);')]"
+)
 
 
 class Company:
     def __init__(
-        self, driver: Chrome, gstin: str, company_name: str, page_link: str, states: list
+        self,
+        driver: Chrome,
+        gstin: str,
+        company_name: str,
+        page_link: str,
+        state_resolver: StateResolver,
+        extraction_mode: str = "webdriver",
+        archive: PageArchive | None = None,
     ) -> None:
         self.driver = driver
         self.gstin = gstin
@@ -26,8 +48,12 @@ class Company:
         self.annual_turnover = None
         self.state = None
         self.zip_code = None
+        self.website_links = []
+        self.state_resolver = state_resolver
+        self.extraction_mode = extraction_mode
+        self.archive = archive
 
-        self.start_scraping(states=states)
+        self.start_scraping()
 
     def get_scraped_data(self) -> Dict:
         return {
@@ -42,36 +68,128 @@ class Company:
             "products": self.products,
             "nature of business": self.nature_of_business,
             "annual turnover": self.annual_turnover,
+            "website links": self.website_links,
         }
 
-    def start_scraping(self, states: list):
-        self.scrape_contact_us()
-        self.scrape_owner_name()
-        self.scrape_mobile_number()
-        self.scrape_products_data()
-        self.scrape_basic_data()
-        self.get_state_name(states)
+    def start_scraping(self):
+        if self.extraction_mode == "script":
+            self.scrape_with_script()
+        else:
+            self.scrape_contact_us()
+            self.scrape_owner_name()
+            self.scrape_mobile_number()
+            self.scrape_products_data()
+            self.scrape_basic_data()
         self.get_zip_code()
+        self.get_state_name()
 
+    @instrument(
+        stage="profile_script",
+        found=attribute_found("address", "owner", "products"),
+    )
+    def scrape_with_script(self):
+        self.open_page()
+        element = wait_for_element_to_load(
+            driver=self.driver,
+            by_attr=By.CSS_SELECTOR,
+            attr_value="ul[class='FM_ds5 FM_f16 FM_w1']",
+        )
+        loaded = isinstance(element, WebElement)
+        if not loaded:
+            logger.debug("Company data not found")
+        elif self.archive is not None:
+            self.read_page_source(kind="profile")
+
+        page_data = extract_page_data(driver=self.driver)
+        if loaded and follow_link(
+            driver=self.driver,
+            url=page_data.get("contact_us_url"),
+            href=page_data.get("contact_us_href"),
+            xpath=CONTACT_US_XPATH,
+            wait_xpath=ADDRESS_XPATH,
+        ):
+            page_data = extract_page_data(driver=self.driver)
+            self.address = clean_address(address=page_data.get("address"))
+            self.scrape_website_links()
+        else:
+            logger.debug("'Contact us' element not found")
+
+        if owner := page_data.get("owner"):
+            self.owner = owner.strip()
+        self.phone = page_data.get("phone")
+        self.products = page_data.get("products") or {}
+
+        home_href = page_data.get("home_href")
+        if home_href and not home_href.startswith("javascript:"):
+            follow_link(
+                driver=self.driver,
+                url=page_data.get("home_url"),
+                href=home_href,
+                xpath=HOME_XPATH,
+            )
+            if self.archive is not None:
+                self.read_page_source(kind="home")
+            page_data = extract_page_data(driver=self.driver)
+        elif not home_href:
+            logger.debug("'Home' element not found")
+            return None if loaded else element
+
+        self.nature_of_business = page_data.get("nature_of_business")
+        self.annual_turnover = page_data.get("annual_turnover")
+        return None if loaded else element
+
+    @instrument(stage="profile_contact_us", found=attribute_found("address"))
     def scrape_contact_us(self):
-        self.driver.get(self.page_link)
+        self.open_page()
         element = wait_for_element_to_load(
             driver=self.driver,
             by_attr=By.CSS_SELECTOR,
             attr_value="ul[class='FM_ds5 FM_f16 FM_w1']",
         )
-        if element is None:
+        if not isinstance(element, WebElement):
             logger.debug("Company data not found")
-            return None
+            return element
+        if self.archive is not None:
+            self.read_page_source(kind="profile")
 
-        contact_us_btn_xpath = "//a[contains(text(), 'Contact Us')]"
         try:
-            self.driver.find_element(By.XPATH, contact_us_btn_xpath).click()
+            contact_us = self.driver.find_element(By.XPATH, CONTACT_US_XPATH)
         except NoSuchElementException:
             logger.debug("'Contact us' element not found")
             return None
+        with get_scheduler().slot(url=self.page_link):
+            contact_us.click()
 
         self.get_address()
+        self.scrape_website_links()
+
+    def open_page(self):
+        with get_scheduler().slot(url=self.page_link) as ticket:
+            self.driver.get(self.page_link)
+            ticket.outcome = classify_title(title=self.driver.title)
+        record_transfer_stats(driver=self.driver)
+
+    def scrape_website_links(self):
+        if (page_source := self.read_page_source(kind="contact")) is None:
+            return None
+        self.website_links = contact_links(hrefs=extract_links(page_source=page_source))
+
+    def read_page_source(self, kind: str) -> str | None:
+        try:
+            page_source = self.driver.page_source
+            url = self.driver.current_url
+        except Exception as e:
+            logger.debug(f"Unable to read page source: {e}")
+            return None
+
+        archive_page(
+            archive=self.archive,
+            url=url,
+            content=page_source,
+            kind=kind,
+            gstin=self.gstin,
+        )
+        return page_source
 
     def get_address(self):
         element_class = "FM_Lsp4 FM_C0 Fm_lh22"
@@ -83,21 +201,12 @@ class Company:
             logger.debug("'Address' element not found")
             return None
 
-        address = address.get_attribute("innerHTML").strip()
-        self.address = address[: address.index("<")] if ("<" in address) else address
+        self.address = clean_address(address=address.get_attribute("innerHTML"))
 
-    def get_state_name(self, states: list[str]):
-        if self.address is not None:
-            preprocessed_address = self.address.split(',')
-            preprocessed_address = preprocessed_address[-2]
-            preprocessed_address = preprocess_string(preprocessed_address)
-            threshold = 0.4
-            for state in states:
-                preprocessed_state = preprocess_string(state)
-                if find_string_b_in_string_a(string_a=preprocessed_address, string_b=preprocessed_state,
-                                             threshold=threshold):
-                    self.state = state.lower()
-                    break
+    def get_state_name(self):
+        self.state = self.state_resolver.resolve(
+            address=self.address, zip_code=self.zip_code, gstin=self.gstin
+        )
 
     def get_zip_code(self):
         if self.address is not None:
@@ -105,6 +214,7 @@ class Company:
             if match := re.search(zip_code_pattern, self.address):
                 self.zip_code = match.group()
 
+    @instrument(stage="profile_owner_name", found=attribute_found("owner"))
     def scrape_owner_name(self):
         element_class = "FM_Lsp4 FM_f15 FM_c7 FM_p29"
         try:
@@ -117,6 +227,7 @@ class Company:
 
         self.owner = owner_name_element.get_attribute("innerHTML").strip()
 
+    @instrument(stage="profile_mobile_number", found=attribute_found("phone"))
     def scrape_mobile_number(self):
         try:
             call_btn = self.driver.find_element(By.ID, "footerPNS")
@@ -128,6 +239,7 @@ class Company:
             logger.debug(e)
             return None
 
+    @instrument(stage="profile_products", found=attribute_found("products"))
     def scrape_products_data(self):
         products = scrape_products_and_range_data(driver=self.driver)
         if not isinstance(products, list):
@@ -139,8 +251,16 @@ class Company:
 
             self.products.update(data_as_dict)
 
+    @instrument(
+        stage="profile_basic_data",
+        found=attribute_found("nature_of_business", "annual_turnover"),
+    )
     def scrape_basic_data(self):
-        if navigate_to_home(driver=self.driver):
+        with get_scheduler().slot(url=self.page_link):
+            navigated = navigate_to_home(driver=self.driver)
+        if navigated:
+            if self.archive is not None:
+                self.read_page_source(kind="home")
             self.nature_of_business = scrape_nature_of_business(driver=self.driver)
             self.annual_turnover = scrape_annual_turnover(driver=self.driver)
 
@@ -193,11 +313,8 @@ def scrape_sub_product_names(product: WebElement):
 
 
 def navigate_to_home(driver: Chrome) -> bool:
-    xpath = (
-        "//a[contains(text(), 'Home') and (@href='./' or @href='javascript:void(0);')]"
-    )
     try:
-        driver.find_element(By.XPATH, xpath).click()
+        driver.find_element(By.XPATH, HOME_XPATH).click()
         return True
     except NoSuchElementException:
         logger.debug("'Home' element not found")
@@ -230,20 +347,8 @@ def scrape_annual_turnover(driver: Chrome):
         return None
 
 
-def preprocess_string(input_string):
-    return re.sub(r'[^\w\s]', '', input_string).lower()
-
-
-def jaccard_similarity(str_a, str_b):
-    set_a = set(str_a.split())
-    set_b = set(str_b.split())
-    intersection = len(set_a.intersection(set_b))
-    union = len(set_a.union(set_b))
-    return intersection / union
-
-
-def find_string_b_in_string_a(string_a, string_b, threshold=0.7):
-    processed_a = preprocess_string(string_a)
-    processed_b = preprocess_string(string_b)
-    similarity_score = jaccard_similarity(processed_a, processed_b)
-    return similarity_score >= threshold
+def clean_address(address: str | None):
+    if address is None:
+        return None
+    address = address.strip()
+    return address[: address.index("<")] if ("<" in address) else address
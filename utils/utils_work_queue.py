@@ -0,0 +1,288 @@
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Iterable, Iterator, NamedTuple
+
+from loguru import logger
+
+from utils.utils_input_reader import CompanyRow
+
+
+QUEUE_STATUSES = ["pending", "leased", "done", "not_found", "failed"]
+
+
+class Lease(NamedTuple):
+    lease_id: str
+    companies: list[CompanyRow]
+
+
+class WorkQueue:
+    def __init__(
+        self, path: str, lease_seconds: float = 600, max_attempts: int = 3
+    ) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.lock = threading.Lock()
+        # The rollback journal is kept instead of WAL so the file can live on a
+        # network share, where WAL's shared-memory index is not safe.
+        self.connection = sqlite3.connect(
+            path, timeout=60, check_same_thread=False, isolation_level=None
+        )
+        self.connection.execute(
+            """CREATE TABLE IF NOT EXISTS work (
+                gstin TEXT PRIMARY KEY,
+                company_name TEXT NOT NULL,
+                row_index INTEGER NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                lease_id TEXT,
+                worker TEXT,
+                lease_expires REAL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                error TEXT,
+                updated_at REAL NOT NULL
+            )"""
+        )
+        self.connection.execute(
+            "CREATE INDEX IF NOT EXISTS work_status ON work (status, row_index)"
+        )
+        self.connection.execute(
+            """CREATE TABLE IF NOT EXISTS results (
+                gstin TEXT PRIMARY KEY,
+                data TEXT NOT NULL,
+                worker TEXT,
+                committed_at REAL NOT NULL
+            )"""
+        )
+
+    def transaction(self, statements):
+        with self.lock:
+            self.connection.execute("BEGIN IMMEDIATE")
+            try:
+                result = statements(self.connection)
+            except Exception:
+                self.connection.execute("ROLLBACK")
+                raise
+            self.connection.execute("COMMIT")
+            return result
+
+    def load(self, companies: Iterable[CompanyRow], batch_size: int = 1000) -> int:
+        loaded, batch = 0, []
+        for company in companies:
+            batch.append((company.GSTIN, company.COMPANY_NAME, company.index))
+            if len(batch) >= batch_size:
+                loaded += self.insert(rows=batch)
+                batch = []
+        if batch:
+            loaded += self.insert(rows=batch)
+        logger.info(f"Loaded {loaded} new companies into '{self.path}'")
+        return loaded
+
+    def insert(self, rows: list[tuple]) -> int:
+        def statements(connection):
+            before = connection.total_changes
+            connection.executemany(
+                """INSERT OR IGNORE INTO work (gstin, company_name, row_index,
+                updated_at) VALUES (?, ?, ?, ?)""",
+                [row + (time.time(),) for row in rows],
+            )
+            return connection.total_changes - before
+
+        return self.transaction(statements)
+
+    def claim_batch(self, worker: str, size: int = 50) -> Lease | None:
+        lease_id = uuid.uuid4().hex
+
+        def statements(connection):
+            now = time.time()
+            self.reclaim_expired(connection=connection, now=now)
+            rows = connection.execute(
+                """SELECT gstin, company_name, row_index FROM work
+                WHERE status = 'pending' ORDER BY row_index LIMIT ?""",
+                (size,),
+            ).fetchall()
+            connection.executemany(
+                """UPDATE work SET status = 'leased', lease_id = ?, worker = ?,
+                lease_expires = ?, attempts = attempts + 1, updated_at = ?
+                WHERE gstin = ?""",
+                [
+                    (lease_id, worker, now + self.lease_seconds, now, gstin)
+                    for gstin, _, _ in rows
+                ],
+            )
+            return rows
+
+        rows = self.transaction(statements)
+        if not rows:
+            return None
+
+        logger.info(f"Worker '{worker}' leased {len(rows)} companies")
+        return Lease(
+            lease_id=lease_id,
+            companies=[
+                CompanyRow(index=row_index, GSTIN=gstin, COMPANY_NAME=company_name)
+                for gstin, company_name, row_index in rows
+            ],
+        )
+
+    def reclaim_expired(self, connection: sqlite3.Connection, now: float):
+        failed = connection.execute(
+            """UPDATE work SET status = 'failed', lease_id = NULL, updated_at = ?,
+            error = 'lease expired' WHERE status = 'leased' AND lease_expires < ?
+            AND attempts >= ?""",
+            (now, now, self.max_attempts),
+        ).rowcount
+        reclaimed = connection.execute(
+            """UPDATE work SET status = 'pending', lease_id = NULL, updated_at = ?
+            WHERE status = 'leased' AND lease_expires < ?""",
+            (now, now),
+        ).rowcount
+        if failed or reclaimed:
+            logger.warning(
+                f"Reclaimed {reclaimed} expired leases, {failed} out of attempts"
+            )
+
+    def heartbeat(self, lease_id: str) -> bool:
+        now = time.time()
+        renewed = self.transaction(
+            lambda connection: connection.execute(
+                """UPDATE work SET lease_expires = ?, updated_at = ?
+                WHERE lease_id = ? AND status = 'leased'""",
+                (now + self.lease_seconds, now, lease_id),
+            ).rowcount
+        )
+        return renewed > 0
+
+    def complete(self, gstin: str, data: dict, worker: str | None = None):
+        def statements(connection):
+            connection.execute(
+                """INSERT INTO results (gstin, data, worker, committed_at)
+                VALUES (?, ?, ?, ?) ON CONFLICT (gstin) DO UPDATE SET
+                data = excluded.data, worker = excluded.worker,
+                committed_at = excluded.committed_at""",
+                (gstin, json.dumps(data), worker, time.time()),
+            )
+            connection.execute(
+                """UPDATE work SET status = 'done', lease_id = NULL, error = NULL,
+                updated_at = ? WHERE gstin = ?""",
+                (time.time(), gstin),
+            )
+
+        self.transaction(statements)
+
+    def settle(self, lease: Lease, not_found: set[str] | None = None):
+        not_found = not_found or set()
+
+        def statements(connection):
+            rows = connection.execute(
+                """SELECT gstin, attempts FROM work
+                WHERE lease_id = ? AND status = 'leased'""",
+                (lease.lease_id,),
+            ).fetchall()
+            for gstin, attempts in rows:
+                if gstin in not_found:
+                    status = "not_found"
+                elif attempts >= self.max_attempts:
+                    status = "failed"
+                else:
+                    status = "pending"
+                connection.execute(
+                    """UPDATE work SET status = ?, lease_id = NULL, updated_at = ?
+                    WHERE gstin = ?""",
+                    (status, time.time(), gstin),
+                )
+
+        self.transaction(statements)
+
+    def results(self) -> Iterator[dict]:
+        with self.lock:
+            rows = self.connection.execute(
+                """SELECT results.data FROM results JOIN work USING (gstin)
+                ORDER BY work.row_index"""
+            ).fetchall()
+        for (data,) in rows:
+            yield json.loads(data)
+
+    def counts(self) -> dict:
+        with self.lock:
+            rows = self.connection.execute(
+                "SELECT status, COUNT(*) FROM work GROUP BY status"
+            ).fetchall()
+        counts = {status: 0 for status in QUEUE_STATUSES}
+        counts.update(dict(rows))
+        return counts
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
+
+
+class LeaseHeartbeat:
+    def __init__(self, work_queue: WorkQueue, lease: Lease) -> None:
+        self.work_queue = work_queue
+        self.lease = lease
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def run(self):
+        interval = self.work_queue.lease_seconds / 3
+        while not self.stopped.wait(interval):
+            try:
+                if not self.work_queue.heartbeat(lease_id=self.lease.lease_id):
+                    logger.warning(f"Lease '{self.lease.lease_id}' was lost")
+                    return None
+            except sqlite3.Error as e:
+                logger.warning(f"Heartbeat failed: {e}")
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stopped.set()
+        self.thread.join()
+
+
+class QueueWriter:
+    def __init__(self, work_queue: WorkQueue, worker: str) -> None:
+        self.work_queue = work_queue
+        self.worker = worker
+
+    def write(self, data_dict: dict):
+        self.work_queue.complete(
+            gstin=data_dict["gstin"], data=data_dict, worker=self.worker
+        )
+
+    def flush(self):
+        return None
+
+    def close(self):
+        return None
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+def leased_companies(
+    work_queue: WorkQueue,
+    worker: str,
+    batch_size: int,
+    is_not_found=lambda gstin: False,
+) -> Iterator[CompanyRow]:
+    while lease := work_queue.claim_batch(worker=worker, size=batch_size):
+        with LeaseHeartbeat(work_queue=work_queue, lease=lease):
+            yield from lease.companies
+        work_queue.settle(
+            lease=lease,
+            not_found={
+                company.GSTIN
+                for company in lease.companies
+                if is_not_found(company.GSTIN)
+            },
+        )
@@ -0,0 +1,164 @@
+import itertools
+import queue
+import threading
+from typing import Callable, Iterable
+
+from loguru import logger
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver import Chrome
+
+from utils.utils_driver_manager import DriverManager, DriverUnavailableError
+
+
+class WorkerPool:
+    def __init__(
+        self,
+        process_row: Callable[[Chrome, object], dict | list[dict] | None],
+        write_row: Callable[[dict], None],
+        workers: int,
+        max_attempts: int = 3,
+        create_manager: Callable[[], DriverManager] = DriverManager,
+        queue_size: int | None = None,
+    ) -> None:
+        self.process_row = process_row
+        self.write_row = write_row
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.create_manager = create_manager
+        self.tasks = queue.Queue(maxsize=queue_size or max(workers, 1) * 4)
+        self.retries = queue.Queue()
+        self.results = queue.Queue()
+        self.unfinished = 0
+        self.feeding = True
+        self.written = set()
+        self.failed = []
+        self.lock = threading.Lock()
+        self.done = threading.Event()
+        self.stopped = threading.Event()
+
+    def run(self, rows: Iterable[tuple[int, object]]):
+        rows = iter(rows)
+        if (first := next(rows, None)) is None:
+            return None
+
+        feeder = threading.Thread(
+            target=self.feed, args=(itertools.chain([first], rows),), daemon=True
+        )
+        threads = [
+            threading.Thread(target=self.work, name=f"worker-{number}", daemon=True)
+            for number in range(self.workers)
+        ]
+        writer = threading.Thread(target=self.write, name="writer", daemon=True)
+        writer.start()
+        feeder.start()
+        for thread in threads:
+            thread.start()
+
+        while not self.done.wait(timeout=1):
+            if not any(thread.is_alive() for thread in threads):
+                logger.error("All workers stopped before the queue was drained")
+                break
+
+        self.stopped.set()
+        self.results.put(None)
+        writer.join()
+        logger.info(
+            f"Worker pool finished: {len(self.written)} written, "
+            f"{len(self.failed)} failed"
+        )
+
+    def feed(self, rows: Iterable[tuple[int, object]]):
+        for index, company in rows:
+            with self.lock:
+                self.unfinished += 1
+            while not self.stopped.is_set():
+                try:
+                    self.tasks.put((index, company, 1), timeout=1)
+                    break
+                except queue.Full:
+                    continue
+            if self.stopped.is_set():
+                return None
+
+        with self.lock:
+            self.feeding = False
+            if self.unfinished == 0:
+                self.done.set()
+
+    def next_task(self) -> tuple[int, object, int] | None:
+        try:
+            return self.retries.get_nowait()
+        except queue.Empty:
+            pass
+        try:
+            return self.tasks.get(timeout=1)
+        except queue.Empty:
+            return None
+
+    def work(self):
+        with self.create_manager() as manager:
+            try:
+                manager.get_driver()
+            except DriverUnavailableError as e:
+                logger.error(f"Worker could not start a driver: {e}")
+                return None
+
+            while not self.done.is_set():
+                if (task := self.next_task()) is None:
+                    continue
+                index, company, attempt = task
+
+                try:
+                    result = self.process_row(manager.ensure_healthy(), company)
+                except DriverUnavailableError as e:
+                    logger.error(f"Worker lost its driver: {e}")
+                    self.retry_or_fail(index, company, attempt)
+                    return None
+                except Exception as e:
+                    logger.warning(f"Row {index} failed on attempt {attempt}: {e}")
+                    self.retry_or_fail(index, company, attempt)
+                    if isinstance(e, WebDriverException) and not restart(manager):
+                        return None
+                    continue
+
+                self.results.put((index, result))
+                try:
+                    manager.record_page()
+                except DriverUnavailableError as e:
+                    logger.error(f"Worker lost its driver: {e}")
+                    return None
+
+            logger.info(f"Driver stats: {manager.stats()}")
+
+    def retry_or_fail(self, index: int, company, attempt: int):
+        if attempt < self.max_attempts:
+            self.retries.put((index, company, attempt + 1))
+            return None
+
+        logger.error(f"Row {index} dropped after {attempt} attempts")
+        self.failed.append(index)
+        self.mark_finished()
+
+    def write(self):
+        while (item := self.results.get()) is not None:
+            index, result = item
+            if index not in self.written and result:
+                for row in result if isinstance(result, list) else [result]:
+                    self.write_row(row)
+                self.written.add(index)
+            self.mark_finished()
+
+    def mark_finished(self):
+        with self.lock:
+            self.unfinished -= 1
+            if self.unfinished == 0 and not self.feeding:
+                self.done.set()
+
+
+def restart(manager: DriverManager) -> bool:
+    try:
+        manager.restart(reason="row failed with a driver error")
+        return True
+    except DriverUnavailableError as e:
+        logger.error(f"Worker could not restart its driver: {e}")
+        return False